@@ -0,0 +1,300 @@
+"""
+Throughput benchmarks for the game engine.
+
+    python benchmarks/run.py                      # run and compare to baseline.json
+    python benchmarks/run.py --output result.json
+    python benchmarks/run.py --update-baseline    # store this run as the baseline
+
+Results are written as JSON. A benchmark is flagged as a regression when it is worse
+than the stored baseline by more than ``--tolerance`` (25% by default), and the exit
+status is then 1. The repo ships no card data, so the runs use a synthetic card set
+generated from a fixed seed.
+"""
+
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "splendor")
+)
+
+import numpy as np  # noqa: E402
+
+from actions import NUM_ACTIONS  # noqa: E402
+from board import Board  # noqa: E402
+from catalog import CardCatalog  # noqa: E402
+from deck import EvaluationDeck, NobleDeck  # noqa: E402
+from game import Game  # noqa: E402
+from tokens import COLORS  # noqa: E402
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+SEED = 2024
+MAX_ROUNDS = 100
+
+# Cards per level and the range of their total cost and score
+_LEVELS = ((40, 3, 5, 0, 1), (30, 6, 9, 1, 3), (20, 10, 14, 3, 5))
+_NUM_NOBLES = 10
+
+
+def write_card_set(directory: str, seed: int = SEED) -> (str, List[str]):
+    """Writes a deterministic synthetic card set and returns its file paths."""
+    rng = random.Random(seed)
+    noble_file = os.path.join(directory, "nobles.csv")
+    with open(noble_file, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(list(COLORS) + ["gold"])
+        for _ in range(_NUM_NOBLES):
+            colors = rng.sample(range(len(COLORS)), 3)
+            writer.writerow([3 if color in colors else 0 for color in range(5)] + [0])
+
+    evaluation_files = []
+    for level, (count, low, high, min_score, max_score) in enumerate(_LEVELS, 1):
+        path = os.path.join(directory, f"level{level}.csv")
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(list(COLORS) + ["gold", "score", "bonus"])
+            for _ in range(count):
+                cost = [0] * len(COLORS)
+                for _ in range(rng.randint(low, high)):
+                    cost[rng.randrange(len(COLORS))] += 1
+                score = rng.randint(min_score, max_score)
+                writer.writerow(cost + [0, score, rng.choice(COLORS)])
+        evaluation_files.append(path)
+    return noble_file, evaluation_files
+
+
+class Benchmarks:
+    """Runs every benchmark on one card set; ``scale`` shrinks the workloads."""
+
+    def __init__(self, noble_file: str, evaluation_files: List[str], scale: float):
+        self.noble_file = noble_file
+        self.evaluation_files = evaluation_files
+        self.scale = scale
+        self.results: Dict[str, dict] = {}
+
+    def _count(self, count: int) -> int:
+        return max(1, int(count * self.scale))
+
+    def _record(self, name: str, value: float, unit: str, higher_is_better: bool):
+        self.results[name] = {
+            "value": value,
+            "unit": unit,
+            "higher_is_better": higher_is_better,
+        }
+
+    def _new_game(self, num_of_players: int) -> Game:
+        game = Game()
+        game.setup_game(
+            self.noble_file, self.evaluation_files, num_of_players, MAX_ROUNDS
+        )
+        return game
+
+    def run(self) -> Dict[str, dict]:
+        self.option_path()
+        self.start_new_game()
+        self.load_from_files()
+        for num_of_players in (2, 3, 4):
+            self.random_playouts(num_of_players)
+        self.memory_per_game()
+        return self.results
+
+    def option_path(self):
+        """Per-call time of the option dict API over seeded random games."""
+        totals = {"get_options": 0, "apply_option": 0, "finalize_turn": 0}
+        calls = 0
+        rng = random.Random(SEED)
+        game = self._new_game(2)
+        for _ in range(self._count(200)):
+            game.reset(rng)
+            while not game.end:
+                start = time.perf_counter_ns()
+                options = game.get_options_for_current_player_id()
+                after_options = time.perf_counter_ns()
+                operation = rng.choice([op for op, data in options.items() if data])
+                option = {operation: rng.choice(options[operation])}
+                before_apply = time.perf_counter_ns()
+                game.apply_option(option, options)
+                after_apply = time.perf_counter_ns()
+                game.finalize_turn()
+                end = time.perf_counter_ns()
+                totals["get_options"] += after_options - start
+                totals["apply_option"] += after_apply - before_apply
+                totals["finalize_turn"] += end - after_apply
+                calls += 1
+        for name, total in totals.items():
+            self._record(name, total / calls, "ns/call", False)
+
+    def start_new_game(self):
+        game = self._new_game(4)
+        board = game.board
+        total = 0
+        repeats = self._count(5000)
+        random.seed(SEED)
+        for _ in range(repeats):
+            # start_new_game deals from what is left in the decks
+            board.noble_deck.refill()
+            for deck in board.evaluation_decks:
+                deck.refill()
+            start = time.perf_counter_ns()
+            game.start_new_game()
+            total += time.perf_counter_ns() - start
+        self._record("start_new_game", total / repeats, "ns/call", False)
+
+        rng = random.Random(SEED)
+        repeats = self._count(5000)
+        start = time.perf_counter_ns()
+        for _ in range(repeats):
+            game.reset(rng)
+        elapsed = time.perf_counter_ns() - start
+        self._record("reset", elapsed / repeats, "ns/call", False)
+
+    def load_from_files(self):
+        """
+        Warm loads hit the process-wide catalog. Cold ones re-read the compiled cache
+        and build every card, into a fresh catalog each time so the process-wide one
+        does not grow.
+        """
+        repeats = self._count(2000)
+        start = time.perf_counter_ns()
+        for _ in range(repeats):
+            Board().load_from_files(self.noble_file, self.evaluation_files)
+        elapsed = time.perf_counter_ns() - start
+        self._record("load_from_files", elapsed / repeats, "ns/call", False)
+
+        files = [(self.noble_file, None, NobleDeck._read_card)] + [
+            (path, level, EvaluationDeck(level)._read_card)
+            for level, path in enumerate(self.evaluation_files)
+        ]
+        repeats = self._count(200)
+        total = 0
+        for _ in range(repeats):
+            catalog = CardCatalog()
+            start = time.perf_counter_ns()
+            for path, level, read_card in files:
+                catalog.load(path, level, read_card)
+            total += time.perf_counter_ns() - start
+        self._record("load_from_files_cold", total / repeats, "ns/call", False)
+
+    def random_playouts(self, num_of_players: int):
+        """Complete uniformly random games through legal_action_mask and step."""
+        rng = random.Random(SEED + num_of_players)
+        game = self._new_game(num_of_players)
+        mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        games = self._count(300)
+        steps = 0
+        start = time.perf_counter()
+        for _ in range(games):
+            game.reset(rng)
+            while not game.end:
+                legal = np.flatnonzero(game.legal_action_mask(mask))
+                game.step(int(legal[rng.randrange(len(legal))]))
+                steps += 1
+        elapsed = time.perf_counter() - start
+        self._record(
+            f"playout_{num_of_players}p_games_per_sec", games / elapsed, "games/s", True
+        )
+        self._record(
+            f"playout_{num_of_players}p_steps_per_sec", steps / elapsed, "steps/s", True
+        )
+
+    def memory_per_game(self):
+        """Traced bytes per started 4-player Game, card data excluded (shared)."""
+        self._new_game(4)  # load the catalog before tracing
+        count = self._count(200)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        games = []
+        for _ in range(count):
+            game = self._new_game(4)
+            game.start_new_game()
+            games.append(game)
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        self._record("memory_per_game", used / count, "bytes", False)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float):
+    """
+    Returns (name, baseline value, value, relative change) for each benchmark worse
+    than its baseline by more than ``tolerance``.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], result["value"]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if result["higher_is_better"] else change
+        if worse > tolerance:
+            regressions.append((name, old, new, change))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="workload multiplier, e.g. 0.1"
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        noble_file, evaluation_files = write_card_set(directory)
+        results = Benchmarks(noble_file, evaluation_files, args.scale).run()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": SEED,
+            "scale": args.scale,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            file.write(text + "\n")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; nothing to compare.", file=sys.stderr)
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for name, old, new, change in regressions:
+        print(
+            f"REGRESSION {name}: {old:.4g} -> {new:.4g} ({change:+.1%})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
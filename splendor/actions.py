@@ -0,0 +1,86 @@
+from typing import Any, Dict, Tuple
+
+from config import MAX_RESERVED_CARDS
+from withdrawal import WITHDRAWAL_PATTERNS
+
+NUM_LEVELS = 3
+SLOTS_PER_LEVEL = 4
+NUM_BOARD_SLOTS = NUM_LEVELS * SLOTS_PER_LEVEL
+
+# Fixed action layout: every withdrawal pattern, buy per board slot, buy per reserved
+# slot, then reserve without / with gold per board slot.
+WITHDRAWAL_OFFSET = 0
+BUY_EVALUATION_OFFSET = WITHDRAWAL_OFFSET + len(WITHDRAWAL_PATTERNS)
+BUY_RESERVED_OFFSET = BUY_EVALUATION_OFFSET + NUM_BOARD_SLOTS
+RESERVE_WITHOUT_GOLD_OFFSET = BUY_RESERVED_OFFSET + MAX_RESERVED_CARDS
+RESERVE_WITH_GOLD_OFFSET = RESERVE_WITHOUT_GOLD_OFFSET + NUM_BOARD_SLOTS
+NUM_ACTIONS = RESERVE_WITH_GOLD_OFFSET + NUM_BOARD_SLOTS
+
+# (operation, first action id, number of actions), in action id order
+ACTION_RANGES: Tuple[Tuple[str, int, int], ...] = (
+    ("withdrawal", WITHDRAWAL_OFFSET, len(WITHDRAWAL_PATTERNS)),
+    ("buy_evaluation", BUY_EVALUATION_OFFSET, NUM_BOARD_SLOTS),
+    ("buy_reserved", BUY_RESERVED_OFFSET, MAX_RESERVED_CARDS),
+    ("reserved_without_gold", RESERVE_WITHOUT_GOLD_OFFSET, NUM_BOARD_SLOTS),
+    ("reserved_with_gold", RESERVE_WITH_GOLD_OFFSET, NUM_BOARD_SLOTS),
+)
+
+_PATTERN_INDEX = {pattern: index for index, pattern in enumerate(WITHDRAWAL_PATTERNS)}
+
+
+def board_slot(deck_index: int, card_index: int) -> int:
+    """Flattens a (deck_index, card_index) board position into a slot number."""
+    return deck_index * SLOTS_PER_LEVEL + card_index
+
+
+def pattern_action(pattern) -> int:
+    """Returns the action id of a withdrawal pattern."""
+    return WITHDRAWAL_OFFSET + _PATTERN_INDEX[pattern]
+
+
+def decode_action(action: int) -> Tuple[str, int]:
+    """
+    Splits an action id into its operation name and argument: the withdrawal pattern
+    index, the board slot or the reserved card index.
+    """
+    for operation, offset, size in ACTION_RANGES:
+        if offset <= action < offset + size:
+            return operation, action - offset
+    raise ValueError(f"Invalid action id {action}.")
+
+
+def action_to_option(game, action: int) -> Dict[str, Any]:
+    """Returns the ``{operation: data}`` option of ``game`` for an action id."""
+    operation, index = decode_action(action)
+    if operation == "withdrawal":
+        return {operation: WITHDRAWAL_PATTERNS[index]}
+    if operation == "buy_reserved":
+        reserved_cards = game.players[game.current_player_id].reserved_cards
+        card = reserved_cards[index] if index < len(reserved_cards) else None
+        return {operation: card}
+    deck_index, card_index = divmod(index, SLOTS_PER_LEVEL)
+    return {operation: game.board.exposed_evaluation_cards[deck_index][card_index]}
+
+
+def option_to_action(game, operation: str, data: Any) -> int:
+    """Returns the action id of an option of ``game`` for the current player."""
+    if operation == "withdrawal":
+        return pattern_action(data)
+    if operation == "buy_reserved":
+        reserved_cards = game.players[game.current_player_id].reserved_cards
+        for index, card in enumerate(reserved_cards):
+            if card is data:
+                return BUY_RESERVED_OFFSET + index
+        raise ValueError("Card is not reserved by the current player.")
+    offsets = {
+        "buy_evaluation": BUY_EVALUATION_OFFSET,
+        "reserved_without_gold": RESERVE_WITHOUT_GOLD_OFFSET,
+        "reserved_with_gold": RESERVE_WITH_GOLD_OFFSET,
+    }
+    if operation not in offsets:
+        raise ValueError(f"Invalid operation {operation}.")
+    for deck_index, card_list in enumerate(game.board.exposed_evaluation_cards):
+        for card_index, card in enumerate(card_list):
+            if card is data:
+                return offsets[operation] + board_slot(deck_index, card_index)
+    raise ValueError("Card is not exposed on the board.")
@@ -0,0 +1,86 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from actions import NUM_BOARD_SLOTS
+from config import MAX_RESERVED_CARDS
+from tokens import COLORS, TOKEN_TYPES
+
+NUM_COLORS = len(COLORS)
+NUM_TOKEN_TYPES = len(TOKEN_TYPES)
+GOLD = TOKEN_TYPES.index("gold")
+
+# Cost written for empty slots by ``game_arrays``; more than any player can pay
+UNAFFORDABLE = 1000
+
+
+def gold_needed(
+    tokens: np.ndarray, bonuses: np.ndarray, costs: np.ndarray
+) -> np.ndarray:
+    """
+    Gold each player needs to buy each card, for any number of leading batch axes.
+
+    ``tokens`` and ``bonuses`` are (..., players, token types) and ``costs`` is either
+    (..., cards, token types) for cards every player may buy, or
+    (..., players, cards, token types) for cards per player (e.g. reserved ones).
+    Returns (..., players, cards). Gold in costs and bonuses is ignored, as in
+    ``Player.can_buy_evaluation_card``.
+    """
+    if costs.ndim == tokens.ndim:
+        costs = costs[..., None, :, :]
+    held = (tokens[..., :NUM_COLORS] + bonuses[..., :NUM_COLORS])[..., :, None, :]
+    shortfall = costs[..., :NUM_COLORS] - held
+    return np.maximum(shortfall, 0, out=shortfall).sum(axis=-1)
+
+
+def affordability(
+    tokens: np.ndarray, bonuses: np.ndarray, costs: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns ``gold_needed`` and whether each player holds that much gold."""
+    needed = gold_needed(tokens, bonuses, costs)
+    return needed, needed <= tokens[..., GOLD, None]
+
+
+def nobles_earned(bonuses: np.ndarray, noble_costs: np.ndarray) -> np.ndarray:
+    """
+    Whether the bonuses of each player cover each noble, as ``can_buy_noble_card``:
+    (..., players, token types) and (..., nobles, token types) give
+    (..., players, nobles).
+    """
+    return gold_needed(np.zeros_like(bonuses), bonuses, noble_costs) == 0
+
+
+def game_arrays(
+    games: Sequence,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collects the inputs of the kernel from games of the same size: tokens and bonuses
+    (games, players, token types), board card costs (games, board slots, token types)
+    and reserved card costs (games, players, reserved slots, token types). Empty
+    slots cost ``UNAFFORDABLE``.
+    """
+    num_games = len(games)
+    num_of_players = len(games[0].players)
+    tokens = np.zeros((num_games, num_of_players, NUM_TOKEN_TYPES), dtype=np.int16)
+    bonuses = np.zeros_like(tokens)
+    board_costs = np.full(
+        (num_games, NUM_BOARD_SLOTS, NUM_TOKEN_TYPES), UNAFFORDABLE, dtype=np.int16
+    )
+    reserved_costs = np.full(
+        (num_games, num_of_players, MAX_RESERVED_CARDS, NUM_TOKEN_TYPES),
+        UNAFFORDABLE,
+        dtype=np.int16,
+    )
+    for index, game in enumerate(games):
+        slot = 0
+        for card_list in game.board.exposed_evaluation_cards:
+            for card in card_list:
+                if card is not None:
+                    board_costs[index, slot] = card.cost.as_tuple()
+                slot += 1
+        for player_id, player in enumerate(game.players):
+            tokens[index, player_id] = player.tokens.as_tuple()
+            bonuses[index, player_id] = player.bonuses.as_tuple()
+            for reserved_index, card in enumerate(player.reserved_cards):
+                reserved_costs[index, player_id, reserved_index] = card.cost.as_tuple()
+    return tokens, bonuses, board_costs, reserved_costs
@@ -0,0 +1,171 @@
+import math
+import random
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+from actions import BUY_EVALUATION_OFFSET, NUM_ACTIONS, WITHDRAWAL_OFFSET
+from features import NUM_COLORS, PurchaseFeatures, reserve_action
+from withdrawal import WITHDRAWAL_PATTERNS
+
+
+class Agent(ABC):
+    """A player policy: picks an action id from the fixed action space of ``actions``."""
+
+    @abstractmethod
+    def select_action(self, game) -> int:
+        """Returns a legal action id for the current player of ``game``."""
+        pass
+
+    def reset(self, rng: Optional[random.Random] = None):
+        """
+        Called before each new game, with an RNG for that game when the caller seeds
+        its games; stateless agents need not override it.
+        """
+        pass
+
+
+class RandomAgent(Agent):
+    """Picks uniformly among the legal actions."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+
+    def select_action(self, game) -> int:
+        return self.rng.choice(np.flatnonzero(game.legal_action_mask()).tolist())
+
+    def reset(self, rng: Optional[random.Random] = None):
+        if rng is not None:
+            self.rng = rng
+
+
+# Colored tokens taken by each withdrawal pattern, and their total
+_WITHDRAWALS = np.array(
+    [pattern.as_tuple()[:NUM_COLORS] for pattern in WITHDRAWAL_PATTERNS],
+    dtype=np.int64,
+)
+_WITHDRAWAL_SIZES = _WITHDRAWALS.sum(axis=1)
+# Weight of the target card over the runners-up when choosing tokens
+_TARGET_WEIGHT = 100
+
+
+class GreedyAgent(Agent):
+    """
+    Buys the affordable card worth most now (score plus noble progress), else takes
+    the tokens that bring the best card by value per turn to afford closest, else
+    reserves that card. With ``epsilon`` it plays a random legal move instead.
+    """
+
+    def __init__(
+        self,
+        features: Optional[PurchaseFeatures] = None,
+        epsilon: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.features = features or PurchaseFeatures()
+        self.epsilon = epsilon
+        self.rng = rng or random.Random()
+        self._mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    def select_action(self, game) -> int:
+        mask = game.legal_action_mask(self._mask)
+        if self.epsilon and self.rng.random() < self.epsilon:
+            return self.rng.choice(np.flatnonzero(mask).tolist())
+        features = self.features.get(game)
+
+        buyable = [f for f in features.cards if not f.gold_short and mask[f.buy_action]]
+        if buyable:
+            best = max(buyable, key=lambda f: (f.card.score + f.noble_gain, -f.turns))
+            return best.buy_action
+
+        targets = sorted(features.cards, key=lambda f: -f.value)
+        if targets:
+            target = targets[0]
+            action = self._withdrawal_towards(mask, target.missing, targets[1:3])
+            if action is not None:
+                return action
+            if target.reserve_slot >= 0:
+                for with_gold in (True, False):
+                    action = reserve_action(target, with_gold)
+                    if mask[action]:
+                        return action
+        return self._largest_withdrawal(mask)
+
+    def reset(self, rng: Optional[random.Random] = None):
+        if rng is not None:
+            self.rng = rng
+
+    @staticmethod
+    def _withdrawal_towards(mask, missing, others) -> Optional[int]:
+        # The legal withdrawal covering most of missing, then of the other cards
+        useful = np.minimum(_WITHDRAWALS, missing).sum(axis=1)
+        useful *= mask[WITHDRAWAL_OFFSET:BUY_EVALUATION_OFFSET]
+        if not useful.any():
+            return None
+        key = _TARGET_WEIGHT * useful
+        for other in others:
+            key += np.minimum(_WITHDRAWALS, other.missing).sum(axis=1)
+        return WITHDRAWAL_OFFSET + int(np.argmax(key))
+
+    @staticmethod
+    def _largest_withdrawal(mask) -> int:
+        legal = np.flatnonzero(mask[WITHDRAWAL_OFFSET:BUY_EVALUATION_OFFSET])
+        if not len(legal):
+            return int(np.flatnonzero(mask)[0])
+        return WITHDRAWAL_OFFSET + int(legal[np.argmax(_WITHDRAWAL_SIZES[legal])])
+
+
+class LookaheadAgent(Agent):
+    """
+    Tries every legal move with ``Game.apply`` and keeps the one maximizing
+    ``PurchaseFeatures.value`` of the mover minus that of the best opponent. With
+    ``depth=2`` the ``width`` best moves are checked again after the next player's
+    greedy reply.
+    """
+
+    def __init__(
+        self,
+        depth: int = 2,
+        width: int = 6,
+        features: Optional[PurchaseFeatures] = None,
+    ):
+        if depth not in (1, 2):
+            raise ValueError("Depth must be 1 or 2.")
+        self.depth = depth
+        self.width = width
+        self.features = features or PurchaseFeatures()
+        self.opponent = GreedyAgent(self.features)
+        self._mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    def _evaluate(self, game, player_id: int) -> float:
+        values = [
+            self.features.value(game, other) for other in range(len(game.players))
+        ]
+        mine = values.pop(player_id)
+        return mine - max(values)
+
+    def select_action(self, game) -> int:
+        player_id = game.current_player_id
+        scored = []
+        for action in np.flatnonzero(game.legal_action_mask(self._mask)).tolist():
+            record = game.apply(action)
+            scored.append((self._evaluate(game, player_id), action))
+            game.undo(record)
+        scored.sort(key=lambda item: -item[0])
+        if self.depth == 1 or len(scored) == 1:
+            return scored[0][1]
+
+        best_action, best_value = scored[0][1], -math.inf
+        for _, action in scored[: self.width]:
+            record = game.apply(action)
+            if game.end:
+                value = self._evaluate(game, player_id)
+            else:
+                reply = game.apply(self.opponent.select_action(game))
+                value = self._evaluate(game, player_id)
+                game.undo(reply)
+            game.undo(record)
+            if value > best_value:
+                best_action, best_value = action, value
+        return best_action
@@ -1,13 +1,17 @@
-from typing import List
+import random
+from typing import List, Optional
 
+from actions import SLOTS_PER_LEVEL
 from card import Noble, EvaluationCard
 from config import INITIAL_TOKEN
 from deck import NobleDeck, EvaluationDeck
 from tokens import Tokens
+from zobrist import NOBLE_PLACE, SLOT_PLACE, ZobristHasher
 
 
 class Board:
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng  # for shuffles; None for the module RNG
         self.noble_deck: NobleDeck = NobleDeck()
         self.evaluation_decks: List[EvaluationDeck] = [
             EvaluationDeck(i) for i in range(3)
@@ -19,6 +23,7 @@ class Board:
             [],
         ]  # 4 cards exposed for each deck
         self.exposed_noble_cards: List[Noble] = []
+        self.zobrist: Optional[ZobristHasher] = None  # set by Game
 
     def load_from_files(self, noble_file: str, evaluation_files: List[str]):
         # Load nobles
@@ -29,11 +34,12 @@ class Board:
         for i, eval_file in enumerate(evaluation_files):
             self.evaluation_decks[i].read_from_csv(eval_file)
 
-    def shuffle(self):
-        # Shuffle all decks
-        self.noble_deck.shuffle()
+    def shuffle(self, rng: random.Random = None):
+        # Shuffle all decks, with rng, self.rng or the module RNG
+        rng = rng or self.rng
+        self.noble_deck.shuffle(rng)
         for deck in self.evaluation_decks:
-            deck.shuffle()
+            deck.shuffle(rng)
 
     def start_new_board(self, num_of_players):
         # Reset and expose the top 4 cards of each evaluation deck
@@ -43,18 +49,87 @@ class Board:
         self.exposed_noble_cards = [
             self.noble_deck.get_card() for _ in range(num_of_players + 1)
         ]
-        self.tokens = INITIAL_TOKEN
+        self.tokens = INITIAL_TOKEN.copy()
+
+    def reset(self, num_of_players: int, rng: random.Random = None):
+        """
+        Refills and reshuffles every deck and deals a new board into the existing
+        lists and tokens. Deals the same cards as ``shuffle`` + ``start_new_board``.
+        """
+        self.noble_deck.refill()
+        for deck in self.evaluation_decks:
+            deck.refill()
+        self.shuffle(rng)
+        self.deal(num_of_players)
+
+    def deal(self, num_of_players: int):
+        """Deals a new board from the decks as they are, into the existing lists."""
+        for deck, card_list in zip(
+            self.evaluation_decks, self.exposed_evaluation_cards
+        ):
+            for card_index in range(SLOTS_PER_LEVEL):
+                card = deck.get_card()
+                if card_index < len(card_list):
+                    card_list[card_index] = card
+                else:
+                    card_list.append(card)
+        exposed_nobles = self.exposed_noble_cards
+        del exposed_nobles[num_of_players + 1 :]
+        for card_index in range(num_of_players + 1):
+            card = self.noble_deck.get_card()
+            if card_index < len(exposed_nobles):
+                exposed_nobles[card_index] = card
+            else:
+                exposed_nobles.append(card)
+        self.tokens.set(INITIAL_TOKEN)
 
     def take_evaluation_card(self, deck_index: int, card_index: int) -> EvaluationCard:
         # Take a card from the exposed cards of a specific deck
         card = self.exposed_evaluation_cards[deck_index][card_index]
-        self.exposed_evaluation_cards[deck_index][card_index] = self.evaluation_decks[
-            deck_index
-        ].get_card()
+        replacement = self.evaluation_decks[deck_index].get_card()
+        self.exposed_evaluation_cards[deck_index][card_index] = replacement
+        if self.zobrist is not None:
+            place = SLOT_PLACE + deck_index * SLOTS_PER_LEVEL + card_index
+            self.zobrist.toggle_card(place, card)
+            self.zobrist.toggle_card(place, replacement)
         return card
 
     def take_noble_card(self, card_index: int) -> Noble:
         # Take a card from the exposed cards of a specific deck
         card = self.exposed_noble_cards[card_index]
         self.exposed_noble_cards[card_index] = None
+        if self.zobrist is not None:
+            self.zobrist.toggle_card(NOBLE_PLACE + card_index, card)
         return card
+
+    def exchange_drawn_card(self, deck_index: int, card_index: int, position: int):
+        """
+        Replaces the card just drawn into a board slot by the card at ``position`` of
+        its deck (see ``Deck.exchange``), e.g. to enumerate the possible draws.
+        """
+        drawn = self.exposed_evaluation_cards[deck_index][card_index]
+        card = self.evaluation_decks[deck_index].exchange(position)
+        self.exposed_evaluation_cards[deck_index][card_index] = card
+        if self.zobrist is not None:
+            place = SLOT_PLACE + deck_index * SLOTS_PER_LEVEL + card_index
+            self.zobrist.toggle_card(place, drawn)
+            self.zobrist.toggle_card(place, card)
+
+    def put_back_evaluation_card(
+        self, deck_index: int, card_index: int, card: EvaluationCard, drew: bool
+    ):
+        # Undo take_evaluation_card; drew tells whether the slot was refilled from the deck
+        replacement = self.exposed_evaluation_cards[deck_index][card_index]
+        if drew:
+            self.evaluation_decks[deck_index].rewind()
+        self.exposed_evaluation_cards[deck_index][card_index] = card
+        if self.zobrist is not None:
+            place = SLOT_PLACE + deck_index * SLOTS_PER_LEVEL + card_index
+            self.zobrist.toggle_card(place, replacement)
+            self.zobrist.toggle_card(place, card)
+
+    def put_back_noble_card(self, card_index: int, card: Noble):
+        # Undo take_noble_card
+        self.exposed_noble_cards[card_index] = card
+        if self.zobrist is not None:
+            self.zobrist.toggle_card(NOBLE_PLACE + card_index, card)
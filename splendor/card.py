@@ -5,17 +5,19 @@ from config import NOBLE_SCORE
 from tokens import Tokens
 
 
-@dataclass
+# Cards are immutable and compare by identity; ``id`` is assigned by the catalog
+@dataclass(frozen=True, eq=False)
 class Card(ABC):
     cost: Tokens = field(default_factory=Tokens)
     score: int = 0
+    id: int = field(default=-1, init=False)
 
     @abstractmethod
     def __repr__(self):
         pass
 
 
-@dataclass
+@dataclass(frozen=True, eq=False)
 class Noble(Card):
     def __init__(self, cost: Tokens = None):
         if cost is None:
@@ -26,7 +28,7 @@ class Noble(Card):
         return f"Noble(score={self.score})"
 
 
-@dataclass
+@dataclass(frozen=True, eq=False)
 class EvaluationCard(Card):
     level: int = 1
     bonus: Tokens = field(default_factory=Tokens)
@@ -0,0 +1,102 @@
+import csv
+import hashlib
+import io
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from tokens import TOKEN_TYPES
+
+# Compiled card rows: the cost per token type, the score, then the bonus color as an
+# index into TOKEN_TYPES (-1 when the row has no bonus).
+ROW_SCORE = len(TOKEN_TYPES)
+ROW_BONUS = ROW_SCORE + 1
+ROW_SIZE = ROW_BONUS + 1
+
+MAGIC = b"SPLCARDS"
+VERSION = 1
+# magic, version, row size, number of rows, sha256 of the source CSV
+_HEADER = struct.Struct("<8sHHI32s")
+
+CACHE_SUFFIX = ".cards"
+
+
+def cache_path(csv_path: str) -> str:
+    """Returns where the compiled form of ``csv_path`` is stored."""
+    return os.fspath(csv_path) + CACHE_SUFFIX
+
+
+def parse_csv(data: bytes) -> np.ndarray:
+    """Parses the bytes of a card CSV into an (rows, ROW_SIZE) int8 array."""
+    rows = []
+    for row in csv.DictReader(io.StringIO(data.decode())):
+        values = [int(row.get(token, 0)) for token in TOKEN_TYPES]
+        values.append(int(row.get("score", 0)))
+        bonus = row.get("bonus", None)
+        values.append(TOKEN_TYPES.index(bonus) if bonus else -1)
+        rows.append(values)
+    array = np.array(rows, dtype=np.int64).reshape(-1, ROW_SIZE)
+    if array.size and (array.min() < -128 or array.max() > 127):
+        raise ValueError("Card values must fit in a signed byte.")
+    return array.astype(np.int8)
+
+
+def _read_cache(path: str, digest: bytes):
+    try:
+        with open(path, "rb") as file:
+            header = file.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, row_size, num_rows, cached_digest = _HEADER.unpack(header)
+    if (magic, version, row_size, cached_digest) != (MAGIC, VERSION, ROW_SIZE, digest):
+        return None
+    if os.path.getsize(path) != _HEADER.size + num_rows * ROW_SIZE:
+        return None
+    if not num_rows:
+        return np.zeros((0, ROW_SIZE), dtype=np.int8)
+    return np.memmap(
+        path, dtype=np.int8, mode="r", offset=_HEADER.size, shape=(num_rows, ROW_SIZE)
+    )
+
+
+def _write_cache(path: str, digest: bytes, rows: np.ndarray):
+    # Write to a temporary file and rename, so concurrent readers never see a
+    # partial file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, ROW_SIZE, len(rows), digest))
+            file.write(rows.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_card_rows(csv_path: str) -> np.ndarray:
+    """
+    Returns the compiled rows of a card CSV as a read-only memory map.
+
+    The compiled file next to the CSV is checked against the CSV's sha256 and
+    rebuilt when it is missing, stale or corrupt. If it cannot be written (e.g. a
+    read-only data directory) the freshly parsed rows are returned instead.
+    """
+    with open(csv_path, "rb") as file:
+        data = file.read()
+    digest = hashlib.sha256(data).digest()
+    path = cache_path(csv_path)
+    rows = _read_cache(path, digest)
+    if rows is not None:
+        return rows
+    rows = parse_csv(data)
+    try:
+        _write_cache(path, digest, rows)
+    except OSError:
+        rows.flags.writeable = False
+        return rows
+    return _read_cache(path, digest)
@@ -0,0 +1,111 @@
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from card import Card, EvaluationCard
+from card_cache import load_card_rows
+from tokens import TOKEN_TYPES
+
+# Decks store card ids as unsigned 16-bit integers
+MAX_CARDS = 1 << 16
+
+
+class CardCatalog:
+    """
+    Process-wide registry of the cards read from CSV files.
+
+    Each file is parsed once per level and its cards are shared by every deck that
+    loads it, so all games in a process hold the same card objects. Every card gets a
+    stable integer ``id`` (its index in ``cards``) and ``cost``, ``bonus``, ``score``
+    and ``level`` are arrays indexed by that id. A file is read again only when it
+    changes on disk, and its cards are then added anew, so ids are never reused.
+    Adding more than ``MAX_CARDS`` cards raises ``OverflowError``.
+    """
+
+    def __init__(self):
+        self.cards: List[Card] = []
+        self._files: Dict[tuple, Tuple[tuple, Tuple[Card, ...]]] = {}
+        self._arrays: Optional[Tuple[np.ndarray, ...]] = None
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __getitem__(self, card_id: int) -> Card:
+        return self.cards[card_id]
+
+    def load(
+        self,
+        file_path: str,
+        level: Optional[int],
+        read_card: Callable[[List[int]], Card],
+    ) -> Tuple[Card, ...]:
+        """
+        Returns the cards of ``file_path`` for ``level``, building each compiled row
+        (see ``card_cache``) with ``read_card`` the first time the file is seen.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        entry = self._files.get((path, level))
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        rows = load_card_rows(path).tolist()
+        self._check_room(len(rows))
+        cards = tuple(self.add(read_card(row)) for row in rows)
+        self._files[(path, level)] = (version, cards)
+        return cards
+
+    def add(self, card: Card) -> Card:
+        """Gives ``card`` the next id and registers it; returns the card."""
+        if card.id >= 0:
+            raise ValueError(f"Card already has id {card.id}.")
+        self._check_room(1)
+        object.__setattr__(card, "id", len(self.cards))
+        self.cards.append(card)
+        self._arrays = None
+        return card
+
+    def _check_room(self, count: int):
+        if len(self.cards) + count > MAX_CARDS:
+            raise OverflowError(
+                f"Cannot add {count} cards to a catalog of {len(self.cards)}: card "
+                f"ids must stay below {MAX_CARDS}."
+            )
+
+    def _build_arrays(self) -> Tuple[np.ndarray, ...]:
+        if self._arrays is None:
+            num_cards = len(self.cards)
+            cost = np.zeros((num_cards, len(TOKEN_TYPES)), dtype=np.int16)
+            bonus = np.zeros((num_cards, len(TOKEN_TYPES)), dtype=np.int16)
+            score = np.zeros(num_cards, dtype=np.int16)
+            level = np.full(num_cards, -1, dtype=np.int16)  # -1 for nobles
+            for card_id, card in enumerate(self.cards):
+                cost[card_id] = card.cost.as_tuple()
+                score[card_id] = card.score
+                if isinstance(card, EvaluationCard):
+                    bonus[card_id] = card.bonus.as_tuple()
+                    level[card_id] = card.level
+            for array in (cost, bonus, score, level):
+                array.flags.writeable = False
+            self._arrays = (cost, bonus, score, level)
+        return self._arrays
+
+    @property
+    def cost(self) -> np.ndarray:
+        return self._build_arrays()[0]
+
+    @property
+    def bonus(self) -> np.ndarray:
+        return self._build_arrays()[1]
+
+    @property
+    def score(self) -> np.ndarray:
+        return self._build_arrays()[2]
+
+    @property
+    def level(self) -> np.ndarray:
+        return self._build_arrays()[3]
+
+
+CATALOG = CardCatalog()
@@ -1,6 +1,6 @@
-from tokens import Tokens
+from tokens import FrozenTokens
 
-INITIAL_TOKEN = Tokens(
+INITIAL_TOKEN = FrozenTokens(
     red=7,
     green=7,
     blue=7,
@@ -1,64 +1,195 @@
 from abc import ABC, abstractmethod
-from typing import Type, List, Optional
-import csv
+from array import array
+from typing import Dict, Type, List, Optional, Tuple
 import random
 
 from card import Card, Noble, EvaluationCard
-from tokens import Tokens
+from card_cache import ROW_BONUS, ROW_SCORE
+from catalog import CATALOG, MAX_CARDS
+from tokens import FrozenTokens, Tokens, TOKEN_TYPES
+
+NO_TOKENS = FrozenTokens()
+
+# Bonus of a card per bonus color index of a compiled row
+BONUS_TOKENS = tuple(FrozenTokens(**{token: 1}) for token in TOKEN_TYPES)
 
 
 class Deck(ABC):
+    """
+    Cards stored as catalog ids: ``order`` is a permutation of the deck and the
+    first ``size`` entries are the cards still in it, the top one last. Drawing only
+    moves the ``size`` pointer, so ``rewind`` puts drawn cards back for free, and the
+    score (and bonus) of the remaining cards is kept up to date incrementally.
+    Cards added from outside the catalog get ids local to the deck, counting down
+    from the top of the id range, and are not registered in the catalog.
+    """
+
     def __init__(self):
-        self.cards: List[Card] = []
+        self.order = array('H')
+        self.size = 0
+        self._loaded = array('H')  # every card read from CSV, for refill
+        self._score = 0
+        self._loaded_score = 0
+        self.rng: Optional[random.Random] = None  # None for the module RNG
+        self._foreign: Dict[int, Card] = {}  # local id -> card outside the catalog
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def cards(self) -> Tuple[Card, ...]:
+        """
+        The cards still in the deck, bottom to top. Read-only: use ``add_card`` and
+        ``get_card`` to change the deck.
+        """
+        if self._foreign:
+            return tuple(self._card(card_id) for card_id in self.order[:self.size])
+        catalog_cards = CATALOG.cards
+        return tuple(catalog_cards[card_id] for card_id in self.order[:self.size])
+
+    def _card(self, card_id: int) -> Card:
+        card = self._foreign.get(card_id)
+        return CATALOG.cards[card_id] if card is None else card
 
     @staticmethod
     def _read_cost(row) -> Tokens:
-        """Helper method to parse token costs from a CSV row."""
-        return Tokens(
-            red=int(row.get("red", 0)),
-            green=int(row.get("green", 0)),
-            blue=int(row.get("blue", 0)),
-            white=int(row.get("white", 0)),
-            black=int(row.get("black", 0)),
-            gold=int(row.get("gold", 0)),
-        )
+        """Helper method to read token costs from a compiled card row."""
+        return FrozenTokens(*row[:ROW_SCORE])
 
     @staticmethod
     def _read_bonus(row) -> Tokens:
-        """Helper method to parse bonus tokens from a CSV row."""
-        bonus = row.get("bonus", None)
-        if not bonus:
+        """Helper method to read bonus tokens from a compiled card row."""
+        bonus = row[ROW_BONUS]
+        if bonus < 0:
             raise ValueError("Bonus field is missing or empty in the row")
-        return Tokens(
-            red=int(bonus == "red"),
-            green=int(bonus == "green"),
-            blue=int(bonus == "blue"),
-            white=int(bonus == "white"),
-            black=int(bonus == "black"),
-            gold=int(bonus == "gold"),
-        )
+        return BONUS_TOKENS[bonus]
 
     @staticmethod
     def _read_score(row) -> int:
-        """Helper method to parse the score from a CSV row."""
-        return int(row.get("score", 0))
+        """Helper method to read the score from a compiled card row."""
+        return row[ROW_SCORE]
 
     @abstractmethod
     def read_from_csv(self, file_path: str):
         """Abstract method to populate the deck from a CSV file."""
         pass
 
-    def shuffle(self):
-        """Shuffles the cards in the deck."""
-        random.shuffle(self.cards)
+    def shuffle(self, rng: random.Random = None):
+        """Shuffles the deck with ``rng``, else ``self.rng``, else the module RNG."""
+        # Shuffling a list is faster than shuffling the array in place
+        remaining = self.order[:self.size].tolist()
+        (rng or self.rng or random).shuffle(remaining)
+        self.order[:self.size] = array('H', remaining)
+
+    def refill(self):
+        """Puts every card read from CSV back into the deck, in file order."""
+        self.order[:] = self._loaded
+        self.size = len(self.order)
+        self._restore_loaded_totals()
+
+    def clear(self):
+        """Empties the deck."""
+        self.size = 0
+        self._reset_totals()
 
     def get_card(self) -> Optional[Card]:
         """Removes and returns the top card from the deck."""
-        return self.cards.pop() if self.cards else None
+        if not self.size:
+            return None
+        self.size -= 1
+        if self._foreign:
+            card = self._card(self.order[self.size])
+        else:
+            card = CATALOG.cards[self.order[self.size]]
+        self._count(card, -1)
+        return card
+
+    def rewind(self, count: int = 1):
+        """Puts the last ``count`` drawn cards back on top, undoing ``get_card``."""
+        card = self._card if self._foreign else CATALOG.cards.__getitem__
+        order = self.order
+        for _ in range(count):
+            self._count(card(order[self.size]), 1)
+            self.size += 1
+
+    def exchange(self, position: int) -> Card:
+        """
+        Swaps the last card drawn with the card at ``position`` among those still in
+        the deck, as if that one had been drawn instead, and returns it. Exchanging
+        the same position again swaps them back.
+        """
+        order = self.order
+        drawn_id, other_id = order[self.size], order[position]
+        order[self.size], order[position] = other_id, drawn_id
+        self._count(self._card(drawn_id), 1)
+        other = self._card(other_id)
+        self._count(other, -1)
+        return other
+
+    def add_card(self, card: Card):
+        """Puts ``card`` on top of the deck."""
+        card_id = card.id if card.id >= 0 else self._foreign_id(card)
+        if self.size < len(self.order):
+            self.order[self.size] = card_id
+        else:
+            self.order.append(card_id)
+        self.size += 1
+        self._count(card, 1)
+
+    def _foreign_id(self, card: Card) -> int:
+        for card_id, foreign in self._foreign.items():
+            if foreign is card:
+                return card_id
+        card_id = MAX_CARDS - 1 - len(self._foreign)
+        if card_id < len(CATALOG):
+            raise OverflowError('No card id left for a card outside the catalog.')
+        self._foreign[card_id] = card
+        return card_id
+
+    def state(self) -> bytes:
+        """The ids of the cards in the deck, for ``set_state``."""
+        return self.order[:self.size].tobytes()
+
+    def set_state(self, state: bytes):
+        """Makes the deck hold the cards saved by ``state``."""
+        self.order = array('H', state)
+        self.size = 0
+        self._reset_totals()
+        self.rewind(len(self.order))
+
+    def positions(self, card_ids) -> List[int]:
+        """Positions in the order read from CSV of the given loaded card ids."""
+        index = {card_id: position for position, card_id in enumerate(self._loaded)}
+        return [index[card_id] for card_id in card_ids]
+
+    def set_positions(self, positions):
+        """Makes the deck hold the loaded cards at ``positions``, bottom to top."""
+        loaded = self._loaded
+        self.set_state(array('H', [loaded[position] for position in positions]))
+
+    def _add_cards(self, cards):
+        self._restore_loaded_totals()
+        for card in cards:
+            self._loaded.append(card.id)
+            self._count(card, 1)
+        self._save_loaded_totals()
+        self.refill()
+
+    def _save_loaded_totals(self):
+        self._loaded_score = self._score
+
+    def _restore_loaded_totals(self):
+        self._score = self._loaded_score
+
+    def _reset_totals(self):
+        self._score = 0
+
+    def _count(self, card: Card, sign: int):
+        self._score += sign * card.score
 
     @property
     def score(self) -> int:
-        return sum(card.score for card in self.cards)
+        return self._score
 
 
 class NobleDeck(Deck):
@@ -66,29 +197,51 @@ class NobleDeck(Deck):
         super().__init__()
 
     def read_from_csv(self, file_path: str):
-        """Populates the deck with Noble cards from a CSV file."""
-        with open(file_path, mode='r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                cost = Deck._read_cost(row)  # Use the static method from Deck
-                self.cards.append(Noble(cost=cost))
+        """Populates the deck with the catalog's Noble cards of a CSV file."""
+        self._add_cards(CATALOG.load(file_path, None, self._read_card))
+
+    @staticmethod
+    def _read_card(row) -> Noble:
+        return Noble(cost=Deck._read_cost(row))  # Use the static method from Deck
 
 
 class EvaluationDeck(Deck):
     def __init__(self, level: int):
+        self._bonus = Tokens()
+        self._loaded_bonus = Tokens()
         super().__init__()
         self.level = level
 
     def read_from_csv(self, file_path: str):
-        """Populates the deck with EvaluationCard cards from a CSV file."""
-        with open(file_path, mode='r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                cost = Deck._read_cost(row)  # Use the static method from Deck
-                score = Deck._read_score(row)
-                bonus = Deck._read_bonus(row)
-                self.cards.append(EvaluationCard(cost=cost, score=score, bonus=bonus, level=self.level))
+        """Populates the deck with the catalog's EvaluationCard cards from a CSV file."""
+        self._add_cards(CATALOG.load(file_path, self.level, self._read_card))
+
+    def _read_card(self, row) -> EvaluationCard:
+        cost = Deck._read_cost(row)  # Use the static method from Deck
+        score = Deck._read_score(row)
+        bonus = Deck._read_bonus(row)
+        return EvaluationCard(cost=cost, score=score, bonus=bonus, level=self.level)
+
+    def _save_loaded_totals(self):
+        super()._save_loaded_totals()
+        self._loaded_bonus.set(self._bonus)
+
+    def _restore_loaded_totals(self):
+        super()._restore_loaded_totals()
+        self._bonus.set(self._loaded_bonus)
+
+    def _reset_totals(self):
+        super()._reset_totals()
+        self._bonus.set(NO_TOKENS)
+
+    def _count(self, card: EvaluationCard, sign: int):
+        super()._count(card, sign)
+        if sign > 0:
+            self._bonus += card.bonus
+        else:
+            self._bonus -= card.bonus
 
     @property
     def bonus(self) -> Tokens:
-        return sum((card.bonus for card in self.cards), Tokens())
+        """Bonus of the cards in the deck. Do not modify."""
+        return self._bonus
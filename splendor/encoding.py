@@ -0,0 +1,183 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from actions import NUM_BOARD_SLOTS
+from card import Card, EvaluationCard
+from config import MAX_RESERVED_CARDS
+from tokens import COLORS, TOKEN_TYPES
+
+NUM_COLORS = len(COLORS)
+NUM_TOKEN_TYPES = len(TOKEN_TYPES)
+
+# present flag, cost per color, bonus per color, score
+CARD_SIZE = 1 + NUM_COLORS + NUM_COLORS + 1
+# present flag, cost per color
+NOBLE_SIZE = 1 + NUM_COLORS
+# tokens, bonus per color, score, reserved cards
+PLAYER_SIZE = NUM_TOKEN_TYPES + NUM_COLORS + 1 + MAX_RESERVED_CARDS * CARD_SIZE
+
+
+class ObservationEncoder:
+    """
+    Writes the observable state of a game into a flat vector of ``size`` values.
+
+    Layout: board tokens, the 12 exposed evaluation cards, the exposed nobles, one
+    block per player starting from the perspective player (tokens, bonuses, score,
+    reserved cards), the current player one-hot relative to the perspective player and
+    the number of rounds. Counts are written as-is, empty slots as zeros.
+
+    ``encode`` and ``encode_batch`` write into caller-supplied buffers and allocate
+    nothing per call apart from one cached feature row per catalog card seen.
+    """
+
+    def __init__(self, num_of_players: int, dtype=np.float32):
+        self.num_of_players = num_of_players
+        self.num_noble_slots = num_of_players + 1
+        self.dtype = np.dtype(dtype)
+
+        self.board_tokens_offset = 0
+        self.cards_offset = self.board_tokens_offset + NUM_TOKEN_TYPES
+        self.nobles_offset = self.cards_offset + NUM_BOARD_SLOTS * CARD_SIZE
+        self.players_offset = self.nobles_offset + self.num_noble_slots * NOBLE_SIZE
+        self.current_player_offset = self.players_offset + num_of_players * PLAYER_SIZE
+        self.rounds_offset = self.current_player_offset + num_of_players
+        self.size = self.rounds_offset + 1
+
+        self._card_rows: Dict[int, Tuple[Card, np.ndarray]] = {}
+        self._empty_card = np.zeros(CARD_SIZE, dtype=self.dtype)
+        self._vec_tables_cache = None
+
+    def _card_row(self, card: Optional[Card]) -> np.ndarray:
+        if card is None:
+            return self._empty_card
+        entry = self._card_rows.get(card.id)
+        if entry is None or entry[0] is not card:
+            row = np.zeros(CARD_SIZE, dtype=self.dtype)
+            row[0] = 1
+            row[1 : 1 + NUM_COLORS] = card.cost.as_tuple()[:NUM_COLORS]
+            if isinstance(card, EvaluationCard):
+                row[1 + NUM_COLORS : -1] = card.bonus.as_tuple()[:NUM_COLORS]
+            row[-1] = card.score
+            entry = self._card_rows[card.id] = (card, row)
+        return entry[1]
+
+    def encode(
+        self, game, out: Optional[np.ndarray] = None, perspective: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Encodes ``game`` as seen by player ``perspective`` (the current player by
+        default) into ``out``, a vector of ``size`` values, and returns it.
+        """
+        if out is None:
+            out = np.empty(self.size, dtype=self.dtype)
+        if perspective is None:
+            perspective = game.current_player_id
+        board = game.board
+
+        out[: self.cards_offset] = board.tokens.as_tuple()
+
+        offset = self.cards_offset
+        for card_list in board.exposed_evaluation_cards:
+            for card in card_list:
+                out[offset : offset + CARD_SIZE] = self._card_row(card)
+                offset += CARD_SIZE
+
+        offset = self.nobles_offset
+        out[offset : self.players_offset] = 0
+        for noble in board.exposed_noble_cards[: self.num_noble_slots]:
+            if noble is not None:
+                out[offset : offset + NOBLE_SIZE] = self._card_row(noble)[:NOBLE_SIZE]
+            offset += NOBLE_SIZE
+
+        offset = self.players_offset
+        num_of_players = self.num_of_players
+        for seat in range(num_of_players):
+            player = game.players[(perspective + seat) % num_of_players]
+            out[offset : offset + NUM_TOKEN_TYPES] = player.tokens.as_tuple()
+            offset += NUM_TOKEN_TYPES
+            out[offset : offset + NUM_COLORS] = player.bonuses.as_tuple()[:NUM_COLORS]
+            offset += NUM_COLORS
+            out[offset] = player.score
+            offset += 1
+            reserved_cards = player.reserved_cards
+            for index in range(MAX_RESERVED_CARDS):
+                card = reserved_cards[index] if index < len(reserved_cards) else None
+                out[offset : offset + CARD_SIZE] = self._card_row(card)
+                offset += CARD_SIZE
+
+        out[self.current_player_offset : self.rounds_offset] = 0
+        out[
+            self.current_player_offset
+            + (game.current_player_id - perspective) % num_of_players
+        ] = 1
+        out[self.rounds_offset] = game.rounds
+        return out
+
+    def encode_batch(
+        self, games: Sequence, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Encodes each game from its current player's view into row i of ``out``."""
+        if out is None:
+            out = np.empty((len(games), self.size), dtype=self.dtype)
+        for row, game in zip(out, games):
+            self.encode(game, row)
+        return out
+
+    def encode_vec_game(self, vec, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encodes every game of a ``VecGame`` from its current player's view into an
+        (num_envs, size) array, using the same layout as ``encode``.
+        """
+        num_envs = vec.num_envs
+        if out is None:
+            out = np.empty((num_envs, self.size), dtype=self.dtype)
+        card_table, noble_table = self._vec_tables(vec)
+
+        out[:, : self.cards_offset] = vec.board_tokens
+        out[:, self.cards_offset : self.nobles_offset] = card_table[
+            vec.exposed.reshape(num_envs, NUM_BOARD_SLOTS)
+        ].reshape(num_envs, -1)
+        out[:, self.nobles_offset : self.players_offset] = noble_table[
+            vec.nobles
+        ].reshape(num_envs, -1)
+
+        env = np.arange(num_envs)[:, None]
+        seats = (vec.current_player[:, None] + np.arange(self.num_of_players)) % (
+            self.num_of_players
+        )
+        players = out[:, self.players_offset : self.current_player_offset].reshape(
+            num_envs, self.num_of_players, PLAYER_SIZE
+        )
+        players[:, :, :NUM_TOKEN_TYPES] = vec.player_tokens[env, seats]
+        offset = NUM_TOKEN_TYPES
+        players[:, :, offset : offset + NUM_COLORS] = vec.bonuses[
+            env, seats, :NUM_COLORS
+        ]
+        offset += NUM_COLORS
+        players[:, :, offset] = vec.scores[env, seats]
+        offset += 1
+        players[:, :, offset:] = card_table[vec.reserved[env, seats]].reshape(
+            num_envs, self.num_of_players, -1
+        )
+
+        out[:, self.current_player_offset : self.rounds_offset] = 0
+        out[:, self.current_player_offset] = 1
+        out[:, self.rounds_offset] = vec.rounds
+        return out
+
+    def _vec_tables(self, vec) -> Tuple[np.ndarray, np.ndarray]:
+        # Rows per card id; the last row stays zero so EMPTY (-1) encodes as empty
+        if self._vec_tables_cache is not None and self._vec_tables_cache[0] is vec:
+            return self._vec_tables_cache[1]
+        card_table = np.zeros((len(vec.card_score), CARD_SIZE), dtype=self.dtype)
+        card_table[:-1, 0] = 1
+        card_table[:-1, 1 : 1 + NUM_COLORS] = vec.card_cost[:-1, :NUM_COLORS]
+        card_table[:-1, 1 + NUM_COLORS : -1] = vec.card_bonus[:-1, :NUM_COLORS]
+        card_table[:-1, -1] = vec.card_score[:-1]
+        noble_table = np.zeros((len(vec.noble_score), NOBLE_SIZE), dtype=self.dtype)
+        noble_table[:-1, 0] = 1
+        noble_table[:-1, 1:] = vec.noble_cost[:-1, :NUM_COLORS]
+        tables = (card_table, noble_table)
+        self._vec_tables_cache = (vec, tables)
+        return tables
@@ -0,0 +1,327 @@
+import math
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from actions import (
+    BUY_EVALUATION_OFFSET,
+    BUY_RESERVED_OFFSET,
+    NUM_ACTIONS,
+    RESERVE_WITH_GOLD_OFFSET,
+    RESERVE_WITHOUT_GOLD_OFFSET,
+    SLOTS_PER_LEVEL,
+    WITHDRAWAL_OFFSET,
+)
+from agents import Agent
+from config import SCORE_TO_WIN
+from mcts import Evaluator, RolloutEvaluator, outcome
+from withdrawal import WITHDRAWAL_PATTERNS
+
+# Transposition table bounds
+EXACT, LOWER, UPPER = 0, 1, 2
+# Depth stored for values that no heuristic leaf contributed to
+SOLVED = 1 << 30
+
+_WITHDRAWAL_SIZES = [pattern.count for pattern in WITHDRAWAL_PATTERNS]
+# Move order within the reserves: with gold first
+_RESERVE_ORDER = list(range(RESERVE_WITH_GOLD_OFFSET, NUM_ACTIONS)) + list(
+    range(RESERVE_WITHOUT_GOLD_OFFSET, RESERVE_WITH_GOLD_OFFSET)
+)
+# Withdrawals taking the most tokens first, withdrawing nothing last
+_WITHDRAWAL_ORDER = sorted(
+    range(len(WITHDRAWAL_PATTERNS)), key=lambda index: -_WITHDRAWAL_SIZES[index]
+)
+
+
+class EndgameResult(NamedTuple):
+    value: float  # expected outcome of the player to move, in [0, 1]
+    values: Tuple[float, ...]  # expected outcome per player along the best line
+    action: Optional[int]  # best action found
+    depth: int  # plies of the deepest completed search
+    exact: bool  # whether every line was searched to the end of the game
+    low: float  # bounds on the exact value
+    high: float
+    nodes: int
+
+
+def is_endgame(game, score_margin: int = 3, rounds_left: int = 1) -> bool:
+    """
+    Whether some player is within ``score_margin`` points of ``SCORE_TO_WIN`` or at
+    most ``rounds_left`` rounds remain before ``max_rounds``.
+    """
+    return (
+        game.max_score() >= SCORE_TO_WIN - score_margin
+        or game.max_rounds - game.rounds < rounds_left
+    )
+
+
+class _Timeout(Exception):
+    pass
+
+
+class EndgameSolver:
+    """
+    Depth-limited expectimax with alpha-beta over ``Game.apply`` / ``Game.undo``.
+
+    Values are the ``outcome`` of the root player (the player to move in ``solve``),
+    which it maximizes while every opponent minimizes it: exact minimax for two
+    players once someone reaches ``SCORE_TO_WIN`` (outcomes then sum to 1), the
+    paranoid assumption otherwise. The ``outcome`` of every player is carried along,
+    so results also give each player's expected outcome. Refilling a board slot is a
+    chance node: every card left in that deck (the one actually on top included) is
+    an equally likely draw, enumerated with ``Board.exchange_drawn_card``.
+
+    ``solve`` deepens one ply at a time until the game is solved, ``max_depth`` or
+    ``time_limit`` seconds. Leaves cut off by depth are scored by ``leaf``, a value
+    per player on the scale of ``outcome`` (by default ``outcome`` itself, whose
+    progress estimate also scores games ended by ``max_rounds``); a result is exact
+    when no leaf was needed. Else, with ``bounds``, the last depth is searched again
+    with every leaf scored 0 and then 1, which bounds the exact value. Moves are
+    ordered best move of the transposition table first, then buys (highest score
+    first), reserves and withdrawals (largest first). The table maps (hash, rounds,
+    max rounds, root player) to (depth, value, values, bound, best action) and
+    persists across calls, as ``Game.hash`` is equal for equal states of any game.
+    """
+
+    def __init__(
+        self,
+        time_limit: Optional[float] = 1.0,
+        max_depth: int = 12,
+        bounds: bool = True,
+        leaf: Callable[[object], Sequence[float]] = outcome,
+        max_table_size: int = 1_000_000,
+    ):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.bounds = bounds
+        self.leaf = leaf
+        self.max_table_size = max_table_size
+        self.tables: Dict[str, Dict[tuple, tuple]] = {}
+        self.nodes = 0
+        self._deadline = math.inf
+        self._root = 0
+        self._leaf: Callable[[object], Sequence[float]] = None
+        self._table: Dict[tuple, tuple] = {}
+        self._heuristic_leaves = 0
+        self._masks: List[np.ndarray] = []
+
+    def solve(self, game) -> EndgameResult:
+        if game.end:
+            raise ValueError("Cannot solve a finished game.")
+        self.nodes = 0
+        self._root = game.current_player_id
+        start = time.perf_counter()
+        deadline = math.inf if self.time_limit is None else start + self.time_limit
+
+        value, values, action, depth, exact = 0.0, (), None, 0, False
+        for search_depth in range(1, self.max_depth + 1):
+            # The first iteration always completes, so there is a move to return
+            self._deadline = deadline if search_depth > 1 else math.inf
+            try:
+                result = self._search_root(game, search_depth, "estimate")
+            except _Timeout:
+                break
+            value, values, action, exact = result
+            depth = search_depth
+            if exact:
+                break
+
+        low = high = value
+        if not exact:
+            low, high = 0.0, 1.0
+            if self.bounds:
+                self._deadline = deadline
+                try:
+                    low = self._search_root(game, depth, "low")[0]
+                    high = self._search_root(game, depth, "high")[0]
+                except _Timeout:
+                    pass
+        return EndgameResult(value, values, action, depth, exact, low, high, self.nodes)
+
+    def _search_root(
+        self, game, depth: int, mode: str
+    ) -> Tuple[float, Tuple[float, ...], int, bool]:
+        if mode == "estimate":
+            self._leaf = self.leaf
+        else:
+            constant = (0.0 if mode == "low" else 1.0,) * len(game.players)
+            self._leaf = lambda state: constant
+        self._table = self.tables.setdefault(mode, {})
+        if len(self._table) > self.max_table_size:
+            self._table.clear()
+        while len(self._masks) <= depth:
+            self._masks.append(np.zeros(NUM_ACTIONS, dtype=bool))
+        self._heuristic_leaves = 0
+        value, values = self._search(game, depth, 0.0, 1.0)
+        entry = self._table[self._key(game)]
+        return value, values, entry[4], self._heuristic_leaves == 0
+
+    def _key(self, game) -> tuple:
+        return game.hash, game.rounds, game.max_rounds, self._root
+
+    def _search(
+        self, game, depth: int, alpha: float, beta: float
+    ) -> Tuple[float, Tuple[float, ...]]:
+        # Returns the root player's value and the value of every player
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self._deadline:
+            raise _Timeout()
+        if game.end:
+            values = tuple(outcome(game))
+            return values[self._root], values
+        if not depth:
+            self._heuristic_leaves += 1
+            values = tuple(self._leaf(game))
+            return values[self._root], values
+
+        key = self._key(game)
+        entry = self._table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, value, values, bound, first = entry
+            if entry_depth >= depth:
+                if entry_depth != SOLVED:
+                    self._heuristic_leaves += 1
+                if bound == EXACT:
+                    return value, values
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, values
+
+        original_alpha, original_beta = alpha, beta
+        heuristic_leaves = self._heuristic_leaves
+        maximizing = game.current_player_id == self._root
+        best_value = -math.inf if maximizing else math.inf
+        best_values = best_action = None
+        for action in self._ordered_actions(game, depth, first):
+            value, values = self._child_value(game, action, depth, alpha, beta)
+            if maximizing:
+                if value > best_value:
+                    best_value, best_values, best_action = value, values, action
+                alpha = max(alpha, value)
+            else:
+                if value < best_value:
+                    best_value, best_values, best_action = value, values, action
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= original_beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        solved = self._heuristic_leaves == heuristic_leaves
+        self._table[key] = (
+            SOLVED if solved else depth,
+            best_value,
+            best_values,
+            bound,
+            best_action,
+        )
+        return best_value, best_values
+
+    def _child_value(
+        self, game, action: int, depth: int, alpha: float, beta: float
+    ) -> Tuple[float, Tuple[float, ...]]:
+        record = game.apply(action)
+        try:
+            if not record.drew:
+                return self._search(game, depth - 1, alpha, beta)
+            board = game.board
+            deck_index, card_index = record.deck_index, record.card_index
+            remaining = len(board.evaluation_decks[deck_index])
+            # Chance node: the drawn card or any card still in the deck
+            totals = list(self._search(game, depth - 1, 0.0, 1.0)[1])
+            for position in range(remaining):
+                board.exchange_drawn_card(deck_index, card_index, position)
+                try:
+                    values = self._search(game, depth - 1, 0.0, 1.0)[1]
+                finally:
+                    board.exchange_drawn_card(deck_index, card_index, position)
+                for player_id, value in enumerate(values):
+                    totals[player_id] += value
+            values = tuple(total / (remaining + 1) for total in totals)
+            return values[self._root], values
+        finally:
+            game.undo(record)
+
+    def _ordered_actions(self, game, depth: int, first: Optional[int]) -> List[int]:
+        mask = game.legal_action_mask(self._masks[depth])
+        board = game.board
+        player = game.players[game.current_player_id]
+
+        buys = []
+        for slot in np.flatnonzero(
+            mask[BUY_EVALUATION_OFFSET:BUY_RESERVED_OFFSET]
+        ).tolist():
+            card = board.exposed_evaluation_cards[slot // SLOTS_PER_LEVEL][
+                slot % SLOTS_PER_LEVEL
+            ]
+            buys.append((-card.score, BUY_EVALUATION_OFFSET + slot))
+        for index in np.flatnonzero(
+            mask[BUY_RESERVED_OFFSET:RESERVE_WITHOUT_GOLD_OFFSET]
+        ).tolist():
+            buys.append(
+                (-player.reserved_cards[index].score, BUY_RESERVED_OFFSET + index)
+            )
+        buys.sort()
+
+        actions = [action for _, action in buys]
+        actions.extend(action for action in _RESERVE_ORDER if mask[action])
+        actions.extend(
+            WITHDRAWAL_OFFSET + index
+            for index in _WITHDRAWAL_ORDER
+            if mask[WITHDRAWAL_OFFSET + index]
+        )
+        if first is not None and first in actions:
+            actions.remove(first)
+            actions.insert(0, first)
+        return actions
+
+
+class EndgameEvaluator:
+    """
+    An ``MCTS`` evaluator that returns solved values in endgames (see
+    ``is_endgame``) and defers to ``fallback`` elsewhere or when the solver could
+    not finish. Solved values are each player's expected ``outcome``.
+    """
+
+    def __init__(
+        self,
+        solver: Optional[EndgameSolver] = None,
+        fallback: Optional[Evaluator] = None,
+    ):
+        self.solver = solver or EndgameSolver(time_limit=0.05, bounds=False)
+        self.fallback = fallback or RolloutEvaluator(max_steps=10)
+
+    def __call__(self, game):
+        if game.end or not is_endgame(game):
+            return self.fallback(game)
+        result = self.solver.solve(game)
+        if not result.exact:
+            return self.fallback(game)
+        return None, list(result.values)
+
+
+class EndgameAgent(Agent):
+    """Plays the solver's move in endgames and ``fallback``'s elsewhere."""
+
+    def __init__(self, fallback: Agent, solver: Optional[EndgameSolver] = None):
+        self.fallback = fallback
+        self.solver = solver or EndgameSolver()
+
+    def select_action(self, game) -> int:
+        if is_endgame(game):
+            return self.solver.solve(game).action
+        return self.fallback.select_action(game)
+
+    def reset(self, rng: Optional[random.Random] = None):
+        self.fallback.reset(rng)
+        self.solver.tables.clear()
@@ -0,0 +1,211 @@
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from actions import NUM_ACTIONS
+from config import SCORE_TO_WIN
+from encoding import ObservationEncoder
+from game import Game
+from seeding import game_seed
+from vec_game import VecGame
+
+
+class SplendorEnv:
+    """
+    Multi-agent environment over one ``Game`` with the fixed action space of
+    ``actions``.
+
+    Players take turns; ``agent_selection`` is the player to act and ``observe`` gives
+    any player's view. ``reset`` and ``step`` return the acting player's observation
+    and keep its legal action mask in ``info["action_mask"]``. The reward of each
+    player is the score it gained during the step divided by ``SCORE_TO_WIN``. A game
+    won on score is terminated, one stopped by ``max_rounds`` truncated.
+
+    Observations, masks and rewards are views into buffers owned by the environment
+    and are overwritten by the next call; copy them to keep them. Game ``k`` after
+    ``reset(seed)`` is dealt from ``seeding.game_seed(seed, k)``.
+    """
+
+    def __init__(
+        self,
+        noble_file: str,
+        evaluation_files: List[str],
+        num_of_players: int = 2,
+        max_rounds: int = 100,
+    ):
+        self.game = Game()
+        self.game.setup_game(noble_file, evaluation_files, num_of_players, max_rounds)
+        self.encoder = ObservationEncoder(num_of_players)
+        self.num_of_players = num_of_players
+        self.possible_agents = list(range(num_of_players))
+        self.observation_size = self.encoder.size
+        self.num_actions = NUM_ACTIONS
+
+        self.observations = np.zeros(
+            (num_of_players, self.encoder.size), dtype=self.encoder.dtype
+        )
+        self.action_mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        self.rewards = np.zeros(num_of_players, dtype=np.float32)
+        self._scores = np.zeros(num_of_players, dtype=np.float32)
+        self._info: Dict[str, Any] = {"action_mask": self.action_mask, "player": 0}
+        self._run_seed: Optional[int] = None
+        self._games = 0
+        self.terminated = False
+        self.truncated = False
+
+    @property
+    def agent_selection(self) -> int:
+        return self.game.current_player_id
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Deals a new game; ``seed`` starts a new run of game seeds."""
+        if seed is not None or self._run_seed is None:
+            self._run_seed = random.getrandbits(64) if seed is None else seed
+            self._games = 0
+        self.game.seed(game_seed(self._run_seed, self._games))
+        self._games += 1
+        self.game.reset()
+        self.rewards[:] = 0
+        self._scores[:] = 0
+        self.terminated = self.truncated = False
+        return self._observe_current(), self._info
+
+    def step(
+        self, action: int
+    ) -> Tuple[np.ndarray, np.ndarray, bool, bool, Dict[str, Any]]:
+        """
+        Plays ``action`` for the acting player. Returns the observation of the next
+        player, the rewards of all players, terminated, truncated and info.
+        """
+        game = self.game
+        if self.terminated or self.truncated:
+            raise ValueError("The game is over; call reset.")
+        if not game.step(int(action)):
+            raise ValueError(f"Illegal action {action}.")
+        scores = self._scores
+        for player_id, player in enumerate(game.players):
+            self.rewards[player_id] = (player.score - scores[player_id]) / SCORE_TO_WIN
+            scores[player_id] = player.score
+        if game.end:
+            self.terminated = game.max_score() >= SCORE_TO_WIN
+            self.truncated = not self.terminated
+        return (
+            self._observe_current(),
+            self.rewards,
+            self.terminated,
+            self.truncated,
+            self._info,
+        )
+
+    def observe(self, player_id: int) -> np.ndarray:
+        """The game as seen by ``player_id``, as a view into ``observations``."""
+        return self.encoder.encode(
+            self.game, self.observations[player_id], perspective=player_id
+        )
+
+    def _observe_current(self) -> np.ndarray:
+        player_id = self.game.current_player_id
+        self.game.legal_action_mask(self.action_mask)
+        if self.terminated or self.truncated:
+            self.action_mask[:] = False
+        self._info["player"] = player_id
+        return self.observe(player_id)
+
+
+class SplendorVecEnv:
+    """
+    ``num_envs`` environments stepped together over a ``VecGame``.
+
+    ``step`` takes one action per environment for its acting player and returns the
+    acting players' observations (num_envs, observation size), the rewards of all
+    players (num_envs, players), terminated, truncated and info with the
+    ``action_mask`` of the next move and the acting ``player`` of every environment.
+    A finished game is reset at once, so the returned observation already belongs to
+    the next game; the last one of the finished game is kept in
+    ``info["final_observation"]``, valid for the rows flagged done.
+
+    All returned arrays are buffers reused by every call. Environment ``i`` plays games
+    ``i``, ``i + num_envs``, ... of the run, each dealt from ``seeding.game_seed``.
+    """
+
+    def __init__(
+        self,
+        noble_file: str,
+        evaluation_files: List[str],
+        num_envs: int,
+        num_of_players: int = 2,
+        max_rounds: int = 100,
+    ):
+        self.vec = VecGame(
+            noble_file, evaluation_files, num_envs, num_of_players, max_rounds
+        )
+        self.encoder = ObservationEncoder(num_of_players)
+        self.num_envs = num_envs
+        self.num_of_players = num_of_players
+        self.observation_size = self.encoder.size
+        self.num_actions = NUM_ACTIONS
+
+        shape = (num_envs, self.encoder.size)
+        self.observations = np.zeros(shape, dtype=self.encoder.dtype)
+        self.final_observations = np.zeros(shape, dtype=self.encoder.dtype)
+        self.action_masks = np.zeros((num_envs, NUM_ACTIONS), dtype=bool)
+        self.rewards = np.zeros((num_envs, num_of_players), dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self._scores = np.zeros((num_envs, num_of_players), dtype=np.int16)
+        self._info: Dict[str, Any] = {
+            "action_mask": self.action_masks,
+            "player": self.vec.current_player,
+            "final_observation": self.final_observations,
+        }
+        self._run_seed = 0
+        self._next_games = np.arange(num_envs)
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Deals a new game in every environment; ``seed`` starts a new run."""
+        self._run_seed = random.getrandbits(64) if seed is None else seed
+        self._next_games = np.arange(self.num_envs)
+        self._reset_envs(np.arange(self.num_envs))
+        self.rewards[:] = 0
+        self.terminated[:] = False
+        self.truncated[:] = False
+        return self._observe(), self._info
+
+    def step(
+        self, actions: Sequence[int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        vec = self.vec
+        done = vec.step(actions)
+        np.subtract(vec.scores, self._scores, out=self.rewards)
+        self.rewards /= SCORE_TO_WIN
+        self._scores[:] = vec.scores
+
+        np.logical_and(
+            done,
+            (vec.scores.max(axis=1) >= SCORE_TO_WIN) & (vec.current_player == 0),
+            out=self.terminated,
+        )
+        np.logical_and(done, ~self.terminated, out=self.truncated)
+        finished = np.flatnonzero(done)
+        if finished.size:
+            self.encoder.encode_vec_game(vec, self.final_observations)
+            self._reset_envs(finished)
+        return (
+            self._observe(),
+            self.rewards,
+            self.terminated,
+            self.truncated,
+            self._info,
+        )
+
+    def _reset_envs(self, env_ids: np.ndarray):
+        games = self._next_games[env_ids]
+        seeds = [game_seed(self._run_seed, game) for game in games.tolist()]
+        self.vec.reset(seeds, env_ids)
+        self._next_games[env_ids] += self.num_envs
+        self._scores[env_ids] = 0
+
+    def _observe(self) -> np.ndarray:
+        self.vec.legal_action_mask(self.action_masks)
+        return self.encoder.encode_vec_game(self.vec, self.observations)
@@ -0,0 +1,192 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from actions import (
+    BUY_EVALUATION_OFFSET,
+    BUY_RESERVED_OFFSET,
+    RESERVE_WITH_GOLD_OFFSET,
+    RESERVE_WITHOUT_GOLD_OFFSET,
+    SLOTS_PER_LEVEL,
+)
+from card import EvaluationCard
+from config import SCORE_TO_WIN
+from tokens import COLORS
+
+NUM_COLORS = len(COLORS)
+# Most tokens a withdrawal can bring towards one card
+TOKENS_PER_TURN = 3
+
+# Weights of ``PurchaseFeatures.value``
+BONUS_WEIGHT = 0.4
+TOKEN_WEIGHT = 0.1
+GOLD_WEIGHT = 0.2
+NOBLE_PROGRESS_WEIGHT = 1.0
+BEST_CARD_WEIGHT = 0.5
+
+
+class CardFeature(NamedTuple):
+    card: EvaluationCard
+    buy_action: int
+    reserve_slot: int  # board slot, -1 for a reserved card
+    missing: Tuple[int, ...]  # tokens still needed per color after bonuses and tokens
+    gold_short: int  # missing tokens not covered by the player's gold
+    turns: int  # withdrawals needed before the card can be bought, at best
+    noble_gain: float  # noble score its bonus brings closer, weighted by distance
+    value: float  # (score + noble_gain) per turn to afford it, buying turn included
+
+
+class PlayerFeatures(NamedTuple):
+    cards: Tuple[CardFeature, ...]  # board cards in slot order, then reserved ones
+    noble_distances: Tuple[int, ...]  # purchases still needed per exposed noble
+
+    def nobles_within(self, purchases: int) -> int:
+        """Exposed nobles the player can earn with at most ``purchases`` more cards."""
+        return sum(0 <= distance <= purchases for distance in self.noble_distances)
+
+    def buyable(self) -> List[CardFeature]:
+        return [feature for feature in self.cards if not feature.gold_short]
+
+
+class PurchaseFeatures:
+    """
+    Purchase-distance features of the players of ``Game``s, cached per state.
+
+    ``get`` returns the ``PlayerFeatures`` of one player, memoized by game hash and
+    player. The hash covers everything the features read, the order of reserved
+    cards (which fixes their buy actions) included, so one instance may serve many
+    games. Underneath, every card's cost after bonuses is kept per bonus vector,
+    so a token move only redoes the subtraction of the held tokens. Costs, bonuses
+    and scores of cards are read once per card.
+    """
+
+    def __init__(self, max_states: int = 4096):
+        self.max_states = max_states
+        self._states: Dict[Tuple[int, int], PlayerFeatures] = {}
+        # bonuses -> card id -> cost per color left after those bonuses
+        self._after_bonus: Dict[tuple, Dict[int, Tuple[int, ...]]] = {}
+        self._cards: Dict[int, Tuple[EvaluationCard, tuple, int, int]] = {}
+
+    def _card(self, card: EvaluationCard) -> Tuple[tuple, int, int]:
+        # cost per color, bonus color index and score
+        entry = self._cards.get(card.id)
+        if entry is None or entry[0] is not card:
+            bonus = card.bonus.as_tuple()[:NUM_COLORS]
+            entry = self._cards[card.id] = (
+                card,
+                card.cost.as_tuple()[:NUM_COLORS],
+                bonus.index(1) if 1 in bonus else -1,
+                card.score,
+            )
+        return entry[1:]
+
+    def get(self, game, player_id: Optional[int] = None) -> PlayerFeatures:
+        if player_id is None:
+            player_id = game.current_player_id
+        key = (game.hash, player_id)
+        features = self._states.get(key)
+        if features is None:
+            if len(self._states) >= self.max_states:
+                self._states.clear()
+            features = self._states[key] = self._compute(game, player_id)
+        return features
+
+    def _compute(self, game, player_id: int) -> PlayerFeatures:
+        player = game.players[player_id]
+        bonuses = player.bonuses.as_tuple()[:NUM_COLORS]
+        tokens = player.tokens.as_tuple()
+        gold = tokens[NUM_COLORS]
+
+        after_bonus = self._after_bonus.get(bonuses)
+        if after_bonus is None:
+            if len(self._after_bonus) >= self.max_states:
+                self._after_bonus.clear()
+            after_bonus = self._after_bonus[bonuses] = {}
+
+        nobles = game.board.exposed_noble_cards
+        noble_needs = []  # (bonus still needed per color, score / distance)
+        distances = []
+        for noble in nobles:
+            if noble is None:
+                distances.append(-1)
+                continue
+            needs = tuple(
+                max(0, cost - bonus)
+                for cost, bonus in zip(noble.cost.as_tuple(), bonuses)
+            )
+            distance = sum(needs)
+            distances.append(distance)
+            if distance:
+                noble_needs.append((needs, noble.score / distance))
+
+        cards = []
+        slots = []
+        for deck_index, card_list in enumerate(game.board.exposed_evaluation_cards):
+            for card_index, card in enumerate(card_list):
+                if card is not None:
+                    slot = deck_index * SLOTS_PER_LEVEL + card_index
+                    slots.append((card, BUY_EVALUATION_OFFSET + slot, slot))
+        for index, card in enumerate(player.reserved_cards):
+            slots.append((card, BUY_RESERVED_OFFSET + index, -1))
+
+        for card, buy_action, reserve_slot in slots:
+            cost, bonus_color, score = self._card(card)
+            remaining = after_bonus.get(card.id) if card.id >= 0 else None
+            if remaining is None:
+                remaining = tuple(max(0, c - b) for c, b in zip(cost, bonuses))
+                if card.id >= 0:
+                    after_bonus[card.id] = remaining
+            missing = tuple(r - t if r > t else 0 for r, t in zip(remaining, tokens))
+            gold_short = sum(missing) - gold
+            if gold_short < 0:
+                gold_short = 0
+            turns = -(-gold_short // TOKENS_PER_TURN)
+            noble_gain = 0.0
+            if bonus_color >= 0:
+                for needs, weight in noble_needs:
+                    if needs[bonus_color]:
+                        noble_gain += weight
+            cards.append(
+                CardFeature(
+                    card,
+                    buy_action,
+                    reserve_slot,
+                    missing,
+                    gold_short,
+                    turns,
+                    noble_gain,
+                    (score + noble_gain) / (turns + 1),
+                )
+            )
+        return PlayerFeatures(tuple(cards), tuple(distances))
+
+    def value(self, game, player_id: int) -> float:
+        """
+        Heuristic worth of ``player_id``'s position in points: score plus weighted
+        bonuses, tokens, noble progress and the best card value within reach.
+        """
+        player = game.players[player_id]
+        if game.end:
+            best = max(p.score for p in game.players)
+            return player.score + (SCORE_TO_WIN if player.score == best else 0)
+        features = self.get(game, player_id)
+        tokens = player.tokens
+        noble_progress = 0.0
+        for noble, distance in zip(
+            game.board.exposed_noble_cards, features.noble_distances
+        ):
+            if distance >= 0:
+                noble_progress += noble.score / (1 + distance)
+        best_card = max((feature.value for feature in features.cards), default=0.0)
+        return (
+            player.score
+            + BONUS_WEIGHT * player.bonuses.count
+            + TOKEN_WEIGHT * (tokens.count - tokens.gold)
+            + GOLD_WEIGHT * tokens.gold
+            + NOBLE_PROGRESS_WEIGHT * noble_progress
+            + BEST_CARD_WEIGHT * best_card
+        )
+
+
+def reserve_action(feature: CardFeature, with_gold: bool) -> int:
+    """The action reserving a board card, with or without taking gold."""
+    offset = RESERVE_WITH_GOLD_OFFSET if with_gold else RESERVE_WITHOUT_GOLD_OFFSET
+    return offset + feature.reserve_slot
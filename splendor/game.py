@@ -1,19 +1,142 @@
-from typing import List, Dict, Union, Any
+import random
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from actions import (
+    BUY_EVALUATION_OFFSET,
+    BUY_RESERVED_OFFSET,
+    NUM_ACTIONS,
+    RESERVE_WITH_GOLD_OFFSET,
+    RESERVE_WITHOUT_GOLD_OFFSET,
+    SLOTS_PER_LEVEL,
+    WITHDRAWAL_OFFSET,
+)
 from board import Board
-from card import EvaluationCard
-from config import SCORE_TO_WIN
-from player import Player
-from tokens import Tokens
+from card import EvaluationCard, Noble
+from config import MAX_TOKENS_PER_PLAYER, SCORE_TO_WIN
+from instrumentation import GameProfiler
+from player import ONE_GOLD, Player
+from tokens import FrozenTokens, Tokens
+from withdrawal import (
+    WITHDRAWAL_PATTERNS,
+    withdrawal_option_indices,
+    withdrawal_options,
+)
+from zobrist import ZobristHasher
+
+# Option operations, in the order of get_options_for_current_player_id
+OPERATIONS = (
+    "withdrawal",
+    "buy_evaluation",
+    "buy_reserved",
+    "reserved_without_gold",
+    "reserved_with_gold",
+)
+
+
+class PlayerSnapshot(NamedTuple):
+    tokens: FrozenTokens
+    reserved_cards: Tuple[EvaluationCard, ...]
+    noble_cards: bytes  # Deck.state()
+    evaluation_cards: Tuple[bytes, ...]
+    bonuses: FrozenTokens
+    score: int
+
+
+class GameSnapshot(NamedTuple):
+    """
+    State captured by ``Game.snapshot``. Cards are shared, not copied, and decks are
+    saved as packed card ids (``Deck.state``).
+    """
+
+    board_tokens: FrozenTokens
+    exposed_evaluation_cards: Tuple[Tuple[Optional[EvaluationCard], ...], ...]
+    exposed_noble_cards: Tuple[Optional[Noble], ...]
+    noble_deck: bytes
+    evaluation_decks: Tuple[bytes, ...]
+    players: Tuple[PlayerSnapshot, ...]
+    current_player_id: int
+    rounds: int
+    zobrist_hash: int
+
+
+class UndoRecord:
+    """What one ``Game.apply`` changed, so ``Game.undo`` can revert it."""
+
+    __slots__ = (
+        "player_id",
+        "rounds",
+        "action",
+        "taken",
+        "paid",
+        "card",
+        "deck_index",
+        "card_index",
+        "drew",
+        "reserved_index",
+        "noble_index",
+        "zobrist_hash",
+    )
+
+    def __init__(self, player_id: int, rounds: int, action: int, zobrist_hash: int):
+        self.player_id = player_id
+        self.rounds = rounds
+        self.action = action
+        self.zobrist_hash = zobrist_hash  # hash before the move
+        self.taken: Optional[Tokens] = None  # moved from the board to the player
+        self.paid: Optional[Tokens] = None  # moved from the player to the board
+        self.card: Optional[EvaluationCard] = None  # card bought or reserved
+        self.deck_index: Optional[int] = None  # board slot the card came from
+        self.card_index: Optional[int] = None
+        self.drew = False  # whether the board slot was refilled from the deck
+        self.reserved_index: Optional[int] = None  # reserved slot the card came from
+        self.noble_index: Optional[int] = None  # noble slot bought at end of turn
+
+    def set_board_card(self, board: Board, deck_index: int, card_index: int, card):
+        self.card = card
+        self.deck_index = deck_index
+        self.card_index = card_index
+        self.drew = len(board.evaluation_decks[deck_index]) > 0
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
         self.board: Board = Board()
+        # Deck shuffles draw from rng, or from the module RNG when it is None
+        self.rng = rng
+        self.rng_seed: Optional[int] = None
         self.players: List[Player] = []
         self.max_rounds = None
         self.num_of_players = None
         self._rounds: int = 0
         self.current_player_id: int = 0
+        self.zobrist = ZobristHasher()
+        self.profiler: Optional[GameProfiler] = None
+        self._counted_state = None  # (hash, rounds) of the last option count
+
+    def enable_profiling(self, profiler: Optional[GameProfiler] = None) -> GameProfiler:
+        """
+        Attaches ``profiler`` (a new one by default) to the hot paths and returns it.
+        While no profiler is attached each of them costs one ``None`` check.
+        """
+        self.profiler = profiler if profiler is not None else GameProfiler()
+        self._counted_state = None
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = None
 
     def setup_game(
         self,
@@ -26,12 +149,56 @@ class Game:
         self.num_of_players = num_of_players
         self.max_rounds = max_rounds
 
+    def seed(self, seed: Optional[int]):
+        """
+        Gives the game its own RNG seeded with ``seed`` (see ``seeding.game_seed``),
+        or the module RNG again for None. A game seeded with ``s`` deals what a
+        ``VecGame`` seeded with ``s`` deals.
+        """
+        self.rng_seed = seed
+        self.rng = None if seed is None else random.Random(seed)
+
     def start_new_game(self):
         self._rounds = 0
         self.current_player_id: int = 0
-        self.board.shuffle()
+        self.board.shuffle(self.rng)
         self.board.start_new_board(num_of_players=self.num_of_players)
         self.players = [Player() for _ in range(self.num_of_players)]
+        self.zobrist.attach(self)
+
+    def reset(self, rng: random.Random = None):
+        """
+        Starts a new game reusing the board, players and decks in place. With the
+        same RNG state it deals exactly what ``start_new_game`` deals. Shuffles with
+        ``rng``, or else the game's RNG.
+        """
+        self.board.reset(self.num_of_players, rng or self.rng)
+        self._reset_players()
+
+    def reset_from_decks(
+        self,
+        noble_positions: Sequence[int],
+        evaluation_positions: Sequence[Sequence[int]],
+    ):
+        """
+        Like ``reset``, but deals from decks holding their cards in the given order
+        instead of a shuffled one (see ``Deck.set_positions``).
+        """
+        board = self.board
+        board.noble_deck.set_positions(noble_positions)
+        for deck, positions in zip(board.evaluation_decks, evaluation_positions):
+            deck.set_positions(positions)
+        board.deal(self.num_of_players)
+        self._reset_players()
+
+    def _reset_players(self):
+        self._rounds = 0
+        self.current_player_id = 0
+        if len(self.players) != self.num_of_players:
+            self.players = [Player() for _ in range(self.num_of_players)]
+        for player in self.players:
+            player.reset()
+        self.zobrist.attach(self)
 
     def max_score(self) -> int:
         return max(player.score for player in self.players)
@@ -46,6 +213,8 @@ class Game:
         self,
     ) -> Dict[str, List[Union[Tokens, EvaluationCard]]]:
         player = self.players[self.current_player_id]
+        if self.profiler is not None:
+            return self._profiled_options(player)
         return {
             "withdrawal": player.get_withdrawal_options(self.board),
             "buy_evaluation": player.get_buy_evaluation_options(self.board),
@@ -56,13 +225,174 @@ class Game:
             "reserved_with_gold": player.get_reserved_with_gold_options(self.board),
         }
 
+    def _profiled_options(self, player: Player) -> Dict[str, List[Any]]:
+        profiler = self.profiler
+        clock = profiler.clock
+        board = self.board
+        options = {}
+        for operation, get_options in (
+            ("withdrawal", lambda: player.get_withdrawal_options(board)),
+            ("buy_evaluation", lambda: player.get_buy_evaluation_options(board)),
+            ("buy_reserved", player.get_buy_reserved_options),
+            (
+                "reserved_without_gold",
+                lambda: player.get_reserved_without_gold_options(board),
+            ),
+            (
+                "reserved_with_gold",
+                lambda: player.get_reserved_with_gold_options(board),
+            ),
+        ):
+            start = clock()
+            options[operation] = get_options()
+            profiler.add(f"options.{operation}", clock() - start)
+        self._count_options(sum(len(data) for data in options.values()))
+        return options
+
+    def _count_options(self, count: int):
+        # Once per turn, however often the options of the turn are listed
+        state = (self.zobrist.value, self._rounds)
+        if state != self._counted_state:
+            self._counted_state = state
+            self.profiler.add_option_count(count)
+
+    def iter_options(
+        self, operations: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields the ``(operation, data)`` options of the current player one at a time,
+        in the order of ``get_options_for_current_player_id``, limited to
+        ``operations`` (every operation by default).
+        """
+        player = self.players[self.current_player_id]
+        board = self.board
+        for operation in OPERATIONS if operations is None else operations:
+            if operation == "withdrawal":
+                options = withdrawal_options(
+                    board.tokens, MAX_TOKENS_PER_PLAYER - player.tokens.count
+                )
+            elif operation == "buy_evaluation":
+                options = player.iter_buy_evaluation_options(board)
+            elif operation == "buy_reserved":
+                options = player.iter_buy_reserved_options()
+            elif operation == "reserved_without_gold":
+                options = player.iter_reserve_options(board, use_gold=False)
+            elif operation == "reserved_with_gold":
+                options = player.iter_reserve_options(board, use_gold=True)
+            else:
+                raise ValueError(f"Invalid operation {operation}.")
+            for data in options:
+                yield operation, data
+
+    def has_any_legal_move(self) -> bool:
+        """Whether the current player has at least one option."""
+        return next(self.iter_options(), None) is not None
+
+    def sample_legal_option(self, rng=random) -> Optional[Dict[str, Any]]:
+        """
+        Returns one option of the current player drawn uniformly from the options of
+        ``get_options_for_current_player_id``, or None if there are none.
+
+        Draws from every withdrawal, reserve and potential buy without building the
+        option lists, and redraws when it lands on a card that cannot be afforded.
+        """
+        player = self.players[self.current_player_id]
+        board = self.board
+        withdrawals = withdrawal_options(
+            board.tokens, MAX_TOKENS_PER_PLAYER - player.tokens.count
+        )
+        exposed = [
+            card
+            for card_list in board.exposed_evaluation_cards
+            for card in card_list
+            if card is not None
+        ]
+        reserved_cards = player.reserved_cards
+        reserves = len(exposed) if player.can_reserve() else 0
+        gold_reserves = len(exposed) if player.can_reserve_with_gold(board) else 0
+        certain = len(withdrawals) + reserves + gold_reserves
+        if not certain and not self.has_any_legal_move():
+            return None
+
+        total = certain + len(exposed) + len(reserved_cards)
+        while True:
+            index = rng.randrange(total)
+            if index < len(withdrawals):
+                return {"withdrawal": withdrawals[index]}
+            index -= len(withdrawals)
+            if index < reserves:
+                return {"reserved_without_gold": exposed[index]}
+            index -= reserves
+            if index < gold_reserves:
+                return {"reserved_with_gold": exposed[index]}
+            index -= gold_reserves
+            if index < len(exposed):
+                card = exposed[index]
+                if player.can_buy_evaluation_card(card):
+                    return {"buy_evaluation": card}
+                continue
+            card = reserved_cards[index - len(exposed)]
+            if player.can_buy_evaluation_card(card):
+                return {"buy_reserved": card}
+
+    def is_legal_option(self, option: Dict[str, Any]) -> bool:
+        """
+        Whether ``option`` is among the current player's options, checked directly
+        instead of by generating them.
+        """
+        player = self.players[self.current_player_id]
+        board = self.board
+        operation, data = self._extract_option(option)
+        if operation == "withdrawal":
+            return data in withdrawal_options(
+                board.tokens, MAX_TOKENS_PER_PLAYER - player.tokens.count
+            )
+        if operation == "buy_reserved":
+            return any(
+                card is data for card in player.reserved_cards
+            ) and player.can_buy_evaluation_card(data)
+        if operation not in OPERATIONS or not self._is_exposed(data):
+            return False
+        if operation == "buy_evaluation":
+            return player.can_buy_evaluation_card(data)
+        if operation == "reserved_with_gold":
+            return player.can_reserve_with_gold(board)
+        return player.can_reserve()
+
+    def _is_exposed(self, card) -> bool:
+        # Board cards sit in the row of their level
+        if not isinstance(card, EvaluationCard):
+            return False
+        exposed = self.board.exposed_evaluation_cards
+        if not 0 <= card.level < len(exposed):
+            return False
+        return any(slot is card for slot in exposed[card.level])
+
     def apply_option(
-        self, option: Dict[str, Any], option_dict: Dict[str, List[Any]]
+        self, option: Dict[str, Any], option_dict: Dict[str, List[Any]] = None
+    ) -> bool:
+        """
+        Applies ``option`` if it is in ``option_dict``, or if ``is_legal_option``
+        allows it when no option dict is given.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return self._apply_option(option, option_dict)
+        start = profiler.clock()
+        applied = self._apply_option(option, option_dict)
+        profiler.add("apply_option", profiler.clock() - start)
+        return applied
+
+    def _apply_option(
+        self, option: Dict[str, Any], option_dict: Optional[Dict[str, List[Any]]]
     ) -> bool:
         player = self.players[self.current_player_id]
         operation, data = self._extract_option(option)
 
-        if operation not in option_dict or data not in option_dict[operation]:
+        if option_dict is None:
+            if not self.is_legal_option(option):
+                return False
+        elif operation not in option_dict or data not in option_dict[operation]:
             return False
 
         if operation == "withdrawal":
@@ -79,6 +409,252 @@ class Game:
 
         return False
 
+    def legal_action_mask(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns a boolean array over the fixed action space of ``actions`` that is True
+        for every option the current player may take. ``out`` is filled in place when
+        given.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return self._legal_action_mask(out)
+        start = profiler.clock()
+        out = self._legal_action_mask(out)
+        profiler.add("legal_action_mask", profiler.clock() - start)
+        self._count_options(int(np.count_nonzero(out)))
+        return out
+
+    def _legal_action_mask(self, out: Optional[np.ndarray]) -> np.ndarray:
+        if out is None:
+            out = np.zeros(NUM_ACTIONS, dtype=bool)
+        else:
+            out[:] = False
+        player = self.players[self.current_player_id]
+        board = self.board
+
+        capacity = MAX_TOKENS_PER_PLAYER - player.tokens.count
+        for index in withdrawal_option_indices(board.tokens, capacity):
+            out[WITHDRAWAL_OFFSET + index] = True
+
+        can_reserve = player.can_reserve()
+        can_reserve_with_gold = player.can_reserve_with_gold(board)
+        for deck_index, card_list in enumerate(board.exposed_evaluation_cards):
+            for card_index, card in enumerate(card_list):
+                if card is None:
+                    continue
+                slot = deck_index * SLOTS_PER_LEVEL + card_index
+                if player.can_buy_evaluation_card(card):
+                    out[BUY_EVALUATION_OFFSET + slot] = True
+                if can_reserve:
+                    out[RESERVE_WITHOUT_GOLD_OFFSET + slot] = True
+                if can_reserve_with_gold:
+                    out[RESERVE_WITH_GOLD_OFFSET + slot] = True
+
+        for index, card in enumerate(player.reserved_cards):
+            if player.can_buy_evaluation_card(card):
+                out[BUY_RESERVED_OFFSET + index] = True
+        return out
+
+    def step(self, action: int) -> bool:
+        """
+        Applies an action id from the fixed action space and finalizes the turn.
+        Returns False, leaving the game untouched, if the action is not legal.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            applied = self._apply_action(action)
+        else:
+            start = profiler.clock()
+            applied = self._apply_action(action)
+            profiler.add("apply_action", profiler.clock() - start)
+        if not applied:
+            return False
+        self.finalize_turn()
+        return True
+
+    def apply(self, action: int) -> Optional["UndoRecord"]:
+        """
+        Like ``step``, but returns an ``UndoRecord`` that ``undo`` uses to take the move
+        back, or None if the action is not legal.
+        """
+        record = UndoRecord(
+            self.current_player_id, self._rounds, action, self.zobrist.value
+        )
+        if self.profiler is not None:
+            return self._profiled_apply(action, record)
+        if not self._apply_action(action, record):
+            return None
+        record.noble_index = self._buying_noble()
+        self._advance_turn()
+        return record
+
+    def _profiled_apply(self, action: int, record: "UndoRecord"):
+        profiler = self.profiler
+        start = profiler.clock()
+        applied = self._apply_action(action, record)
+        profiler.add("apply_action", profiler.clock() - start)
+        if not applied:
+            return None
+        start = profiler.clock()
+        record.noble_index = self._buying_noble()
+        self._advance_turn()
+        profiler.add("finalize_turn", profiler.clock() - start)
+        profiler.maybe_dump()
+        return record
+
+    def undo(self, record: "UndoRecord"):
+        """Reverts the most recent ``apply`` that has not been undone yet."""
+        self.current_player_id = record.player_id
+        self._rounds = record.rounds
+        player = self.players[record.player_id]
+        board = self.board
+
+        if record.noble_index is not None:
+            board.put_back_noble_card(record.noble_index, player.remove_noble_card())
+
+        if record.paid is not None:
+            if record.reserved_index is None:
+                player.remove_evaluation_card(record.deck_index)
+            else:
+                player.remove_evaluation_card(record.card.level - 1)
+                player.reserved_cards.insert(record.reserved_index, record.card)
+            player.tokens += record.paid
+            board.tokens -= record.paid
+        elif record.card is not None:
+            player.reserved_cards.pop()
+
+        if record.taken is not None:
+            player.tokens -= record.taken
+            board.tokens += record.taken
+
+        if record.card is not None and record.reserved_index is None:
+            board.put_back_evaluation_card(
+                record.deck_index, record.card_index, record.card, record.drew
+            )
+        self.zobrist.value = record.zobrist_hash
+
+    def _apply_action(self, action: int, record: "UndoRecord" = None) -> bool:
+        player = self.players[self.current_player_id]
+        board = self.board
+
+        if action < BUY_EVALUATION_OFFSET:
+            if action < WITHDRAWAL_OFFSET:
+                return False
+            pattern = WITHDRAWAL_PATTERNS[action - WITHDRAWAL_OFFSET]
+            capacity = MAX_TOKENS_PER_PLAYER - player.tokens.count
+            if pattern not in withdrawal_options(board.tokens, capacity):
+                return False
+            player.withdrawal(board, pattern)
+            if record is not None:
+                record.taken = pattern
+            return True
+
+        if action < BUY_RESERVED_OFFSET:
+            deck_index, card_index = divmod(
+                action - BUY_EVALUATION_OFFSET, SLOTS_PER_LEVEL
+            )
+            card = board.exposed_evaluation_cards[deck_index][card_index]
+            if card is None or not player.can_buy_evaluation_card(card):
+                return False
+            if record is not None:
+                record.set_board_card(board, deck_index, card_index, card)
+            paid = player.buy_evaluation_card(board, deck_index, card_index)
+            if record is not None:
+                record.paid = paid
+            return True
+
+        if action < RESERVE_WITHOUT_GOLD_OFFSET:
+            index = action - BUY_RESERVED_OFFSET
+            if index >= len(
+                player.reserved_cards
+            ) or not player.can_buy_evaluation_card(player.reserved_cards[index]):
+                return False
+            if record is not None:
+                record.card = player.reserved_cards[index]
+                record.reserved_index = index
+            paid = player.buy_reserved_card(board, index)
+            if record is not None:
+                record.paid = paid
+            return True
+
+        if action >= NUM_ACTIONS:
+            return False
+        use_gold = action >= RESERVE_WITH_GOLD_OFFSET
+        offset = RESERVE_WITH_GOLD_OFFSET if use_gold else RESERVE_WITHOUT_GOLD_OFFSET
+        deck_index, card_index = divmod(action - offset, SLOTS_PER_LEVEL)
+        card = board.exposed_evaluation_cards[deck_index][card_index]
+        if card is None:
+            return False
+        if use_gold:
+            if not player.can_reserve_with_gold(board):
+                return False
+        elif not player.can_reserve():
+            return False
+        if record is not None:
+            record.set_board_card(board, deck_index, card_index, card)
+            if use_gold:
+                record.taken = ONE_GOLD
+        if use_gold:
+            player.reserve_with_gold(board, deck_index, card_index)
+        else:
+            player.reserve_without_gold(board, deck_index, card_index)
+        return True
+
+    def snapshot(self) -> "GameSnapshot":
+        """Returns a compact copy of the game state for ``restore``."""
+        board = self.board
+        return GameSnapshot(
+            board_tokens=FrozenTokens(*board.tokens.as_tuple()),
+            exposed_evaluation_cards=tuple(
+                tuple(card_list) for card_list in board.exposed_evaluation_cards
+            ),
+            exposed_noble_cards=tuple(board.exposed_noble_cards),
+            noble_deck=board.noble_deck.state(),
+            evaluation_decks=tuple(deck.state() for deck in board.evaluation_decks),
+            players=tuple(
+                PlayerSnapshot(
+                    tokens=FrozenTokens(*player.tokens.as_tuple()),
+                    reserved_cards=tuple(player.reserved_cards),
+                    noble_cards=player.noble_deck.state(),
+                    evaluation_cards=tuple(
+                        deck.state() for deck in player.evaluation_decks
+                    ),
+                    bonuses=FrozenTokens(*player.bonuses.as_tuple()),
+                    score=player.score,
+                )
+                for player in self.players
+            ),
+            current_player_id=self.current_player_id,
+            rounds=self._rounds,
+            zobrist_hash=self.zobrist.value,
+        )
+
+    def restore(self, snapshot: "GameSnapshot"):
+        """Puts the game back into the state captured by ``snapshot``."""
+        board = self.board
+        board.tokens.set(snapshot.board_tokens)
+        for card_list, saved in zip(
+            board.exposed_evaluation_cards, snapshot.exposed_evaluation_cards
+        ):
+            card_list[:] = saved
+        board.exposed_noble_cards[:] = snapshot.exposed_noble_cards
+        board.noble_deck.set_state(snapshot.noble_deck)
+        for deck, saved in zip(board.evaluation_decks, snapshot.evaluation_decks):
+            deck.set_state(saved)
+
+        for player, saved in zip(self.players, snapshot.players):
+            player.tokens.set(saved.tokens)
+            player.reserved_cards[:] = saved.reserved_cards
+            player.noble_deck.set_state(saved.noble_cards)
+            for deck, state in zip(player.evaluation_decks, saved.evaluation_cards):
+                deck.set_state(state)
+            player._bonus_total.set(saved.bonuses)
+            player._score = saved.score
+
+        self.current_player_id = snapshot.current_player_id
+        self._rounds = snapshot.rounds
+        self.zobrist.value = snapshot.zobrist_hash
+
     def _apply_buy_evaluation(self, player, data):
         for deck_index, card_list in enumerate(self.board.exposed_evaluation_cards):
             if data in card_list:
@@ -111,20 +687,45 @@ class Game:
     def _extract_option(self, option: Dict[str, Any]) -> (str, Any):
         return next(iter(option.items()))
 
-    def _buying_noble(self):
+    def _buying_noble(self) -> Optional[int]:
+        # Returns the slot of the noble bought, if any
+        profiler = self.profiler
+        if profiler is None:
+            return self._buy_noble()
+        start = profiler.clock()
+        noble_index = self._buy_noble()
+        profiler.add("buying_noble", profiler.clock() - start)
+        return noble_index
+
+    def _buy_noble(self) -> Optional[int]:
         player = self.players[self.current_player_id]
         noble_buying_options = player.noble_buying_options(self.board)
         if noble_buying_options:
-            player.buy_noble_card(
-                self.board,
-                self.board.exposed_noble_cards.index(noble_buying_options[0]),
-            )
+            card_index = self.board.exposed_noble_cards.index(noble_buying_options[0])
+            player.buy_noble_card(self.board, card_index)
+            return card_index
+        return None
 
     def finalize_turn(self):
+        profiler = self.profiler
+        if profiler is None:
+            self._buying_noble()
+            self._advance_turn()
+            return
+        start = profiler.clock()
         self._buying_noble()
+        self._advance_turn()
+        profiler.add("finalize_turn", profiler.clock() - start)
+        if self.end:
+            profiler.add_game_length(self._rounds)
+        profiler.maybe_dump()
+
+    def _advance_turn(self):
         if self.current_player_id == self.num_of_players - 1:
             self._rounds += 1
-        self.current_player_id = (self.current_player_id + 1) % self.num_of_players
+        next_player_id = (self.current_player_id + 1) % self.num_of_players
+        self.zobrist.pass_turn(self.current_player_id, next_player_id)
+        self.current_player_id = next_player_id
 
     @property
     def rounds(self) -> int:
@@ -133,3 +734,8 @@ class Game:
     @property
     def player_id(self) -> int:
         return self.current_player_id
+
+    @property
+    def hash(self) -> int:
+        """64-bit Zobrist hash of the current state, maintained incrementally."""
+        return self.zobrist.value
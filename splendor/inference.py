@@ -0,0 +1,239 @@
+import asyncio
+import threading
+import time
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from actions import NUM_ACTIONS
+from agents import Agent
+from encoding import ObservationEncoder
+
+# policy(observations (B, size), legal_masks (B, NUM_ACTIONS), player_ids (B,))
+# -> one legal action id per row
+BatchPolicy = Callable[[np.ndarray, np.ndarray, np.ndarray], Sequence[int]]
+
+
+class _Request:
+    __slots__ = (
+        "observation",
+        "legal_mask",
+        "player_id",
+        "submitted",
+        "action",
+        "error",
+        "event",
+        "future",
+        "loop",
+    )
+
+    def __init__(self, observation, legal_mask, player_id):
+        self.observation = observation
+        self.legal_mask = legal_mask
+        self.player_id = player_id
+        self.submitted = time.perf_counter()
+        self.action: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.event: Optional[threading.Event] = None
+        self.future: Optional[asyncio.Future] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def resolve(self):
+        if self.event is not None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self._resolve_future)
+            except RuntimeError:
+                pass  # the loop closed meanwhile; nobody awaits the action
+
+    def _resolve_future(self):
+        if self.future.done():
+            return
+        if self.error is not None:
+            self.future.set_exception(self.error)
+        else:
+            self.future.set_result(self.action)
+
+
+class InferenceBroker:
+    """
+    Gathers policy requests from many games into batches for one policy call.
+
+    Games submit the observation and legal mask of their current player from any
+    thread (``request``, which blocks) or asyncio task (``request_async``). A broker
+    thread calls ``policy`` once ``max_batch_size`` requests are waiting, or when the
+    oldest one has waited ``max_latency`` seconds, and hands each caller its action.
+    Requests are copied into preallocated batch buffers, so the caller's arrays must
+    stay unchanged until the action comes back. An exception raised by ``policy``, or
+    an illegal action, is raised in every caller of that batch. Async requests whose
+    future was cancelled or whose event loop has closed are dropped.
+    """
+
+    def __init__(
+        self,
+        policy: BatchPolicy,
+        observation_size: int,
+        max_batch_size: int = 64,
+        max_latency: float = 0.002,
+        dtype=np.float32,
+    ):
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._observations = np.zeros((max_batch_size, observation_size), dtype=dtype)
+        self._legal_masks = np.zeros((max_batch_size, NUM_ACTIONS), dtype=bool)
+        self._player_ids = np.zeros(max_batch_size, dtype=np.int64)
+        self._pending: List[_Request] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.requests = 0
+
+    def start(self) -> "InferenceBroker":
+        if self._thread is not None:
+            raise RuntimeError("The broker is already running.")
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Serves the requests still waiting, then stops the broker thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "InferenceBroker":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(
+        self, observation: np.ndarray, legal_mask: np.ndarray, player_id: int = 0
+    ) -> int:
+        """Returns the policy's action for one state; blocks until it is batched."""
+        request = _Request(observation, legal_mask, player_id)
+        request.event = threading.Event()
+        self._submit(request)
+        request.event.wait()
+        if request.error is not None:
+            raise request.error
+        return request.action
+
+    async def request_async(
+        self, observation: np.ndarray, legal_mask: np.ndarray, player_id: int = 0
+    ) -> int:
+        """Like ``request``, awaiting the action instead of blocking the thread."""
+        request = _Request(observation, legal_mask, player_id)
+        request.loop = asyncio.get_running_loop()
+        request.future = request.loop.create_future()
+        self._submit(request)
+        return await request.future
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+    def _submit(self, request: _Request):
+        with self._condition:
+            if self._closed or self._thread is None:
+                raise RuntimeError("The broker is not running.")
+            self._pending.append(request)
+            # Wake the broker to start the deadline, or to flush a full batch
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+
+    def _run(self):
+        try:
+            self._serve_forever()
+        finally:
+            # Should the thread ever stop early, fail its callers rather than hang
+            with self._condition:
+                self._closed = True
+                batch, self._pending = self._pending, []
+            error = RuntimeError("The broker has stopped.")
+            for request in batch:
+                request.error = error
+                request.resolve()
+
+    def _serve_forever(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                deadline = self._pending[0].submitted + self.max_latency
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[: self.max_batch_size]
+                del self._pending[: self.max_batch_size]
+            self._serve(batch)
+
+    def _serve(self, batch: List[_Request]):
+        size = len(batch)
+        observations = self._observations[:size]
+        legal_masks = self._legal_masks[:size]
+        player_ids = self._player_ids[:size]
+        try:
+            for row, request in enumerate(batch):
+                observations[row] = request.observation
+                legal_masks[row] = request.legal_mask
+                player_ids[row] = request.player_id
+            actions = np.asarray(self.policy(observations, legal_masks, player_ids))
+            if actions.shape != (size,):
+                raise ValueError(f"Policy returned {actions.shape} actions for {size}.")
+            if (
+                actions.min() < 0
+                or actions.max() >= NUM_ACTIONS
+                or not legal_masks[np.arange(size), actions].all()
+            ):
+                raise ValueError("Policy returned an illegal action.")
+            for request, action in zip(batch, actions.tolist()):
+                request.action = action
+        except Exception as error:
+            for request in batch:
+                request.error = error
+        self.batches += 1
+        self.requests += size
+        for request in batch:
+            try:
+                request.resolve()
+            except Exception:
+                pass  # one caller gone must not stop the others' answers
+
+
+class BrokerAgent(Agent):
+    """
+    An agent that asks an ``InferenceBroker`` for its moves. Each game (thread) needs
+    its own agent, which holds the buffers its requests are encoded into.
+    """
+
+    def __init__(self, broker: InferenceBroker, encoder: ObservationEncoder):
+        self.broker = broker
+        self.encoder = encoder
+        self._observation = np.zeros(encoder.size, dtype=encoder.dtype)
+        self._legal_mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    def _encode(self, game):
+        self.encoder.encode(game, self._observation)
+        game.legal_action_mask(self._legal_mask)
+        return self._observation, self._legal_mask, game.player_id
+
+    def select_action(self, game) -> int:
+        return self.broker.request(*self._encode(game))
+
+    async def select_action_async(self, game) -> int:
+        return await self.broker.request_async(*self._encode(game))
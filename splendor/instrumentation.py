@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+
+class GameProfiler:
+    """
+    Call counts, cumulative time and histograms collected by ``Game`` hot paths.
+
+    Attach one with ``Game.enable_profiling``; a profiler may be shared by many games.
+    Timed sections are named "options.<operation>", "legal_action_mask",
+    "apply_option", "apply_action", "buying_noble" and "finalize_turn"; ``apply``
+    times its move as "apply_action" and the rest of the turn as "finalize_turn",
+    like ``step``. Histograms count the legal options once per turn and the length
+    in rounds of games finished by ``finalize_turn`` (not the ends a search reaches
+    and undoes). With ``dump_path`` set, ``snapshot`` is written there as JSON at
+    most every ``dump_interval`` seconds as turns are finalized.
+    """
+
+    def __init__(
+        self,
+        dump_path: Optional[str] = None,
+        dump_interval: float = 60.0,
+        clock=time.perf_counter_ns,
+    ):
+        self.clock = clock
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.total_ns: Dict[str, int] = defaultdict(int)
+        self.option_counts: Counter = Counter()
+        self.game_lengths: Counter = Counter()
+        self._started = time.monotonic()
+        self._last_dump = self._started
+
+    def add(self, name: str, elapsed_ns: int):
+        self.calls[name] += 1
+        self.total_ns[name] += elapsed_ns
+
+    def add_option_count(self, count: int):
+        self.option_counts[count] += 1
+
+    def add_game_length(self, rounds: int):
+        self.game_lengths[rounds] += 1
+
+    def reset(self):
+        self.calls.clear()
+        self.total_ns.clear()
+        self.option_counts.clear()
+        self.game_lengths.clear()
+        self._started = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the collected data as a JSON-ready dict."""
+        return {
+            "elapsed_s": time.monotonic() - self._started,
+            "timings": {
+                name: {
+                    "calls": calls,
+                    "total_s": self.total_ns[name] / 1e9,
+                    "mean_us": self.total_ns[name] / calls / 1e3,
+                }
+                for name, calls in sorted(self.calls.items())
+            },
+            "option_counts": {
+                str(count): seen for count, seen in sorted(self.option_counts.items())
+            },
+            "game_lengths": {
+                str(rounds): seen for rounds, seen in sorted(self.game_lengths.items())
+            },
+        }
+
+    def dump(self, path: Optional[str] = None):
+        """Writes ``snapshot`` as JSON to ``path`` (``dump_path`` by default)."""
+        path = path or self.dump_path
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+        os.replace(temp_path, path)
+        self._last_dump = time.monotonic()
+
+    def maybe_dump(self):
+        """Dumps to ``dump_path`` if ``dump_interval`` seconds passed since the last."""
+        if self.dump_path is not None:
+            if time.monotonic() - self._last_dump >= self.dump_interval:
+                self.dump()
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Adds up snapshots from several profilers, e.g. one per worker process."""
+    merged = {"elapsed_s": 0.0, "timings": {}, "option_counts": {}, "game_lengths": {}}
+    for snapshot in snapshots:
+        merged["elapsed_s"] = max(merged["elapsed_s"], snapshot["elapsed_s"])
+        for name, timing in snapshot["timings"].items():
+            total = merged["timings"].setdefault(name, {"calls": 0, "total_s": 0.0})
+            total["calls"] += timing["calls"]
+            total["total_s"] += timing["total_s"]
+        for key in ("option_counts", "game_lengths"):
+            for value, seen in snapshot[key].items():
+                merged[key][value] = merged[key].get(value, 0) + seen
+    for timing in merged["timings"].values():
+        timing["mean_us"] = timing["total_s"] / timing["calls"] * 1e6
+    return merged
@@ -0,0 +1,302 @@
+import math
+import random
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from actions import NUM_ACTIONS
+from agents import Agent
+from config import SCORE_TO_WIN
+
+# evaluate(game) -> (priors over NUM_ACTIONS or None, value per player)
+Evaluator = Callable[[object], Tuple[Optional[Sequence[float]], Sequence[float]]]
+
+
+def outcome(game) -> List[float]:
+    """
+    Value of ``game`` for each player in [0, 1]. Once someone has reached
+    ``SCORE_TO_WIN`` the leaders split 1. Before that each player gets a progress
+    estimate: score plus a third of a point per card bonus and a tenth of a point
+    per token, over ``SCORE_TO_WIN``.
+    """
+    scores = [player.score for player in game.players]
+    best = max(scores)
+    if best >= SCORE_TO_WIN:
+        winners = scores.count(best)
+        return [1.0 / winners if score == best else 0.0 for score in scores]
+    return [
+        min(
+            1.0,
+            (player.score + player.bonuses.count / 3 + player.tokens.count / 10)
+            / SCORE_TO_WIN,
+        )
+        for player in game.players
+    ]
+
+
+class RolloutEvaluator:
+    """
+    Plays uniformly random moves until the game ends, or for at most ``max_steps``
+    moves, and scores the result with ``outcome``.
+    """
+
+    def __init__(
+        self, max_steps: Optional[int] = None, rng: Optional[random.Random] = None
+    ):
+        self.max_steps = max_steps
+        self.rng = rng or random.Random()
+
+    def __call__(self, game):
+        records = []
+        mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        steps = 0
+        while not game.end and (self.max_steps is None or steps < self.max_steps):
+            steps += 1
+            legal = np.flatnonzero(game.legal_action_mask(mask))
+            records.append(game.apply(int(legal[self.rng.randrange(len(legal))])))
+        values = outcome(game)
+        for record in reversed(records):
+            game.undo(record)
+        return None, values
+
+
+class Node:
+    """Search statistics for one state, shared by every path reaching its hash."""
+
+    __slots__ = (
+        "player_id",
+        "actions",
+        "priors",
+        "visits",
+        "value_sums",
+        "total_visits",
+        "children",
+    )
+
+    def __init__(self, player_id: int, actions: List[int], priors: List[float]):
+        self.player_id = player_id
+        self.actions = actions
+        self.priors = priors
+        self.visits = [0] * len(actions)
+        self.value_sums = [0.0] * len(actions)
+        self.total_visits = 0
+        self.children: Dict[int, int] = {}  # action index -> child state hash
+
+    def mean_value(self) -> float:
+        if not self.total_visits:
+            return 0.0
+        return sum(self.value_sums) / self.total_visits
+
+
+class MCTS:
+    """
+    Monte Carlo Tree Search over ``Game`` using ``Game.apply`` / ``Game.undo``.
+
+    Nodes live in a transposition table keyed by ``Game.hash``, so transpositions
+    share statistics and the subtree under the move actually played is reused by the
+    next search. ``selection`` is "puct" (priors from the evaluator, uniform when it
+    returns None) or "uct". Each search runs until ``simulations`` playouts or
+    ``time_limit`` seconds, whichever comes first. The default evaluator plays
+    10 random moves past the leaf.
+
+    With ``determinize`` (the default) each playout first reorders the cards left in
+    the evaluation decks at random with ``rng``, so refills during the search draw
+    cards the player could not know in advance and the search depends only on what
+    is visible. Without it the search is perfect-information and sees the actual
+    deck order.
+    """
+
+    def __init__(
+        self,
+        evaluator: Optional[Evaluator] = None,
+        selection: str = "puct",
+        exploration: float = 1.4,
+        simulations: Optional[int] = 200,
+        time_limit: Optional[float] = None,
+        max_table_size: int = 200_000,
+        determinize: bool = True,
+        rng: Optional[random.Random] = None,
+    ):
+        if selection not in ("puct", "uct"):
+            raise ValueError(f"Unknown selection rule {selection}.")
+        if simulations is None and time_limit is None:
+            raise ValueError("A simulation or time budget is required.")
+        self.evaluator = evaluator or RolloutEvaluator(max_steps=10)
+        self.selection = selection
+        self.exploration = exploration
+        self.simulations = simulations
+        self.time_limit = time_limit
+        self.max_table_size = max_table_size
+        self.determinize = determinize
+        self.rng = rng or random.Random()
+        self.table: Dict[int, Node] = {}
+        self._mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    def search(self, game) -> Node:
+        """Runs one search from the current state of ``game`` and returns its node."""
+        if game.end:
+            raise ValueError("Cannot search from a finished game.")
+        if len(self.table) > self.max_table_size:
+            self.retain_subtree(game.hash)
+        if game.hash not in self.table:
+            self._expand(game)
+        deadline = (
+            None if self.time_limit is None else time.perf_counter() + self.time_limit
+        )
+        simulations = 0
+        while True:
+            if self.determinize:
+                hidden = self._determinize(game)
+                try:
+                    self._simulate(game)
+                finally:
+                    for deck, order in zip(game.board.evaluation_decks, hidden):
+                        deck.order[: deck.size] = order
+            else:
+                self._simulate(game)
+            simulations += 1
+            if self.simulations is not None and simulations >= self.simulations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return self.table[game.hash]
+
+    def visit_counts(self, game) -> np.ndarray:
+        """Visit count per action id at the state of ``game`` (zeros if unseen)."""
+        counts = np.zeros(NUM_ACTIONS, dtype=np.int64)
+        node = self.table.get(game.hash)
+        if node is not None:
+            counts[node.actions] = node.visits
+        return counts
+
+    def best_action(self, game) -> int:
+        """Searches and returns the most visited action, breaking ties by value."""
+        node = self.search(game)
+        visits = node.visits
+        value_sums = node.value_sums
+        best = max(
+            range(len(node.actions)),
+            key=lambda i: (visits[i], value_sums[i] / visits[i] if visits[i] else 0.0),
+        )
+        return node.actions[best]
+
+    def retain_subtree(self, root_hash: int):
+        """Drops every node not reachable from ``root_hash``."""
+        kept: Dict[int, Node] = {}
+        pending = [root_hash]
+        while pending:
+            state_hash = pending.pop()
+            node = self.table.get(state_hash)
+            if node is None or state_hash in kept:
+                continue
+            kept[state_hash] = node
+            pending.extend(node.children.values())
+        self.table = kept
+
+    def _determinize(self, game) -> List[array]:
+        """
+        Shuffles the undrawn cards of every evaluation deck, starting from their
+        sorted ids so the hidden order cannot leak in; returns the actual orders.
+        """
+        hidden = []
+        for deck in game.board.evaluation_decks:
+            order = deck.order[: deck.size]
+            hidden.append(order)
+            cards = sorted(order)
+            self.rng.shuffle(cards)
+            deck.order[: deck.size] = array("H", cards)
+        return hidden
+
+    def _simulate(self, game):
+        path = []
+        on_path = set()
+        while True:
+            if game.end:
+                values = outcome(game)
+                break
+            state_hash = game.hash
+            if state_hash in on_path:
+                # The path came back to one of its own states (e.g. every player
+                # withdrew nothing); evaluate here instead of walking the cycle.
+                values = self.evaluator(game)[1]
+                break
+            on_path.add(state_hash)
+            node = self.table.get(state_hash)
+            if node is None:
+                values = self._expand(game)
+                break
+            index = self._select(node)
+            record = game.apply(node.actions[index])
+            if record is None:
+                # The node came from another state with the same hash, where the
+                # action was legal; evaluate here instead of descending.
+                values = self.evaluator(game)[1]
+                break
+            path.append((node, index, record))
+            node.children[index] = game.hash
+
+        for node, index, record in reversed(path):
+            game.undo(record)
+            node.visits[index] += 1
+            node.value_sums[index] += values[node.player_id]
+            node.total_visits += 1
+
+    def _expand(self, game) -> Sequence[float]:
+        actions = np.flatnonzero(game.legal_action_mask(self._mask)).tolist()
+        priors, values = self.evaluator(game)
+        if priors is None:
+            action_priors = [1.0 / len(actions)] * len(actions)
+        else:
+            action_priors = [float(priors[action]) for action in actions]
+            total = sum(action_priors)
+            if total > 0:
+                action_priors = [prior / total for prior in action_priors]
+            else:
+                action_priors = [1.0 / len(actions)] * len(actions)
+        self.table[game.hash] = Node(game.current_player_id, actions, action_priors)
+        return values
+
+    def _select(self, node: Node) -> int:
+        visits = node.visits
+        value_sums = node.value_sums
+        exploration = self.exploration
+        first_play = node.mean_value()
+        best_index, best_score = 0, -math.inf
+        if self.selection == "uct":
+            log_total = math.log(node.total_visits + 1)
+            for index, count in enumerate(visits):
+                if not count:
+                    return index
+                score = value_sums[index] / count + exploration * math.sqrt(
+                    log_total / count
+                )
+                if score > best_score:
+                    best_index, best_score = index, score
+            return best_index
+
+        sqrt_total = math.sqrt(node.total_visits + 1)
+        for index, (count, prior) in enumerate(zip(visits, node.priors)):
+            value = value_sums[index] / count if count else first_play
+            score = value + exploration * prior * sqrt_total / (1 + count)
+            if score > best_score:
+                best_index, best_score = index, score
+        return best_index
+
+
+class MCTSAgent(Agent):
+    """Plays the most visited action of an ``MCTS`` search, reusing its tree."""
+
+    def __init__(self, mcts: Optional[MCTS] = None):
+        self.mcts = mcts or MCTS()
+
+    def select_action(self, game) -> int:
+        return self.mcts.best_action(game)
+
+    def reset(self, rng: Optional[random.Random] = None):
+        self.mcts.table.clear()
+        if rng is not None:
+            self.mcts.rng = random.Random(rng.getrandbits(64))
+            if isinstance(self.mcts.evaluator, RolloutEvaluator):
+                self.mcts.evaluator.rng = random.Random(rng.getrandbits(64))
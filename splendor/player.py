@@ -1,10 +1,15 @@
-from typing import List
+from typing import Iterator, List, Optional
 
 from board import Board
 from card import Card, EvaluationCard, Noble
 from config import MAX_RESERVED_CARDS, MAX_TOKENS_PER_PLAYER
 from deck import NobleDeck, EvaluationDeck
-from tokens import Tokens
+from tokens import FrozenTokens, Tokens
+from withdrawal import withdrawal_options
+from zobrist import BOARD_OWNER, OWNED_PLACE, ZobristHasher, reserved_place
+
+ONE_GOLD = FrozenTokens(gold=1)
+_NO_TOKENS = FrozenTokens()
 
 
 class Player:
@@ -15,95 +20,128 @@ class Player:
         ]
         self.reserved_cards: List[EvaluationCard] = []
         self.tokens = Tokens()  # Initialize tokens
+        # Running totals over owned cards, kept in step by the buy_* methods
+        self._bonus_total = Tokens()
+        self._score = 0
+        # Set by Game so state changes keep the game hash current
+        self.zobrist: Optional[ZobristHasher] = None
+        self.zobrist_id = 0
+
+    def reset(self):
+        """Empties the player's hand in place for a new game."""
+        self.noble_deck.clear()
+        for deck in self.evaluation_decks:
+            deck.clear()
+        self.reserved_cards.clear()
+        self.tokens.set(_NO_TOKENS)
+        self._bonus_total.set(_NO_TOKENS)
+        self._score = 0
 
     def get_withdrawal_options(self, board: Board) -> List[Tokens]:
         """
         Generate a list of all possible token withdrawal options from the main token deck
         on the board, based on the rules provided.
-        """
-
-        # withdraw noting is also an option
-        options: List[Tokens] = [Tokens()]
 
-        # Rule 1: Ensure no more than 10 tokens after withdrawal
-        max_withdrawal = MAX_TOKENS_PER_PLAYER - self.tokens.count
-        if max_withdrawal <= 0:
-            return options  # No options if the player already has 10 or more tokens
-
-        # Rule 2: Withdraw 1, 2, or 3 tokens of different colors
-        available_colors = [
-            (color, getattr(board.tokens, color))
-            for color in ["red", "green", "blue", "white", "black"]
-            if getattr(board.tokens, color) > 0  # Exclude empty colors
-        ]
-        num_available_colors = len(available_colors)
-
-        # Withdraw combinations of 1, 2, or 3 tokens (different colors)
-        max_withdrawal_different_color = min(max_withdrawal, 3, num_available_colors)
-        for i in range(1, max_withdrawal_different_color + 1):  # 1 to 3 tokens
-            combinations = self._get_combinations(available_colors, i)
-            for combo in combinations:
-                options.append(Tokens(**{color: 1 for color, _ in combo}))
-
-        # Rule 3: Withdraw 2 tokens of the same color (if there are at least 4 available)
-        if max_withdrawal >= 2:
-            for color in ["red", "green", "blue", "white", "black"]:
-                if getattr(board.tokens, color) >= 4:
-                    option = Tokens(**{color: 2})
-                    options.append(option)
-
-        return options
+        Withdrawing nothing is always an option; at most 10 tokens may be held after the
+        withdrawal; 1, 2 or 3 tokens of different colors may be taken, or 2 tokens of the
+        same color if at least 4 of that color are available. The options come from a
+        table precomputed in ``withdrawal`` and are shared, read-only Tokens.
+        """
+        return list(
+            withdrawal_options(board.tokens, MAX_TOKENS_PER_PLAYER - self.tokens.count)
+        )
 
     def withdrawal(self, board: Board, tokens: Tokens):
         self.tokens += tokens
         board.tokens -= tokens
+        if self.zobrist is not None:
+            self._hash_token_move(board, tokens, 1)
 
-    @staticmethod
-    def _get_combinations(colors, count):
-        """Helper function to get combinations of colors."""
-        from itertools import combinations
-
-        return list(combinations(colors, count))
+    def _hash_token_move(self, board: Board, tokens: Tokens, sign: int):
+        # tokens moved from the board to the player (sign=1) or back (sign=-1)
+        owner = BOARD_OWNER + 1 + self.zobrist_id
+        self.zobrist.move_tokens(owner, self.tokens, tokens, sign)
+        self.zobrist.move_tokens(BOARD_OWNER, board.tokens, tokens, -sign)
 
     def _bonuses(self) -> Tokens:
-        return sum((deck.bonus for deck in self.evaluation_decks), Tokens())
+        return self._bonus_total
+
+    @property
+    def bonuses(self) -> Tokens:
+        """Bonus tokens granted by owned evaluation cards. Do not modify."""
+        return self._bonus_total
+
+    def add_evaluation_card(self, card: EvaluationCard, deck_index: int):
+        """Adds an owned evaluation card and updates the bonus and score totals."""
+        self.evaluation_decks[deck_index].add_card(card)
+        self._bonus_total += card.bonus
+        self._score += card.score
+        if self.zobrist is not None:
+            self.zobrist.toggle_card(OWNED_PLACE + self.zobrist_id, card)
+
+    def add_noble_card(self, card: Noble):
+        """Adds an owned noble card and updates the score total."""
+        self.noble_deck.add_card(card)
+        self._score += card.score
+        if self.zobrist is not None:
+            self.zobrist.toggle_card(OWNED_PLACE + self.zobrist_id, card)
+
+    def remove_evaluation_card(self, deck_index: int) -> EvaluationCard:
+        """Removes the last card added to an evaluation deck, undoing its totals."""
+        card = self.evaluation_decks[deck_index].get_card()
+        self._bonus_total -= card.bonus
+        self._score -= card.score
+        if self.zobrist is not None:
+            self.zobrist.toggle_card(OWNED_PLACE + self.zobrist_id, card)
+        return card
+
+    def remove_noble_card(self) -> Noble:
+        """Removes the last noble card added, undoing its score."""
+        card = self.noble_deck.get_card()
+        self._score -= card.score
+        if self.zobrist is not None:
+            self.zobrist.toggle_card(OWNED_PLACE + self.zobrist_id, card)
+        return card
 
     def _cost_after_bonus_usage(self, card: Card) -> Tokens:
-        bonuses = self._bonuses()
-        return Tokens(
-            red=max(0, card.cost.red - bonuses.red),
-            green=max(0, card.cost.green - bonuses.green),
-            blue=max(0, card.cost.blue - bonuses.blue),
-            white=max(0, card.cost.white - bonuses.white),
-            black=max(0, card.cost.black - bonuses.black),
-        )
+        remaining_cost = card.cost.clamped_sub(self._bonuses())
+        remaining_cost.gold = 0
+        return remaining_cost
 
     def _wildcard_to_use(self, cost: Tokens) -> int:
-        remaining_cost = Tokens(
-            red=max(0, cost.red - self.tokens.red),
-            green=max(0, cost.green - self.tokens.green),
-            blue=max(0, cost.blue - self.tokens.blue),
-            white=max(0, cost.white - self.tokens.white),
-            black=max(0, cost.black - self.tokens.black),
-        )
-
-        total_shortage = (
-            remaining_cost.red
-            + remaining_cost.green
-            + remaining_cost.blue
-            + remaining_cost.white
-            + remaining_cost.black
+        tokens = self.tokens
+        return (
+            max(0, cost.red - tokens.red)
+            + max(0, cost.green - tokens.green)
+            + max(0, cost.blue - tokens.blue)
+            + max(0, cost.white - tokens.white)
+            + max(0, cost.black - tokens.black)
         )
-        return total_shortage
 
     def can_buy_evaluation_card(self, card: EvaluationCard) -> bool:
         """
         Check if the player can buy an evaluation card based on their tokens and bonuses.
         """
-        # Calculate the cost after applying bonuses
-        remaining_cost = self._cost_after_bonus_usage(card)
-        gold_needed = self._wildcard_to_use(remaining_cost)
-        return self.tokens.gold >= gold_needed
+        return self.tokens.gold >= self._gold_needed(card)
+
+    def _gold_needed(self, card: Card) -> int:
+        # Same as _wildcard_to_use(_cost_after_bonus_usage(card)) without allocating:
+        # max(0, max(0, cost - bonus) - tokens) == max(0, cost - bonus - tokens)
+        cost = card.cost
+        bonuses = self._bonus_total
+        tokens = self.tokens
+        red = cost.red - bonuses.red - tokens.red
+        green = cost.green - bonuses.green - tokens.green
+        blue = cost.blue - bonuses.blue - tokens.blue
+        white = cost.white - bonuses.white - tokens.white
+        black = cost.black - bonuses.black - tokens.black
+        return (
+            (red if red > 0 else 0)
+            + (green if green > 0 else 0)
+            + (blue if blue > 0 else 0)
+            + (white if white > 0 else 0)
+            + (black if black > 0 else 0)
+        )
 
     def evaluation_buying_options(self, board) -> List[EvaluationCard]:
         options: List[EvaluationCard] = []
@@ -115,7 +153,9 @@ class Player:
 
     def noble_buying_options(self, board) -> List[Noble]:
         return [
-            card for card in board.exposed_noble_cards if self.can_buy_noble_card(card)
+            card
+            for card in board.exposed_noble_cards
+            if card is not None and self.can_buy_noble_card(card)
         ]
 
     def can_buy_noble_card(self, card: Noble) -> bool:
@@ -124,9 +164,11 @@ class Player:
         """
         # Calculate the cost after applying bonuses
         remaining_cost = self._cost_after_bonus_usage(card)
-        return remaining_cost == Tokens()
+        return remaining_cost.count == 0
 
-    def buy_evaluation_card(self, board: Board, deck_index: int, card_index: int):
+    def buy_evaluation_card(
+        self, board: Board, deck_index: int, card_index: int
+    ) -> Tokens:
         # Validate deck and card indices
         if not (0 <= deck_index < len(board.exposed_evaluation_cards)) or not (
             0 <= card_index < len(board.exposed_evaluation_cards[deck_index])
@@ -141,11 +183,12 @@ class Player:
             raise ValueError("Player cannot afford the evaluation card.")
 
         # buy the card
-        self._buy_card_helper(board, card)
+        transaction = self._buy_card_helper(board, card)
 
         # Take the card and add it to the player's deck
         card = board.take_evaluation_card(deck_index, card_index)
-        self.evaluation_decks[deck_index].cards.append(card)
+        self.add_evaluation_card(card, deck_index)
+        return transaction
 
     def buy_noble_card(self, board: Board, card_index: int):
         # Validate deck and card indices
@@ -160,7 +203,7 @@ class Player:
             raise ValueError("Player cannot afford the noble card.")
 
         card = board.take_noble_card(card_index)
-        self.noble_deck.cards.append(card)
+        self.add_noble_card(card)
 
     def can_reserve(self):
         return len(self.reserved_cards) < MAX_RESERVED_CARDS
@@ -177,19 +220,20 @@ class Player:
             raise ValueError("Player cannot reserve a card.")
         card = board.take_evaluation_card(deck_index, card_index)
         self.reserved_cards.append(card)
+        if self.zobrist is not None:
+            index = len(self.reserved_cards) - 1
+            self.zobrist.toggle_card(reserved_place(self.zobrist_id, index), card)
 
     def reserve_with_gold(self, board: Board, deck_index: int, card_index: int):
         if not self.can_reserve_with_gold(board):
             raise ValueError("Player cannot reserve a card.")
         self.reserve_without_gold(board, deck_index, card_index)
-        transaction = Tokens(
-            gold=1,
-        )
+        self.tokens += ONE_GOLD
+        board.tokens -= ONE_GOLD
+        if self.zobrist is not None:
+            self._hash_token_move(board, ONE_GOLD, 1)
 
-        self.tokens += transaction
-        board.tokens -= transaction
-
-    def buy_reserved_card(self, board: Board, card_index: int):
+    def buy_reserved_card(self, board: Board, card_index: int) -> Tokens:
         # Validate deck and card indices
         if not (0 <= card_index < len(self.reserved_cards)):
             raise ValueError("Invalid deck_index or card_index.")
@@ -202,54 +246,81 @@ class Player:
             raise ValueError("Player cannot afford the reserved card.")
 
         # buy the card
-        self._buy_card_helper(board, card)
+        transaction = self._buy_card_helper(board, card)
 
         # Take the card and add it to the player's deck
         card = self.reserved_cards.pop(card_index)
-        self.evaluation_decks[card.level - 1].cards.append(card)
-
-    def _buy_card_helper(self, board: Board, card: EvaluationCard):
+        if self.zobrist is not None:
+            self._hash_reserved_removal(card_index, card)
+        self.add_evaluation_card(card, card.level - 1)
+        return transaction
+
+    def _hash_reserved_removal(self, card_index: int, card: EvaluationCard):
+        # The cards after the removed one move down one index
+        zobrist, player_id = self.zobrist, self.zobrist_id
+        zobrist.toggle_card(reserved_place(player_id, card_index), card)
+        for index in range(card_index, len(self.reserved_cards)):
+            shifted = self.reserved_cards[index]
+            zobrist.toggle_card(reserved_place(player_id, index + 1), shifted)
+            zobrist.toggle_card(reserved_place(player_id, index), shifted)
+
+    def _buy_card_helper(self, board: Board, card: EvaluationCard) -> Tokens:
         # Calculate remaining cost and the tokens to use
         remaining_cost = self._cost_after_bonus_usage(card)
         gold_needed = self._wildcard_to_use(remaining_cost)
+        tokens = self.tokens
         transaction = Tokens(
-            red=min(remaining_cost.red, self.tokens.red),
-            green=min(remaining_cost.green, self.tokens.green),
-            blue=min(remaining_cost.blue, self.tokens.blue),
-            white=min(remaining_cost.white, self.tokens.white),
-            black=min(remaining_cost.black, self.tokens.black),
-            gold=gold_needed,
+            min(remaining_cost.red, tokens.red),
+            min(remaining_cost.green, tokens.green),
+            min(remaining_cost.blue, tokens.blue),
+            min(remaining_cost.white, tokens.white),
+            min(remaining_cost.black, tokens.black),
+            gold_needed,
         )
 
         # Deduct tokens from the player and return to the board
         self.tokens -= transaction
         board.tokens += transaction
+        if self.zobrist is not None:
+            self._hash_token_move(board, transaction, -1)
+        return transaction
 
     @property
     def score(self) -> int:
-        return self.noble_deck.score + sum(deck for deck in self.evaluation_decks)
+        return self._score
 
     def get_buy_evaluation_options(self, board: Board) -> List[EvaluationCard]:
-        result: List[EvaluationCard] = []
-        for deck in board.exposed_evaluation_cards:
-            result.extend([card for card in deck if self.can_buy_evaluation_card(card)])
-        return result
+        return list(self.iter_buy_evaluation_options(board))
 
     def get_buy_reserved_options(self) -> List[EvaluationCard]:
-        return [
-            card for card in self.reserved_cards if self.can_buy_evaluation_card(card)
-        ]
+        return list(self.iter_buy_reserved_options())
 
     def get_reserved_without_gold_options(self, board: Board) -> List[EvaluationCard]:
-        if not self.can_reserve():
-            return []
-
-        result: List[EvaluationCard] = []
-        for deck in board.exposed_evaluation_cards:
-            result.extend([card for card in deck])
-        return result
+        return list(self.iter_reserve_options(board, use_gold=False))
 
     def get_reserved_with_gold_options(self, board: Board) -> List[EvaluationCard]:
-        if not self.can_reserve_with_gold(board):
-            return []
-        return self.get_reserved_without_gold_options(board)
+        return list(self.iter_reserve_options(board, use_gold=True))
+
+    def iter_buy_evaluation_options(self, board: Board) -> Iterator[EvaluationCard]:
+        for deck in board.exposed_evaluation_cards:
+            for card in deck:
+                if card is not None and self.can_buy_evaluation_card(card):
+                    yield card
+
+    def iter_buy_reserved_options(self) -> Iterator[EvaluationCard]:
+        for card in self.reserved_cards:
+            if self.can_buy_evaluation_card(card):
+                yield card
+
+    def iter_reserve_options(
+        self, board: Board, use_gold: bool
+    ) -> Iterator[EvaluationCard]:
+        if use_gold:
+            if not self.can_reserve_with_gold(board):
+                return
+        elif not self.can_reserve():
+            return
+        for deck in board.exposed_evaluation_cards:
+            for card in deck:
+                if card is not None:
+                    yield card
@@ -0,0 +1,93 @@
+import math
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+ELO_PER_NATURAL = 400 / math.log(10)
+
+
+class Rating(NamedTuple):
+    elo: float
+    low: float  # bounds of the confidence interval
+    high: float
+    games: int
+
+
+class RatingTable:
+    """
+    Elo ratings with confidence intervals from head-to-head results.
+
+    A game between several players counts as one result per pair of players, scored
+    1, 0.5 or 0 by comparing their final scores. Ratings are the Bradley-Terry
+    maximum likelihood fit (the model behind Elo) rather than a sequential update, so
+    they do not depend on the order games finish in. Each pair that met also gets
+    ``prior_draws`` virtual draws, which keeps unbeaten players finite. Ratings are
+    centred on a mean of 0.
+    """
+
+    def __init__(self, names: Sequence[str], prior_draws: float = 1.0):
+        self.names = list(names)
+        self._index = {name: index for index, name in enumerate(self.names)}
+        count = len(self.names)
+        self.wins = np.zeros((count, count))  # points of row against column
+        self.meetings = np.zeros((count, count))
+        self.games = np.zeros(count, dtype=np.int64)
+        self.prior_draws = prior_draws
+
+    def add_game(self, names: Sequence[str], scores: Sequence[int]):
+        """Adds one game given the player names and final scores by seat."""
+        seats = [self._index[name] for name in names]
+        for seat in seats:
+            self.games[seat] += 1
+        for first in range(len(seats)):
+            for second in range(first + 1, len(seats)):
+                a, b = seats[first], seats[second]
+                if a == b:
+                    continue
+                result = 0.5 + 0.5 * np.sign(scores[first] - scores[second])
+                self.wins[a, b] += result
+                self.wins[b, a] += 1 - result
+                self.meetings[a, b] += 1
+                self.meetings[b, a] += 1
+
+    def fit(self, iterations: int = 200, z: float = 1.96) -> Dict[str, Rating]:
+        """Fits the ratings; intervals cover ``z`` standard errors each way."""
+        met = self.meetings > 0
+        meetings = self.meetings + self.prior_draws * met
+        wins = self.wins + 0.5 * self.prior_draws * met
+        total_wins = wins.sum(axis=1)
+        strength = np.ones(len(self.names))
+        active = total_wins > 0
+        for _ in range(iterations):
+            # Minorization-maximization update (Hunter, 2004)
+            denominator = (meetings / (strength[:, None] + strength[None, :])).sum(1)
+            updated = np.where(active, total_wins / np.maximum(denominator, 1e-300), 1)
+            updated /= math.exp(np.log(updated[active]).mean()) if active.any() else 1
+            if np.allclose(updated, strength, rtol=1e-10, atol=0):
+                strength = updated
+                break
+            strength = updated
+
+        log_strength = np.log(strength)
+        log_strength -= log_strength[active].mean() if active.any() else 0
+        # Covariance from the Fisher information, with the mean fixed by the pinv
+        products = strength[:, None] * strength[None, :]
+        information = meetings * products / (strength[:, None] + strength[None, :]) ** 2
+        information = np.diag(information.sum(axis=1)) - information
+        variances = np.diag(np.linalg.pinv(information))
+
+        ratings = {}
+        for index, name in enumerate(self.names):
+            elo = ELO_PER_NATURAL * log_strength[index]
+            if active[index]:
+                error = z * ELO_PER_NATURAL * math.sqrt(max(variances[index], 0.0))
+            else:
+                error = math.inf  # never met anyone
+            ratings[name] = Rating(
+                elo, elo - error, elo + error, int(self.games[index])
+            )
+        return ratings
+
+    def standings(self) -> List[tuple]:
+        """(name, rating) pairs from the best rated down."""
+        return sorted(self.fit().items(), key=lambda item: -item[1].elo)
@@ -0,0 +1,28 @@
+import random
+
+import numpy as np
+
+# Streams of a game below its own seed, see ``stream_seed``
+DEAL_STREAM = 0
+AGENT_STREAM = 1
+
+
+def stream_seed(run_seed: int, *key: int) -> int:
+    """
+    64-bit seed of the stream ``key`` of a run, e.g. (game index,). Streams with
+    different keys are statistically independent (``numpy.random.SeedSequence``
+    spawn keys), so any game can be regenerated from the run seed and its key alone,
+    whichever worker or node played it.
+    """
+    words = np.random.SeedSequence(run_seed, spawn_key=key).generate_state(2)
+    return int(words[0]) | int(words[1]) << 32
+
+
+def game_seed(run_seed: int, game_index: int) -> int:
+    """Seed of the deck shuffles of game ``game_index`` of a run (``Game.seed``)."""
+    return stream_seed(run_seed, game_index, DEAL_STREAM)
+
+
+def game_rng(run_seed: int, game_index: int, stream: int = DEAL_STREAM):
+    """A ``random.Random`` for one stream of game ``game_index`` of a run."""
+    return random.Random(stream_seed(run_seed, game_index, stream))
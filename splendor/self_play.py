@@ -0,0 +1,345 @@
+import itertools
+import multiprocessing as mp
+import random
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from actions import NUM_ACTIONS
+from agents import Agent, RandomAgent
+from encoding import ObservationEncoder
+from game import Game
+from seeding import AGENT_STREAM, game_rng, game_seed, stream_seed
+
+# agent_factory(worker_rng, seat) -> Agent, called once per worker and seat; each
+# game then calls agent.reset(rng) with an RNG from that game's agent stream. Must be
+# picklable (a module-level function)
+AgentFactory = Callable[[random.Random, int], Agent]
+
+# Per worker counters stored at the start of the shared block
+_TRANSITIONS, _GAMES, _NUM_COUNTERS = 0, 1, 2
+
+
+def random_agent_factory(rng: random.Random, seat: int) -> Agent:
+    return RandomAgent(random.Random(rng.getrandbits(64)))
+
+
+class TransitionBuffer:
+    """
+    Ring buffers of encoded transitions in one shared memory block.
+
+    Each worker owns a ring of ``capacity`` rows (observation, action, legal mask,
+    reward, done, player) and is its only writer, so no locking is needed: a row is
+    written first and published by bumping the worker's transition counter. Readers
+    in any process attach by ``name`` and see the rows as NumPy views.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        capacity: int,
+        observation_size: int,
+        name: Optional[str] = None,
+    ):
+        self.num_workers = num_workers
+        self.capacity = capacity
+        self.observation_size = observation_size
+
+        fields = [
+            ("counters", np.int64, (num_workers, _NUM_COUNTERS)),
+            ("observations", np.float32, (num_workers, capacity, observation_size)),
+            ("legal_masks", np.bool_, (num_workers, capacity, NUM_ACTIONS)),
+            ("rewards", np.float32, (num_workers, capacity)),
+            ("actions", np.int16, (num_workers, capacity)),
+            ("players", np.int8, (num_workers, capacity)),
+            ("dones", np.bool_, (num_workers, capacity)),
+        ]
+        layout = []
+        size = 0
+        for field, dtype, shape in fields:
+            dtype = np.dtype(dtype)
+            size = -(-size // dtype.alignment) * dtype.alignment
+            layout.append((field, dtype, shape, size))
+            size += dtype.itemsize * int(np.prod(shape))
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        for field, dtype, shape, offset in layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, field, array)
+        if self._owner:
+            self.counters[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def spec(self) -> tuple:
+        """Arguments that attach another process to this buffer."""
+        return self.num_workers, self.capacity, self.observation_size, self.name
+
+    def slot(self, worker: int) -> int:
+        """Row the next transition of ``worker`` is written to."""
+        return int(self.counters[worker, _TRANSITIONS]) % self.capacity
+
+    def publish(self, worker: int, action: int, reward: float, done: bool, player):
+        """Completes the row at ``slot(worker)`` and makes it visible to readers."""
+        slot = self.slot(worker)
+        self.actions[worker, slot] = action
+        self.rewards[worker, slot] = reward
+        self.dones[worker, slot] = done
+        self.players[worker, slot] = player
+        self.counters[worker, _TRANSITIONS] += 1
+
+    def transitions_written(self) -> int:
+        return int(self.counters[:, _TRANSITIONS].sum())
+
+    def games_finished(self) -> int:
+        return int(self.counters[:, _GAMES].sum())
+
+    def valid_rows(self, worker: int) -> np.ndarray:
+        """
+        Rows of ``worker`` holding complete transitions, oldest first. Once the ring
+        has wrapped, the row being overwritten next is left out.
+        """
+        written = int(self.counters[worker, _TRANSITIONS])
+        if written < self.capacity:
+            return np.arange(written)
+        start = written % self.capacity + 1
+        return (start + np.arange(self.capacity - 1)) % self.capacity
+
+    def sample(
+        self, batch_size: int, rng: np.random.Generator
+    ) -> Dict[str, np.ndarray]:
+        """Copies ``batch_size`` transitions drawn uniformly from every worker."""
+        workers = []
+        rows = []
+        for worker in range(self.num_workers):
+            valid = self.valid_rows(worker)
+            workers.append(np.full(len(valid), worker))
+            rows.append(valid)
+        workers = np.concatenate(workers)
+        rows = np.concatenate(rows)
+        if not len(rows):
+            raise ValueError("The buffer holds no transitions yet.")
+        picks = rng.integers(len(rows), size=batch_size)
+        workers, rows = workers[picks], rows[picks]
+        return {
+            "observations": self.observations[workers, rows],
+            "actions": self.actions[workers, rows],
+            "legal_masks": self.legal_masks[workers, rows],
+            "rewards": self.rewards[workers, rows],
+            "dones": self.dones[workers, rows],
+            "players": self.players[workers, rows],
+        }
+
+    def close(self):
+        """Detaches from the block; the creating process also frees it."""
+        for field in (
+            "counters",
+            "observations",
+            "legal_masks",
+            "rewards",
+            "actions",
+            "players",
+            "dones",
+        ):
+            setattr(self, field, None)
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _play(
+    worker: int,
+    num_workers: int,
+    buffer_spec: tuple,
+    stop: mp.Event,
+    seed: int,
+    noble_file: str,
+    evaluation_files: Sequence[str],
+    num_of_players: int,
+    max_rounds: int,
+    agent_factory: AgentFactory,
+):
+    buffer = TransitionBuffer(*buffer_spec)
+    try:
+        game = Game()
+        game.setup_game(noble_file, list(evaluation_files), num_of_players, max_rounds)
+        encoder = ObservationEncoder(num_of_players)
+        worker_rng = random.Random(stream_seed(seed, worker))
+        agents = [agent_factory(worker_rng, seat) for seat in range(num_of_players)]
+        observations, legal_masks = buffer.observations, buffer.legal_masks
+
+        for game_index in itertools.count(worker, num_workers):
+            if stop.is_set():
+                break
+            game.seed(game_seed(seed, game_index))
+            game.reset()
+            agent_rng = game_rng(seed, game_index, AGENT_STREAM)
+            for agent in agents:
+                agent.reset(random.Random(agent_rng.getrandbits(64)))
+            while not game.end and not stop.is_set():
+                slot = buffer.slot(worker)
+                player_id = game.current_player_id
+                player = game.players[player_id]
+                encoder.encode(game, observations[worker, slot])
+                game.legal_action_mask(legal_masks[worker, slot])
+                score = player.score
+                action = agents[player_id].select_action(game)
+                if not game.step(action):
+                    raise ValueError(f"Agent chose illegal action {action}.")
+                buffer.publish(
+                    worker, action, player.score - score, game.end, player_id
+                )
+            if game.end:
+                buffer.counters[worker, _GAMES] += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        buffer.close()
+
+
+class SelfPlayRunner:
+    """
+    Plays games in ``num_workers`` processes and streams their transitions into a
+    shared ``TransitionBuffer``.
+
+    Worker ``i`` plays games ``i``, ``i + num_workers``, ... of the run, and game ``k``
+    takes its shuffles from the streams of ``seeding`` for ``(seed, k)``. Each worker
+    builds its agents once with ``agent_factory`` and resets them before every game
+    with RNGs drawn from the agent stream of that game, so a game whose agents draw
+    only from those RNGs can be replayed alone whatever the number of workers. The
+    reward of a transition is the score the acting player gained with the move. Use as
+    a context manager, or call ``stop`` and ``close``.
+    """
+
+    def __init__(
+        self,
+        noble_file: str,
+        evaluation_files: List[str],
+        num_of_players: int,
+        max_rounds: int,
+        num_workers: int = None,
+        capacity: int = 100_000,
+        seed: int = 0,
+        agent_factory: AgentFactory = random_agent_factory,
+        context: Optional[str] = None,
+    ):
+        self.num_workers = num_workers or mp.cpu_count()
+        self.seed = seed
+        self._context = mp.get_context(context)
+        self._args = (
+            str(noble_file),
+            [str(path) for path in evaluation_files],
+            num_of_players,
+            max_rounds,
+            agent_factory,
+        )
+        self.buffer = TransitionBuffer(
+            self.num_workers, capacity, ObservationEncoder(num_of_players).size
+        )
+        self._stop = self._context.Event()
+        self._processes: List[mp.Process] = []
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+
+    def start(self):
+        if self._processes:
+            raise RuntimeError("Self-play is already running.")
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._stopped_at = None
+        for worker in range(self.num_workers):
+            process = self._context.Process(
+                target=_play,
+                args=(
+                    worker,
+                    self.num_workers,
+                    self.buffer.spec(),
+                    self._stop,
+                    self.seed,
+                )
+                + self._args,
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    def stop(self, timeout: float = 5.0):
+        """Asks workers to finish their current move, then terminates stragglers."""
+        self._stop.set()
+        deadline = time.perf_counter() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.perf_counter()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        if self._processes and self._stopped_at is None:
+            self._stopped_at = time.perf_counter()
+        self._processes = []
+
+    def run(
+        self,
+        games: Optional[int] = None,
+        duration: Optional[float] = None,
+        poll_interval: float = 0.05,
+    ) -> Dict[str, float]:
+        """
+        Plays until ``games`` games have finished or ``duration`` seconds have passed,
+        whichever comes first, and returns ``stats``. Ctrl-C stops the workers cleanly.
+        """
+        if games is None and duration is None:
+            raise ValueError("A number of games or a duration is required.")
+        self.start()
+        processes = self._processes
+        try:
+            while all(process.is_alive() for process in processes):
+                if games is not None and self.buffer.games_finished() >= games:
+                    break
+                if duration is not None and self.elapsed() >= duration:
+                    break
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        failed = [p.exitcode for p in processes if p.exitcode and p.exitcode > 0]
+        if failed:
+            raise RuntimeError(f"Self-play workers failed with exit codes {failed}.")
+        return self.stats()
+
+    def elapsed(self) -> float:
+        if self._started_at is None:
+            return 0.0
+        end = self._stopped_at if self._stopped_at is not None else time.perf_counter()
+        return end - self._started_at
+
+    def stats(self) -> Dict[str, float]:
+        """Games and steps played so far and their rates per second."""
+        games = self.buffer.games_finished()
+        steps = self.buffer.transitions_written()
+        elapsed = self.elapsed()
+        return {
+            "games": games,
+            "steps": steps,
+            "elapsed": elapsed,
+            "games_per_sec": games / elapsed if elapsed else 0.0,
+            "steps_per_sec": steps / elapsed if elapsed else 0.0,
+        }
+
+    def close(self):
+        self.stop()
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
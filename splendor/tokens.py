@@ -1,14 +1,33 @@
-from dataclasses import dataclass
+COLORS = ("red", "green", "blue", "white", "black")
+TOKEN_TYPES = COLORS + ("gold",)  # Gold tokens are wildcards
 
 
-@dataclass
 class Tokens:
-    red: int = 0
-    green: int = 0
-    blue: int = 0
-    white: int = 0
-    black: int = 0
-    gold: int = 0  # Gold tokens are wildcards
+    """
+    Token counts for the five colors plus gold.
+
+    The six counts live in ``__slots__`` so reading and writing a color is a plain
+    attribute access and no per-instance ``__dict__`` is allocated. ``+=`` and ``-=``
+    update the left-hand side in place; use ``+`` / ``-`` when a new object is needed.
+    """
+
+    __slots__ = TOKEN_TYPES
+
+    def __init__(
+        self,
+        red: int = 0,
+        green: int = 0,
+        blue: int = 0,
+        white: int = 0,
+        black: int = 0,
+        gold: int = 0,
+    ):
+        self.red = red
+        self.green = green
+        self.blue = blue
+        self.white = white
+        self.black = black
+        self.gold = gold
 
     def __eq__(self, other):
         if not isinstance(other, Tokens):
@@ -22,28 +41,120 @@ class Tokens:
             and self.gold == other.gold
         )
 
+    def __hash__(self):
+        return hash(
+            (self.red, self.green, self.blue, self.white, self.black, self.gold)
+        )
+
     def __add__(self, other):
         if not isinstance(other, Tokens):
             return NotImplemented
         return Tokens(
-            red=self.red + other.red,
-            green=self.green + other.green,
-            blue=self.blue + other.blue,
-            white=self.white + other.white,
-            black=self.black + other.black,
-            gold=self.gold + other.gold,
+            self.red + other.red,
+            self.green + other.green,
+            self.blue + other.blue,
+            self.white + other.white,
+            self.black + other.black,
+            self.gold + other.gold,
         )
 
     def __sub__(self, other):
         if not isinstance(other, Tokens):
             return NotImplemented
         return Tokens(
-            red=self.red - other.red,
-            green=self.green - other.green,
-            blue=self.blue - other.blue,
-            white=self.white - other.white,
-            black=self.black - other.black,
-            gold=self.gold - other.gold,
+            self.red - other.red,
+            self.green - other.green,
+            self.blue - other.blue,
+            self.white - other.white,
+            self.black - other.black,
+            self.gold - other.gold,
+        )
+
+    def __iadd__(self, other):
+        if not isinstance(other, Tokens):
+            return NotImplemented
+        self.red += other.red
+        self.green += other.green
+        self.blue += other.blue
+        self.white += other.white
+        self.black += other.black
+        self.gold += other.gold
+        return self
+
+    def __isub__(self, other):
+        if not isinstance(other, Tokens):
+            return NotImplemented
+        self.red -= other.red
+        self.green -= other.green
+        self.blue -= other.blue
+        self.white -= other.white
+        self.black -= other.black
+        self.gold -= other.gold
+        return self
+
+    def __reduce__(self):
+        return type(self), self.as_tuple()
+
+    def as_tuple(self):
+        """Returns the counts as a tuple in ``TOKEN_TYPES`` order."""
+        return self.red, self.green, self.blue, self.white, self.black, self.gold
+
+    @property
+    def __dict__(self):
+        return dict(zip(TOKEN_TYPES, self.as_tuple()))
+
+    def copy(self) -> "Tokens":
+        """Returns a mutable copy of these tokens."""
+        return Tokens(
+            self.red, self.green, self.blue, self.white, self.black, self.gold
+        )
+
+    def set(self, other: "Tokens") -> "Tokens":
+        """Overwrites these counts with the counts of ``other`` in place."""
+        self.red = other.red
+        self.green = other.green
+        self.blue = other.blue
+        self.white = other.white
+        self.black = other.black
+        self.gold = other.gold
+        return self
+
+    def clamp_at_zero(self) -> "Tokens":
+        """Replaces every negative count with zero in place."""
+        if self.red < 0:
+            self.red = 0
+        if self.green < 0:
+            self.green = 0
+        if self.blue < 0:
+            self.blue = 0
+        if self.white < 0:
+            self.white = 0
+        if self.black < 0:
+            self.black = 0
+        if self.gold < 0:
+            self.gold = 0
+        return self
+
+    def clamped_sub(self, other: "Tokens") -> "Tokens":
+        """Returns ``max(0, self - other)`` for every token type."""
+        return Tokens(
+            max(0, self.red - other.red),
+            max(0, self.green - other.green),
+            max(0, self.blue - other.blue),
+            max(0, self.white - other.white),
+            max(0, self.black - other.black),
+            max(0, self.gold - other.gold),
+        )
+
+    def covers(self, other: "Tokens") -> bool:
+        """Returns True if every count is at least the matching count of ``other``."""
+        return (
+            self.red >= other.red
+            and self.green >= other.green
+            and self.blue >= other.blue
+            and self.white >= other.white
+            and self.black >= other.black
+            and self.gold >= other.gold
         )
 
     @property
@@ -61,3 +172,46 @@ class Tokens:
         """Returns a string representation showing only non-zero token values."""
         non_zero_tokens = {k: v for k, v in self.__dict__.items() if v > 0}
         return f"Tokens({', '.join(f'{k}={v}' for k, v in non_zero_tokens.items())})"
+
+
+class FrozenTokens(Tokens):
+    """
+    Read-only Tokens, safe to share between cards, boards and players.
+
+    ``+=`` and ``-=`` on a frozen value rebind the name to a new mutable ``Tokens``
+    instead of modifying the shared object.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        red: int = 0,
+        green: int = 0,
+        blue: int = 0,
+        white: int = 0,
+        black: int = 0,
+        gold: int = 0,
+    ):
+        set_ = object.__setattr__
+        set_(self, "red", red)
+        set_(self, "green", green)
+        set_(self, "blue", blue)
+        set_(self, "white", white)
+        set_(self, "black", black)
+        set_(self, "gold", gold)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __iadd__(self, other):
+        return self + other
+
+    def __isub__(self, other):
+        return self - other
+
+    def set(self, other):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def clamp_at_zero(self):
+        raise AttributeError(f"{type(self).__name__} is read-only")
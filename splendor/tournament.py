@@ -0,0 +1,296 @@
+import concurrent.futures as futures
+import itertools
+import json
+import math
+import multiprocessing as mp
+import random
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from game import Game
+from ratings import Rating, RatingTable
+from seeding import AGENT_STREAM, game_seed, stream_seed
+from self_play import AgentFactory
+
+PAIRINGS = ("round_robin", "swiss")
+
+
+class GameResult(NamedTuple):
+    pairing: Tuple[str, ...]  # the entrants at the table, in pairing order
+    block: int  # index of the shared deal; block k of every pairing uses one deal
+    rotation: int
+    seats: Tuple[str, ...]  # entrant per seat
+    scores: Tuple[int, ...]  # final score per seat
+    rounds: int
+
+    def to_json(self) -> str:
+        return json.dumps(self._asdict())
+
+
+# Games set up in this process, by their files and size
+_games: Dict[tuple, Game] = {}
+
+
+def _play_game(
+    noble_file: str,
+    evaluation_files: Tuple[str, ...],
+    max_rounds: int,
+    factories: Dict[str, AgentFactory],
+    pairing: Tuple[str, ...],
+    block: int,
+    rotation: int,
+    run_seed: int,
+) -> GameResult:
+    key = (noble_file, evaluation_files, len(pairing), max_rounds)
+    game = _games.get(key)
+    if game is None:
+        game = _games[key] = Game()
+        game.setup_game(noble_file, list(evaluation_files), len(pairing), max_rounds)
+    seats = pairing[rotation:] + pairing[:rotation]
+    game.seed(game_seed(run_seed, block))
+    game.reset()
+    agents = [
+        factories[name](
+            random.Random(stream_seed(run_seed, block, AGENT_STREAM, rotation, seat)),
+            seat,
+        )
+        for seat, name in enumerate(seats)
+    ]
+    while not game.end:
+        action = agents[game.current_player_id].select_action(game)
+        if not game.step(action):
+            raise ValueError(f"{seats[game.current_player_id]} chose illegal {action}.")
+    return GameResult(
+        pairing,
+        block,
+        rotation,
+        seats,
+        tuple(player.score for player in game.players),
+        game.rounds,
+    )
+
+
+class _PairingState:
+    def __init__(self, pairing: Tuple[str, ...]):
+        self.pairing = pairing
+        self.blocks_started = 0
+        self.pending: Dict[int, List[GameResult]] = {}  # block -> finished games
+        # (first, second) entrant -> points of first per finished block, in [0, 1]
+        self.block_scores: Dict[Tuple[str, str], List[float]] = {
+            pair: [] for pair in itertools.combinations(pairing, 2)
+        }
+        self.decided = False
+
+    @property
+    def blocks_finished(self) -> int:
+        return len(next(iter(self.block_scores.values())))
+
+    def add(self, result: GameResult) -> bool:
+        """Adds a game; returns True when it completes its block."""
+        games = self.pending.setdefault(result.block, [])
+        games.append(result)
+        if len(games) < len(self.pairing):
+            return False
+        del self.pending[result.block]
+        for (first, second), scores in self.block_scores.items():
+            points = 0.0
+            for game in games:
+                difference = (
+                    game.scores[game.seats.index(first)]
+                    - game.scores[game.seats.index(second)]
+                )
+                points += 1.0 if difference > 0 else 0.5 if difference == 0 else 0.0
+            scores.append(points / len(games))
+        return True
+
+    def is_decided(self, min_blocks: int, z: float) -> bool:
+        """Whether every pair at the table is ``z`` standard errors from even."""
+        if self.blocks_finished < max(min_blocks, 2):
+            return False
+        for scores in self.block_scores.values():
+            mean = sum(scores) / len(scores)
+            variance = sum((s - mean) ** 2 for s in scores) / (len(scores) - 1)
+            error = math.sqrt(variance / len(scores))
+            if mean == 0.5 or (error > 0 and abs(mean - 0.5) < z * error):
+                return False
+        return True
+
+
+class Tournament:
+    """
+    Plays entrants against each other across a process pool and rates them.
+
+    ``entrants`` maps names to agent factories (module-level functions, as for
+    ``SelfPlayRunner``). Tables of ``num_of_players`` entrants are formed
+    ``round_robin`` (every combination once) or ``swiss`` (``swiss_rounds`` rounds,
+    each seating entrants of close rating that have not met yet).
+
+    A table plays blocks of games: one game per seat rotation on the same deal, and
+    block ``k`` of every table uses the same deal and agent seeds, so entrants are
+    compared on identical games. A table stops after ``max_blocks`` blocks, or once
+    every pair at it has at least ``min_blocks`` blocks and a mean block score
+    ``decisive_z`` standard errors from even. ``run`` yields games as they finish
+    (and appends them to ``results_path`` as JSON lines); ``ratings`` fits Elo
+    ratings with confidence intervals to all games so far. With ``num_workers=0``
+    games are played in this process.
+    """
+
+    def __init__(
+        self,
+        noble_file: str,
+        evaluation_files: List[str],
+        entrants: Dict[str, AgentFactory],
+        num_of_players: int = 2,
+        max_rounds: int = 100,
+        pairing: str = "round_robin",
+        swiss_rounds: Optional[int] = None,
+        max_blocks: int = 50,
+        min_blocks: int = 4,
+        decisive_z: float = 3.0,
+        num_workers: Optional[int] = None,
+        seed: int = 0,
+        results_path: Optional[str] = None,
+        context: Optional[str] = None,
+    ):
+        if pairing not in PAIRINGS:
+            raise ValueError(f"Unknown pairing {pairing}.")
+        if not 2 <= num_of_players <= 4:
+            raise ValueError("Games have 2 to 4 players.")
+        if len(entrants) < num_of_players:
+            raise ValueError(f"Need at least {num_of_players} entrants.")
+        self.entrants = dict(entrants)
+        self.num_of_players = num_of_players
+        self.pairing = pairing
+        self.swiss_rounds = swiss_rounds or math.ceil(math.log2(len(entrants))) + 1
+        self.max_blocks = max_blocks
+        self.min_blocks = min_blocks
+        self.decisive_z = decisive_z
+        self.num_workers = mp.cpu_count() if num_workers is None else num_workers
+        self.seed = seed
+        self.results_path = results_path
+        self._context = mp.get_context(context)
+        self._game_args = (
+            str(noble_file),
+            tuple(str(path) for path in evaluation_files),
+            max_rounds,
+        )
+        self.table = RatingTable(sorted(self.entrants))
+        self.pairings: Dict[Tuple[str, ...], _PairingState] = {}
+
+    def ratings(self) -> Dict[str, Rating]:
+        return self.table.fit()
+
+    def run(self) -> Iterator[GameResult]:
+        """Plays the whole tournament, yielding each game as it finishes."""
+        executor = None
+        if self.num_workers:
+            executor = futures.ProcessPoolExecutor(
+                self.num_workers, mp_context=self._context
+            )
+        try:
+            if self.pairing == "round_robin":
+                tables = itertools.combinations(
+                    sorted(self.entrants), self.num_of_players
+                )
+                yield from self._play_tables(list(tables), executor)
+            else:
+                for _ in range(self.swiss_rounds):
+                    yield from self._play_tables(self._swiss_tables(), executor)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _swiss_tables(self) -> List[Tuple[str, ...]]:
+        ratings = self.ratings()
+        unseated = sorted(self.entrants, key=lambda name: (-ratings[name].elo, name))
+        tables = []
+        while len(unseated) >= self.num_of_players:
+            first = unseated[0]
+            candidates = [
+                table
+                for table in itertools.combinations(
+                    unseated[1:], self.num_of_players - 1
+                )
+                if tuple(sorted((first,) + table)) not in self.pairings
+            ]
+            # Closest ratings among new tables, else the closest table at all
+            others = min(
+                candidates
+                or list(itertools.combinations(unseated[1:], self.num_of_players - 1)),
+                key=lambda table: sum(
+                    abs(ratings[first].elo - ratings[name].elo) for name in table
+                ),
+            )
+            table = tuple(sorted((first,) + others))
+            tables.append(table)
+            unseated = [name for name in unseated if name not in table]
+        return tables
+
+    def _play_tables(
+        self, tables: Sequence[Tuple[str, ...]], executor
+    ) -> Iterator[GameResult]:
+        states = [
+            self.pairings.setdefault(table, _PairingState(table)) for table in tables
+        ]
+        for state in states:
+            state.decided = False
+        max_in_flight = max(1, 2 * self.num_workers)
+        in_flight = set()
+        results_file = open(self.results_path, "a") if self.results_path else None
+        try:
+            while True:
+                # Start blocks round-robin over the tables that are still open
+                started = True
+                while started and len(in_flight) < max_in_flight:
+                    started = False
+                    for state in states:
+                        if len(in_flight) >= max_in_flight:
+                            break
+                        if state.decided or state.blocks_started >= self.max_blocks:
+                            continue
+                        in_flight.update(self._start_block(state, executor))
+                        started = True
+                if not in_flight:
+                    return
+                if executor is None:
+                    done, in_flight = set(in_flight), set()
+                else:
+                    done, in_flight = futures.wait(
+                        in_flight, return_when=futures.FIRST_COMPLETED
+                    )
+                for future in done:
+                    result = future.result()
+                    self.table.add_game(result.seats, result.scores)
+                    state = self.pairings[result.pairing]
+                    if state.add(result) and not state.decided:
+                        state.decided = state.is_decided(
+                            self.min_blocks, self.decisive_z
+                        )
+                    if results_file is not None:
+                        results_file.write(result.to_json() + "\n")
+                        results_file.flush()
+                    yield result
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if results_file is not None:
+                results_file.close()
+
+    def _start_block(self, state: _PairingState, executor) -> List[futures.Future]:
+        block = state.blocks_started
+        state.blocks_started += 1
+        started = []
+        for rotation in range(self.num_of_players):
+            args = self._game_args + (
+                self.entrants,
+                state.pairing,
+                block,
+                rotation,
+                self.seed,
+            )
+            if executor is None:
+                future = futures.Future()
+                future.set_result(_play_game(*args))
+            else:
+                future = executor.submit(_play_game, *args)
+            started.append(future)
+        return started
@@ -0,0 +1,303 @@
+import bisect
+import os
+import struct
+import zlib
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from game import Game
+
+# File: header, then chunks. A chunk is a header followed by the zlib-compressed
+# records of one or more whole games; the writer appends each chunk with a single
+# write, so a reader only has to ignore a trailing chunk that is not complete yet.
+MAGIC = b"SPLTRAJ\x00"
+VERSION = 1
+# magic, version
+_FILE_HEADER = struct.Struct("<8sH")
+CHUNK_MAGIC = b"CHNK"
+# magic, number of games, uncompressed size, compressed size, crc32 of the payload
+_CHUNK_HEADER = struct.Struct("<4sIIII")
+
+# Game: header, the initial permutation of each deck (noble deck first) as a count
+# and positions in CSV order, bottom to top, then one fixed-width record per turn.
+# seed, number of players, max rounds, number of turns
+_GAME_HEADER = struct.Struct("<QBHI")
+_COUNT = struct.Struct("<H")
+# action id, slot of the noble acquired (NO_NOBLE when none)
+_TURN = struct.Struct("<BB")
+NO_NOBLE = 0xFF
+
+
+class GameRecord(NamedTuple):
+    seed: int
+    num_of_players: int
+    max_rounds: int
+    noble_positions: Tuple[int, ...]
+    evaluation_positions: Tuple[Tuple[int, ...], ...]
+    actions: bytes
+    nobles: bytes  # NO_NOBLE when no noble was acquired on that turn
+
+    @property
+    def num_turns(self) -> int:
+        return len(self.actions)
+
+
+def deck_positions(game: Game) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, ...], ...]]:
+    """
+    Positions of the cards of each deck before the board of ``game`` was dealt, for
+    ``Game.reset_from_decks``. Only valid before the first move.
+    """
+    board = game.board
+
+    def undealt(deck, exposed) -> Tuple[int, ...]:
+        # The first card dealt was the top one, i.e. the last
+        dealt = [card.id for card in reversed(exposed) if card is not None]
+        return tuple(deck.positions(deck.order[: deck.size].tolist() + dealt))
+
+    return undealt(board.noble_deck, board.exposed_noble_cards), tuple(
+        undealt(deck, exposed)
+        for deck, exposed in zip(board.evaluation_decks, board.exposed_evaluation_cards)
+    )
+
+
+def encode_game(record: GameRecord) -> bytes:
+    parts = [
+        _GAME_HEADER.pack(
+            record.seed, record.num_of_players, record.max_rounds, len(record.actions)
+        )
+    ]
+    for positions in (record.noble_positions,) + tuple(record.evaluation_positions):
+        parts.append(_COUNT.pack(len(positions)))
+        parts.append(struct.pack(f"<{len(positions)}H", *positions))
+    turns = bytearray(2 * len(record.actions))
+    turns[0::2] = record.actions
+    turns[1::2] = record.nobles
+    parts.append(bytes(turns))
+    return b"".join(parts)
+
+
+def decode_games(payload: bytes) -> Iterator[GameRecord]:
+    offset = 0
+    while offset < len(payload):
+        seed, num_of_players, max_rounds, num_turns = _GAME_HEADER.unpack_from(
+            payload, offset
+        )
+        offset += _GAME_HEADER.size
+        decks = []
+        for _ in range(4):
+            (count,) = _COUNT.unpack_from(payload, offset)
+            offset += _COUNT.size
+            decks.append(struct.unpack_from(f"<{count}H", payload, offset))
+            offset += 2 * count
+        turns = payload[offset : offset + _TURN.size * num_turns]
+        offset += len(turns)
+        yield GameRecord(
+            seed,
+            num_of_players,
+            max_rounds,
+            decks[0],
+            tuple(decks[1:]),
+            turns[0::2],
+            turns[1::2],
+        )
+
+
+class TrajectoryWriter:
+    """
+    Appends games to a trajectory log.
+
+    Call ``begin_game`` after the game is dealt and before its first move, then play
+    it with ``step`` (or call ``record_turn`` for moves made with ``Game.apply``) and
+    finish it with ``end_game``. Finished games are buffered and written as one
+    compressed chunk every ``games_per_chunk`` games and on ``flush``/``close``.
+    """
+
+    def __init__(self, path: str, games_per_chunk: int = 64, level: int = 6):
+        self.path = path
+        self.games_per_chunk = games_per_chunk
+        self.level = level
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+            self._file.flush()
+        self._pending: List[bytes] = []
+        self._game: Optional[GameRecord] = None
+        self._actions = bytearray()
+        self._nobles = bytearray()
+
+    def begin_game(self, game: Game, seed: Optional[int] = None):
+        """Starts recording ``game``; ``seed`` defaults to ``game.rng_seed`` (or 0)."""
+        if self._game is not None:
+            raise RuntimeError("The previous game was not ended.")
+        if game.rounds or game.current_player_id:
+            raise ValueError("The game has already started.")
+        if seed is None:
+            seed = game.rng_seed or 0
+        noble_positions, evaluation_positions = deck_positions(game)
+        self._game = GameRecord(
+            seed,
+            game.num_of_players,
+            game.max_rounds,
+            noble_positions,
+            evaluation_positions,
+            b"",
+            b"",
+        )
+        self._actions.clear()
+        self._nobles.clear()
+
+    def record_turn(self, action: int, noble_index: Optional[int] = None):
+        self._actions.append(action)
+        self._nobles.append(NO_NOBLE if noble_index is None else noble_index)
+
+    def step(self, game: Game, action: int) -> bool:
+        """Plays ``action`` like ``Game.step`` and records the turn if it is legal."""
+        record = game.apply(action)
+        if record is None:
+            return False
+        self.record_turn(action, record.noble_index)
+        return True
+
+    def end_game(self):
+        if self._game is None:
+            raise RuntimeError("No game was begun.")
+        game = self._game._replace(
+            actions=bytes(self._actions), nobles=bytes(self._nobles)
+        )
+        self._pending.append(encode_game(game))
+        self._game = None
+        if len(self._pending) >= self.games_per_chunk:
+            self.flush()
+
+    def flush(self):
+        """Writes the finished games buffered so far as one chunk."""
+        if not self._pending:
+            return
+        raw = b"".join(self._pending)
+        payload = zlib.compress(raw, self.level)
+        header = _CHUNK_HEADER.pack(
+            CHUNK_MAGIC, len(self._pending), len(raw), len(payload), zlib.crc32(payload)
+        )
+        self._file.write(header + payload)
+        self._file.flush()
+        self._pending.clear()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Random access to the games of a trajectory log, which may still be written.
+
+    Chunks are indexed from their headers only; ``refresh`` picks up chunks appended
+    since. ``reader[i]`` decompresses the chunk holding game ``i`` (the last chunk is
+    cached) and ``replay``/``state_at`` rebuild full states through ``Game``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        header = self._file.read(_FILE_HEADER.size)
+        if len(header) < _FILE_HEADER.size:
+            raise ValueError(f"{path} is not a trajectory log.")
+        magic, version = _FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} trajectory log.")
+        self._offsets: List[int] = []  # file offset of each chunk
+        self._first_games: List[int] = []  # index of the first game of each chunk
+        self._num_games = 0
+        self._end = _FILE_HEADER.size
+        self._cached: Tuple[int, List[GameRecord]] = (-1, [])
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Indexes the chunks completed since the last call; returns new games."""
+        size = os.fstat(self._file.fileno()).st_size
+        before = self._num_games
+        while self._end + _CHUNK_HEADER.size <= size:
+            self._file.seek(self._end)
+            magic, num_games, _, compressed, _ = _CHUNK_HEADER.unpack(
+                self._file.read(_CHUNK_HEADER.size)
+            )
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Corrupt chunk at offset {self._end}.")
+            if self._end + _CHUNK_HEADER.size + compressed > size:
+                break
+            self._offsets.append(self._end)
+            self._first_games.append(self._num_games)
+            self._num_games += num_games
+            self._end += _CHUNK_HEADER.size + compressed
+        return self._num_games - before
+
+    def __len__(self) -> int:
+        return self._num_games
+
+    def _chunk(self, chunk_index: int) -> List[GameRecord]:
+        if self._cached[0] != chunk_index:
+            self._file.seek(self._offsets[chunk_index])
+            _, _, raw_size, compressed, crc = _CHUNK_HEADER.unpack(
+                self._file.read(_CHUNK_HEADER.size)
+            )
+            payload = self._file.read(compressed)
+            if zlib.crc32(payload) != crc:
+                raise ValueError(f"Checksum mismatch in chunk {chunk_index}.")
+            raw = zlib.decompress(payload)
+            if len(raw) != raw_size:
+                raise ValueError(f"Bad size of chunk {chunk_index}.")
+            self._cached = (chunk_index, list(decode_games(raw)))
+        return self._cached[1]
+
+    def __getitem__(self, index: int) -> GameRecord:
+        if index < 0:
+            index += self._num_games
+        if not 0 <= index < self._num_games:
+            raise IndexError("Game index out of range.")
+        chunk_index = bisect.bisect_right(self._first_games, index) - 1
+        return self._chunk(chunk_index)[index - self._first_games[chunk_index]]
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for chunk_index in range(len(self._offsets)):
+            yield from self._chunk(chunk_index)
+
+    def replay(self, index: int, game: Game) -> Iterator[Game]:
+        """
+        Deals game ``index`` on ``game``, which must be set up with the same card
+        files, and yields it at the start and after every turn.
+        """
+        record = self[index]
+        game.num_of_players = record.num_of_players
+        game.max_rounds = record.max_rounds
+        game.reset_from_decks(record.noble_positions, record.evaluation_positions)
+        yield game
+        for turn, (action, noble) in enumerate(zip(record.actions, record.nobles)):
+            undo = game.apply(action)
+            if undo is None:
+                raise ValueError(f"Turn {turn} of game {index} is not legal.")
+            if (NO_NOBLE if undo.noble_index is None else undo.noble_index) != noble:
+                raise ValueError(f"Turn {turn} of game {index} does not match.")
+            yield game
+
+    def state_at(self, index: int, turn: int, game: Game) -> Game:
+        """Puts ``game`` in the state of game ``index`` after ``turn`` turns."""
+        if not 0 <= turn <= self[index].num_turns:
+            raise IndexError("Turn out of range.")
+        for played, state in enumerate(self.replay(index, game)):
+            if played == turn:
+                return state
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "TrajectoryReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
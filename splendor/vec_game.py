@@ -0,0 +1,344 @@
+import random
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from affordability import affordability, gold_needed
+from actions import (
+    BUY_EVALUATION_OFFSET,
+    BUY_RESERVED_OFFSET,
+    NUM_ACTIONS,
+    NUM_BOARD_SLOTS,
+    NUM_LEVELS,
+    RESERVE_WITH_GOLD_OFFSET,
+    RESERVE_WITHOUT_GOLD_OFFSET,
+    SLOTS_PER_LEVEL,
+    WITHDRAWAL_OFFSET,
+)
+from board import Board
+from config import (
+    INITIAL_TOKEN,
+    MAX_RESERVED_CARDS,
+    MAX_TOKENS_PER_PLAYER,
+    SCORE_TO_WIN,
+)
+from tokens import TOKEN_TYPES
+from withdrawal import NUM_COLORS, WITHDRAWAL_PATTERNS, WITHDRAWAL_TABLE
+
+EMPTY = -1  # card id of an empty slot
+GOLD = TOKEN_TYPES.index("gold")
+NUM_TOKEN_TYPES = len(TOKEN_TYPES)
+
+# Cost of the sentinel card stored after the last real card, so EMPTY (-1) can be
+# used as an index and is never affordable.
+_UNAFFORDABLE = 1000
+
+_PATTERNS = np.array([p.as_tuple() for p in WITHDRAWAL_PATTERNS], dtype=np.int16)
+_COLOR_BITS = (1 << np.arange(NUM_COLORS)).astype(np.int64)
+
+
+def _build_withdrawal_masks() -> np.ndarray:
+    index_of = {id(pattern): index for index, pattern in enumerate(WITHDRAWAL_PATTERNS)}
+    masks = np.zeros((len(WITHDRAWAL_TABLE), len(WITHDRAWAL_PATTERNS)), dtype=bool)
+    for row, options in enumerate(WITHDRAWAL_TABLE):
+        masks[row, [index_of[id(option)] for option in options]] = True
+    return masks
+
+
+_WITHDRAWAL_MASKS = _build_withdrawal_masks()
+
+
+def _card_table(cards, attribute: str) -> np.ndarray:
+    rows = [getattr(card, attribute).as_tuple() for card in cards]
+    rows.append((_UNAFFORDABLE if attribute == "cost" else 0,) * NUM_TOKEN_TYPES)
+    return np.array(rows, dtype=np.int16)
+
+
+class VecGame:
+    """
+    N independent games of the same size stepped together over NumPy arrays.
+
+    The rules are those of ``Game.apply_option`` followed by ``Game.finalize_turn``,
+    and actions use the fixed layout from ``actions``. Cards are referred to by ids:
+    evaluation cards are numbered level by level in file order, nobles in file order,
+    and ``EMPTY`` marks a slot without a card. A game seeded with ``s`` deals the same
+    cards as a ``Game`` started after ``random.seed(s)``.
+    """
+
+    def __init__(
+        self,
+        noble_file: str,
+        evaluation_files: List[str],
+        num_envs: int,
+        num_of_players: int,
+        max_rounds: int,
+    ):
+        board = Board()
+        board.load_from_files(noble_file, evaluation_files)
+
+        nobles = board.noble_deck.cards
+        self.noble_cost = _card_table(nobles, "cost")
+        self.noble_score = np.array([n.score for n in nobles] + [0], dtype=np.int16)
+
+        cards = [card for deck in board.evaluation_decks for card in deck.cards]
+        self.card_cost = _card_table(cards, "cost")
+        self.card_bonus = _card_table(cards, "bonus")
+        self.card_score = np.array([c.score for c in cards] + [0], dtype=np.int16)
+        self.deck_lengths = [len(deck.cards) for deck in board.evaluation_decks]
+        self.deck_offsets = np.cumsum([0] + self.deck_lengths[:-1]).tolist()
+        self.num_nobles = len(nobles)
+
+        self.num_envs = num_envs
+        self.num_of_players = num_of_players
+        self.max_rounds = max_rounds
+        n, p = num_envs, num_of_players
+
+        # Board state
+        self.board_tokens = np.zeros((n, NUM_TOKEN_TYPES), dtype=np.int16)
+        self.exposed = np.full((n, NUM_LEVELS, SLOTS_PER_LEVEL), EMPTY, dtype=np.int16)
+        self.nobles = np.full((n, p + 1), EMPTY, dtype=np.int16)
+        self.deck_order = np.full(
+            (n, NUM_LEVELS, max(self.deck_lengths)), EMPTY, dtype=np.int16
+        )
+        self.deck_size = np.zeros((n, NUM_LEVELS), dtype=np.int16)  # draw pointer
+
+        # Player state
+        self.player_tokens = np.zeros((n, p, NUM_TOKEN_TYPES), dtype=np.int16)
+        self.bonuses = np.zeros((n, p, NUM_TOKEN_TYPES), dtype=np.int16)
+        self.reserved = np.full((n, p, MAX_RESERVED_CARDS), EMPTY, dtype=np.int16)
+        self.scores = np.zeros((n, p), dtype=np.int16)
+
+        self.current_player = np.zeros(n, dtype=np.int64)
+        self.rounds = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+
+        self._env = np.arange(n)
+        self._initial_tokens = np.array(INITIAL_TOKEN.as_tuple(), dtype=np.int16)
+
+    def reset(
+        self,
+        seeds: Optional[Sequence[int]] = None,
+        env_ids: Optional[Sequence[int]] = None,
+    ):
+        """Starts new games in ``env_ids`` (all games by default), one seed per game."""
+        env_ids = self._env if env_ids is None else np.asarray(env_ids)
+        if seeds is None:
+            seeds = [random.getrandbits(64) for _ in range(len(env_ids))]
+        if len(seeds) != len(env_ids):
+            raise ValueError("Expected one seed per reset game.")
+
+        for env, seed in zip(env_ids.tolist(), seeds):
+            self._deal(env, random.Random(seed))
+
+        self.board_tokens[env_ids] = self._initial_tokens
+        self.player_tokens[env_ids] = 0
+        self.bonuses[env_ids] = 0
+        self.reserved[env_ids] = EMPTY
+        self.scores[env_ids] = 0
+        self.current_player[env_ids] = 0
+        self.rounds[env_ids] = 0
+        self.done[env_ids] = False
+
+    def _deal(self, env: int, rng: random.Random):
+        # Same shuffle and draw order as Board.shuffle / Board.start_new_board
+        noble_order = list(range(self.num_nobles))
+        rng.shuffle(noble_order)
+        level_orders = []
+        for length in self.deck_lengths:
+            order = list(range(length))
+            rng.shuffle(order)
+            level_orders.append(order)
+
+        self.deck_order[env] = EMPTY
+        for level, order in enumerate(level_orders):
+            ids = [self.deck_offsets[level] + i for i in order]
+            self.deck_order[env, level, : len(ids)] = ids
+            drawn = ids[::-1][:SLOTS_PER_LEVEL]
+            drawn += [EMPTY] * (SLOTS_PER_LEVEL - len(drawn))
+            self.exposed[env, level] = drawn
+            self.deck_size[env, level] = max(0, len(ids) - SLOTS_PER_LEVEL)
+
+        num_slots = self.nobles.shape[1]
+        drawn = noble_order[::-1][:num_slots]
+        self.nobles[env] = drawn + [EMPTY] * (num_slots - len(drawn))
+
+    def legal_action_mask(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Returns a (num_envs, NUM_ACTIONS) boolean mask of legal actions."""
+        if out is None:
+            out = np.zeros((self.num_envs, NUM_ACTIONS), dtype=bool)
+        env = self._env
+        player = self.current_player
+        tokens = self.player_tokens[env, player]
+        bonuses = self.bonuses[env, player]
+        board = self.board_tokens
+        token_count = tokens.sum(axis=1)
+
+        available = (board[:, :NUM_COLORS] > 0) @ _COLOR_BITS
+        rich = (board[:, :NUM_COLORS] >= 4) @ _COLOR_BITS
+        capacity = np.clip(
+            MAX_TOKENS_PER_PLAYER - token_count, 0, MAX_TOKENS_PER_PLAYER
+        )
+        # Same row layout as withdrawal.withdrawal_table_index
+        rows = ((available << NUM_COLORS) | rich) * (
+            MAX_TOKENS_PER_PLAYER + 1
+        ) + capacity
+        out[:, WITHDRAWAL_OFFSET:BUY_EVALUATION_OFFSET] = _WITHDRAWAL_MASKS[rows]
+
+        slots = self.exposed.reshape(self.num_envs, NUM_BOARD_SLOTS)
+        gold = tokens[:, GOLD, None]
+        out[:, BUY_EVALUATION_OFFSET:BUY_RESERVED_OFFSET] = (
+            self._gold_needed(slots, tokens, bonuses) <= gold
+        )
+
+        reserved = self.reserved[env, player]
+        out[:, BUY_RESERVED_OFFSET:RESERVE_WITHOUT_GOLD_OFFSET] = (
+            self._gold_needed(reserved, tokens, bonuses) <= gold
+        )
+
+        present = slots != EMPTY
+        can_reserve = (reserved != EMPTY).sum(axis=1) < MAX_RESERVED_CARDS
+        can_reserve_with_gold = (
+            can_reserve & (board[:, GOLD] > 0) & (token_count < MAX_TOKENS_PER_PLAYER)
+        )
+        out[:, RESERVE_WITHOUT_GOLD_OFFSET:RESERVE_WITH_GOLD_OFFSET] = (
+            present & can_reserve[:, None]
+        )
+        out[:, RESERVE_WITH_GOLD_OFFSET:] = present & can_reserve_with_gold[:, None]
+
+        out[self.done] = False
+        return out
+
+    def step(self, actions: Sequence[int]) -> np.ndarray:
+        """
+        Applies one action per unfinished game, then finalizes the turn. Entries for
+        finished games are ignored. Returns the per-game ``done`` flags.
+        """
+        actions = np.asarray(actions)
+        env = np.flatnonzero(~self.done)
+        if env.size == 0:
+            return self.done
+        action = actions[env]
+        legal = self.legal_action_mask()[env, action]
+        if not legal.all():
+            raise ValueError(f"Illegal action in games {env[~legal].tolist()}.")
+        player = self.current_player[env]
+
+        selected = action < BUY_EVALUATION_OFFSET
+        if selected.any():
+            self._apply_withdrawal(env[selected], player[selected], action[selected])
+
+        selected = (action >= BUY_EVALUATION_OFFSET) & (action < BUY_RESERVED_OFFSET)
+        if selected.any():
+            self._apply_buy_evaluation(
+                env[selected],
+                player[selected],
+                action[selected] - BUY_EVALUATION_OFFSET,
+            )
+
+        selected = (action >= BUY_RESERVED_OFFSET) & (
+            action < RESERVE_WITHOUT_GOLD_OFFSET
+        )
+        if selected.any():
+            self._apply_buy_reserved(
+                env[selected], player[selected], action[selected] - BUY_RESERVED_OFFSET
+            )
+
+        selected = action >= RESERVE_WITHOUT_GOLD_OFFSET
+        if selected.any():
+            with_gold = action[selected] >= RESERVE_WITH_GOLD_OFFSET
+            slot = (action[selected] - RESERVE_WITHOUT_GOLD_OFFSET) % NUM_BOARD_SLOTS
+            self._apply_reserve(env[selected], player[selected], slot, with_gold)
+
+        self._finalize_turn(env, player)
+        return self.done
+
+    def _gold_needed(self, cards, tokens, bonuses) -> np.ndarray:
+        """Gold needed per card for (B, K) card ids and (B, 6) tokens / bonuses."""
+        return gold_needed(tokens[:, None], bonuses[:, None], self.card_cost[cards])[
+            :, 0
+        ]
+
+    def affordability(self) -> Tuple[Tuple[np.ndarray, np.ndarray], ...]:
+        """
+        Gold needed and can-afford of every player of every game for each board slot,
+        (num_envs, num_of_players, 12), and for each of their own reserved slots,
+        (num_envs, num_of_players, 3). Empty slots are never affordable.
+        """
+        slots = self.exposed.reshape(self.num_envs, NUM_BOARD_SLOTS)
+        board = affordability(self.player_tokens, self.bonuses, self.card_cost[slots])
+        reserved = affordability(
+            self.player_tokens, self.bonuses, self.card_cost[self.reserved]
+        )
+        return board, reserved
+
+    def _apply_withdrawal(self, env, player, action):
+        pattern = _PATTERNS[action - WITHDRAWAL_OFFSET]
+        self.player_tokens[env, player] += pattern
+        self.board_tokens[env] -= pattern
+
+    def _draw(self, env, level, index):
+        size = self.deck_size[env, level]
+        top = self.deck_order[env, level, np.maximum(size - 1, 0)]
+        has_card = size > 0
+        self.exposed[env, level, index] = np.where(has_card, top, EMPTY)
+        self.deck_size[env, level] = size - has_card
+
+    def _pay_and_collect(self, env, player, cards):
+        tokens = self.player_tokens[env, player]
+        remaining = np.maximum(
+            self.card_cost[cards, :NUM_COLORS] - self.bonuses[env, player, :NUM_COLORS],
+            0,
+        )
+        payment = np.zeros_like(tokens)
+        payment[:, :NUM_COLORS] = np.minimum(remaining, tokens[:, :NUM_COLORS])
+        payment[:, GOLD] = (remaining - payment[:, :NUM_COLORS]).sum(axis=1)
+        self.player_tokens[env, player] -= payment
+        self.board_tokens[env] += payment
+        self.bonuses[env, player] += self.card_bonus[cards]
+        self.scores[env, player] += self.card_score[cards]
+
+    def _apply_buy_evaluation(self, env, player, slot):
+        level, index = np.divmod(slot, SLOTS_PER_LEVEL)
+        self._pay_and_collect(env, player, self.exposed[env, level, index])
+        self._draw(env, level, index)
+
+    def _apply_buy_reserved(self, env, player, index):
+        reserved = self.reserved[env, player]
+        self._pay_and_collect(env, player, reserved[np.arange(len(env)), index])
+        # Close the gap like list.pop(index)
+        padded = np.concatenate(
+            [reserved, np.full((len(env), 1), EMPTY, dtype=reserved.dtype)], axis=1
+        )
+        columns = np.arange(MAX_RESERVED_CARDS)
+        columns = columns + (columns >= index[:, None])
+        self.reserved[env, player] = np.take_along_axis(padded, columns, axis=1)
+
+    def _apply_reserve(self, env, player, slot, with_gold):
+        level, index = np.divmod(slot, SLOTS_PER_LEVEL)
+        count = (self.reserved[env, player] != EMPTY).sum(axis=1)
+        self.reserved[env, player, count] = self.exposed[env, level, index]
+        self._draw(env, level, index)
+        self.player_tokens[env[with_gold], player[with_gold], GOLD] += 1
+        self.board_tokens[env[with_gold], GOLD] -= 1
+
+    def _finalize_turn(self, env, player):
+        # Buy the first noble in slot order the player's bonuses cover
+        nobles = self.nobles[env]
+        bonuses = self.bonuses[env, player, None, :NUM_COLORS]
+        shortfall = np.maximum(self.noble_cost[nobles, :NUM_COLORS] - bonuses, 0)
+        affordable = shortfall.sum(axis=2) == 0
+        buys = affordable.any(axis=1)
+        if buys.any():
+            slot = affordable.argmax(axis=1)[buys]
+            buyer_env = env[buys]
+            self.scores[buyer_env, player[buys]] += self.noble_score[
+                self.nobles[buyer_env, slot]
+            ]
+            self.nobles[buyer_env, slot] = EMPTY
+
+        self.rounds[env] += player == self.num_of_players - 1
+        self.current_player[env] = (player + 1) % self.num_of_players
+        self.done[env] = (
+            (self.scores[env].max(axis=1) >= SCORE_TO_WIN)
+            & (self.current_player[env] == 0)
+        ) | (self.rounds[env] > self.max_rounds)
@@ -0,0 +1,119 @@
+from itertools import combinations
+from typing import List, Tuple
+
+from config import MAX_TOKENS_PER_PLAYER
+from tokens import COLORS, FrozenTokens, Tokens
+
+NUM_COLORS = len(COLORS)
+NUM_MASKS = 1 << NUM_COLORS
+
+# Every withdrawal a player may ever make, in the order options are offered:
+# nothing, 1/2/3 tokens of different colors, then 2 tokens of the same color.
+WITHDRAWAL_PATTERNS: Tuple[FrozenTokens, ...] = (
+    (FrozenTokens(),)
+    + tuple(
+        FrozenTokens(**{color: 1 for color in combo})
+        for size in range(1, 4)
+        for combo in combinations(COLORS, size)
+    )
+    + tuple(FrozenTokens(**{color: 2}) for color in COLORS)
+)
+
+
+def _pattern_masks(pattern: Tokens) -> Tuple[int, int, int]:
+    """Returns (colors used bitmask, colors taken twice bitmask, token count)."""
+    used = doubled = 0
+    for bit, color in enumerate(COLORS):
+        amount = getattr(pattern, color)
+        if amount:
+            used |= 1 << bit
+        if amount == 2:
+            doubled |= 1 << bit
+    return used, doubled, pattern.count
+
+
+_PATTERN_MASKS = [_pattern_masks(pattern) for pattern in WITHDRAWAL_PATTERNS]
+
+
+def _build_options(available: int, rich: int, capacity: int) -> Tuple[Tokens, ...]:
+    num_available = bin(available).count("1")
+    max_different = min(capacity, 3, num_available)
+    options = []
+    for pattern, (used, doubled, count) in zip(WITHDRAWAL_PATTERNS, _PATTERN_MASKS):
+        if doubled:
+            if capacity >= 2 and doubled & rich:
+                options.append(pattern)
+        elif count <= max_different and used & available == used:
+            options.append(pattern)
+    return tuple(options)
+
+
+def _build_table() -> List[Tuple[Tokens, ...]]:
+    # Options only depend on capacity through min(capacity, 3), so share those tuples
+    table = []
+    shared = {}
+    for available in range(NUM_MASKS):
+        for rich in range(NUM_MASKS):
+            for capacity in range(MAX_TOKENS_PER_PLAYER + 1):
+                key = (available, rich & available, min(capacity, 3))
+                if key not in shared:
+                    shared[key] = _build_options(*key)
+                table.append(shared[key])
+    return table
+
+
+WITHDRAWAL_TABLE: List[Tuple[Tokens, ...]] = _build_table()
+
+# Same table holding indices into WITHDRAWAL_PATTERNS instead of the patterns
+_PATTERN_INDEX = {
+    id(pattern): index for index, pattern in enumerate(WITHDRAWAL_PATTERNS)
+}
+WITHDRAWAL_INDEX_TABLE: List[Tuple[int, ...]] = [
+    tuple(_PATTERN_INDEX[id(option)] for option in options)
+    for options in WITHDRAWAL_TABLE
+]
+
+
+def withdrawal_table_index(available: int, rich: int, capacity: int) -> int:
+    """
+    Index into the precomputed table for the given availability bitmask, bitmask of
+    colors with at least 4 tokens and remaining player capacity.
+    """
+    if capacity < 0:
+        capacity = 0
+    elif capacity > MAX_TOKENS_PER_PLAYER:
+        capacity = MAX_TOKENS_PER_PLAYER
+    return ((available << NUM_COLORS) | rich) * (MAX_TOKENS_PER_PLAYER + 1) + capacity
+
+
+def _table_row(board_tokens: Tokens, capacity: int) -> int:
+    red = board_tokens.red
+    green = board_tokens.green
+    blue = board_tokens.blue
+    white = board_tokens.white
+    black = board_tokens.black
+    available = (
+        (red > 0)
+        | (green > 0) << 1
+        | (blue > 0) << 2
+        | (white > 0) << 3
+        | (black > 0) << 4
+    )
+    rich = (
+        (red >= 4)
+        | (green >= 4) << 1
+        | (blue >= 4) << 2
+        | (white >= 4) << 3
+        | (black >= 4) << 4
+    )
+    return withdrawal_table_index(available, rich, capacity)
+
+
+def withdrawal_options(board_tokens: Tokens, capacity: int) -> Tuple[Tokens, ...]:
+    """Returns the shared tuple of withdrawal options for a board and capacity."""
+    return WITHDRAWAL_TABLE[_table_row(board_tokens, capacity)]
+
+
+def withdrawal_option_indices(board_tokens: Tokens, capacity: int) -> Tuple[int, ...]:
+    """Like ``withdrawal_options``, as indices into ``WITHDRAWAL_PATTERNS``."""
+    return WITHDRAWAL_INDEX_TABLE[_table_row(board_tokens, capacity)]
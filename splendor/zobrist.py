@@ -0,0 +1,139 @@
+import random
+from typing import Dict, List, Tuple
+
+from actions import SLOTS_PER_LEVEL
+from config import MAX_RESERVED_CARDS
+from tokens import Tokens
+
+BOARD_OWNER = 0  # token owner index of the board; player i uses BOARD_OWNER + 1 + i
+
+# Card places, combined with a card to look up its key
+SLOT_PLACE = 0  # + deck_index * SLOTS_PER_LEVEL + card_index
+NOBLE_PLACE = 16  # + exposed noble index
+RESERVED_PLACE = 32  # see reserved_place
+OWNED_PLACE = 56  # + player id, evaluation and noble cards alike
+
+_MAX_OWNERS = 8
+_MAX_COUNT = 64
+_MASK = (1 << 64) - 1
+
+
+def _mix(value: int) -> int:
+    """SplitMix64 finalizer: a fixed, well-spread 64-bit function of ``value``."""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def reserved_place(player_id: int, index: int) -> int:
+    """Place of a player's reserved card, by its index (``BUY_RESERVED_OFFSET``)."""
+    return RESERVED_PLACE + player_id * MAX_RESERVED_CARDS + index
+
+
+class ZobristHasher:
+    """
+    Running 64-bit Zobrist hash of one game.
+
+    Every piece of state has a random key and the hash is the XOR of the keys of what
+    is currently present, so each mutation updates it by XOR-ing the keys that leave
+    and enter: token counts per owner and color, the card in each board and noble
+    slot, reserved cards per player and index, owned cards per player (as sets), and
+    the player to move.
+    Keys depend only on ``seed`` and, for cards, on the place and catalog id, so
+    hashers with the same seed agree: equal states of different games hash equally.
+    """
+
+    def __init__(self, seed: int = 0x5EED):
+        self._rng = random.Random(seed)
+        self._token_keys: List[List[List[int]]] = [
+            [[self._new_key() for _ in range(_MAX_COUNT)] for _ in range(6)]
+            for _ in range(_MAX_OWNERS)
+        ]
+        self._turn_keys = [self._new_key() for _ in range(_MAX_OWNERS)]
+        self._card_seed = self._new_key()
+        self._card_keys: Dict[Tuple[int, int], int] = {}
+        self.value = 0
+
+    def _new_key(self) -> int:
+        return self._rng.getrandbits(64)
+
+    def tokens_key(self, owner: int, tokens: Tokens) -> int:
+        keys = self._token_keys[owner]
+        red, green, blue, white, black, gold = tokens.as_tuple()
+        return (
+            keys[0][red]
+            ^ keys[1][green]
+            ^ keys[2][blue]
+            ^ keys[3][white]
+            ^ keys[4][black]
+            ^ keys[5][gold]
+        )
+
+    def card_key(self, place: int, card) -> int:
+        # Cards outside the catalog (id -1) fall back to their object identity
+        key = (place, card.id if card.id >= 0 else ~id(card))
+        value = self._card_keys.get(key)
+        if value is None:
+            value = self._card_keys[key] = _mix(
+                self._card_seed ^ _mix(((key[1] & _MASK) << 6) | place)
+            )
+        return value
+
+    def turn_key(self, player_id: int) -> int:
+        return self._turn_keys[player_id]
+
+    def toggle_card(self, place: int, card):
+        """XORs a card in or out of ``place``; empty slots (None) have no key."""
+        if card is not None:
+            self.value ^= self.card_key(place, card)
+
+    def move_tokens(self, owner: int, tokens: Tokens, delta: Tokens, sign: int):
+        """
+        Updates the hash after ``tokens`` of ``owner`` changed by ``sign * delta``;
+        ``tokens`` already holds the new counts.
+        """
+        keys = self._token_keys[owner]
+        value = self.value
+        for color, (count, amount) in enumerate(
+            zip(tokens.as_tuple(), delta.as_tuple())
+        ):
+            if amount:
+                color_keys = keys[color]
+                value ^= color_keys[count - sign * amount] ^ color_keys[count]
+        self.value = value
+
+    def pass_turn(self, from_player_id: int, to_player_id: int):
+        self.value ^= self._turn_keys[from_player_id] ^ self._turn_keys[to_player_id]
+
+    def compute(self, game) -> int:
+        """Returns the hash of ``game`` computed from scratch."""
+        board = game.board
+        value = self.tokens_key(BOARD_OWNER, board.tokens)
+        for deck_index, card_list in enumerate(board.exposed_evaluation_cards):
+            for card_index, card in enumerate(card_list):
+                if card is not None:
+                    value ^= self.card_key(
+                        SLOT_PLACE + deck_index * SLOTS_PER_LEVEL + card_index, card
+                    )
+        for card_index, card in enumerate(board.exposed_noble_cards):
+            if card is not None:
+                value ^= self.card_key(NOBLE_PLACE + card_index, card)
+        for player_id, player in enumerate(game.players):
+            value ^= self.tokens_key(BOARD_OWNER + 1 + player_id, player.tokens)
+            for index, card in enumerate(player.reserved_cards):
+                value ^= self.card_key(reserved_place(player_id, index), card)
+            for card in player.noble_deck.cards:
+                value ^= self.card_key(OWNED_PLACE + player_id, card)
+            for deck in player.evaluation_decks:
+                for card in deck.cards:
+                    value ^= self.card_key(OWNED_PLACE + player_id, card)
+        return value ^ self._turn_keys[game.current_player_id]
+
+    def attach(self, game):
+        """Hooks the board and players of ``game`` up to this hasher and resets it."""
+        game.board.zobrist = self
+        for player_id, player in enumerate(game.players):
+            player.zobrist = self
+            player.zobrist_id = player_id
+        self.value = self.compute(game)
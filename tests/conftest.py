@@ -5,6 +5,7 @@ import pytest
 
 from board import Board
 from card import EvaluationCard
+from game import Game
 from player import Player
 from tokens import Tokens
 
@@ -82,15 +83,16 @@ def player_with_tokens():
     """Fixture to create a player with tokens and bonuses."""
     player = Player()
     player.tokens = Tokens(red=2, green=3, blue=1, gold=2)  # Player tokens
-    player.evaluation_decks[0].cards.append(
+    player.add_evaluation_card(
         EvaluationCard(
             cost=Tokens(),
             score=0,
             bonus=Tokens(red=1),
-        )
+        ),
+        0,
     )
-    player.evaluation_decks[1].cards.append(
-        EvaluationCard(cost=Tokens(), score=0, bonus=Tokens(white=1))
+    player.add_evaluation_card(
+        EvaluationCard(cost=Tokens(), score=0, bonus=Tokens(white=1)), 1
     )
 
     return player
@@ -104,3 +106,22 @@ def evaluation_card():
         score=3,
         bonus=Tokens(blue=1),
     )
+
+
+@pytest.fixture
+def make_game(random_csv_noble, random_csv_evaluation):
+    """Fixture returning a factory for started games dealt from a fixed seed."""
+
+    def _make_game(num_of_players=2, seed=0, max_rounds=30):
+        game = Game()
+        game.setup_game(
+            random_csv_noble,
+            [random_csv_evaluation, random_csv_evaluation, random_csv_evaluation],
+            num_of_players,
+            max_rounds,
+        )
+        random.seed(seed)
+        game.start_new_game()
+        return game
+
+    return _make_game
@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+
+from actions import (
+    BUY_EVALUATION_OFFSET,
+    BUY_RESERVED_OFFSET,
+    RESERVE_WITHOUT_GOLD_OFFSET,
+)
+from affordability import affordability, game_arrays, nobles_earned
+from vec_game import VecGame
+
+
+def _play(game, steps, rng):
+    for _ in range(steps):
+        if game.end:
+            break
+        game.step(rng.choice(np.flatnonzero(game.legal_action_mask()).tolist()))
+
+
+def test_kernel_matches_player_checks(make_game):
+    """Test that the batched kernel agrees with Player card by card."""
+    rng = random.Random(0)
+    games = [make_game(num_of_players=3, seed=seed) for seed in range(4)]
+    for steps, game in enumerate(games):
+        _play(game, 10 * steps + 5, rng)
+
+    tokens, bonuses, board_costs, reserved_costs = game_arrays(games)
+    board_gold, board_ok = affordability(tokens, bonuses, board_costs)
+    reserved_gold, reserved_ok = affordability(tokens, bonuses, reserved_costs)
+    assert board_ok.shape == (4, 3, 12)
+    assert reserved_ok.shape == (4, 3, 3)
+
+    for index, game in enumerate(games):
+        cards = [
+            c for card_list in game.board.exposed_evaluation_cards for c in card_list
+        ]
+        for player_id, player in enumerate(game.players):
+            for slot, card in enumerate(cards):
+                expected = card is not None and player.can_buy_evaluation_card(card)
+                assert board_ok[index, player_id, slot] == expected
+                if card is not None:
+                    assert board_gold[index, player_id, slot] == player._gold_needed(
+                        card
+                    )
+            for slot, card in enumerate(player.reserved_cards):
+                assert reserved_ok[index, player_id, slot] == (
+                    player.can_buy_evaluation_card(card)
+                )
+            assert not reserved_ok[index, player_id, len(player.reserved_cards) :].any()
+
+            nobles = [n for n in game.board.exposed_noble_cards if n is not None]
+            costs = np.array([n.cost.as_tuple() for n in nobles]).reshape(-1, 6)
+            earned = nobles_earned(bonuses[index, player_id][None], costs)[0]
+            assert earned.tolist() == [player.can_buy_noble_card(n) for n in nobles]
+
+
+def test_vec_game_affordability(random_csv_noble, random_csv_evaluation):
+    """Test that VecGame.affordability matches its legal buy actions."""
+    vec = VecGame(random_csv_noble, [random_csv_evaluation] * 3, 5, 2, 30)
+    vec.reset(seeds=range(5))
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        mask = vec.legal_action_mask()
+        (_, board_ok), (_, reserved_ok) = vec.affordability()
+        env = np.arange(5)
+        current = board_ok[env, vec.current_player]
+        live = ~vec.done
+        assert np.array_equal(
+            mask[live, BUY_EVALUATION_OFFSET:BUY_RESERVED_OFFSET], current[live]
+        )
+        assert np.array_equal(
+            mask[live, BUY_RESERVED_OFFSET:RESERVE_WITHOUT_GOLD_OFFSET],
+            reserved_ok[env, vec.current_player][live],
+        )
+        actions = [rng.choice(np.flatnonzero(row)) if row.any() else 0 for row in mask]
+        vec.step(np.array(actions))
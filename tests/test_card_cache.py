@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pytest
+
+import card_cache
+from card_cache import ROW_BONUS, ROW_SCORE, cache_path, load_card_rows
+
+
+def test_compiled_rows_are_memory_mapped(random_csv_evaluation, monkeypatch):
+    """Test that the first load compiles the CSV and later loads skip parsing."""
+    rows = load_card_rows(random_csv_evaluation)
+    assert os.path.exists(cache_path(random_csv_evaluation))
+    assert rows.shape == (15, card_cache.ROW_SIZE)
+    assert (rows[:, ROW_SCORE] > 0).all()
+    assert (rows[:, ROW_BONUS] >= 0).all()
+
+    def fail(data):
+        raise AssertionError("CSV parsed again")
+
+    monkeypatch.setattr(card_cache, "parse_csv", fail)
+    cached = load_card_rows(random_csv_evaluation)
+    assert isinstance(cached, np.memmap)
+    assert np.array_equal(cached, rows)
+
+
+def test_stale_or_corrupt_cache_is_rebuilt(random_csv_noble):
+    """Test that editing the CSV or damaging the cache triggers a rebuild."""
+    rows = load_card_rows(random_csv_noble)
+    with open(random_csv_noble, "a") as file:
+        file.write("1,2,3,4,5,0\n")
+    rebuilt = load_card_rows(random_csv_noble)
+    assert len(rebuilt) == len(rows) + 1
+    assert rebuilt[-1, :6].tolist() == [1, 2, 3, 4, 5, 0]
+    assert rebuilt[-1, ROW_BONUS] == -1
+
+    with open(cache_path(random_csv_noble), "r+b") as file:
+        file.write(b"garbage!")
+    assert np.array_equal(load_card_rows(random_csv_noble), rebuilt)
+
+
+def test_out_of_range_values_are_rejected(tmp_path):
+    """Test that values that do not fit the compiled format raise."""
+    path = tmp_path / "cards.csv"
+    path.write_text("red,score,bonus\n200,1,red\n")
+    with pytest.raises(ValueError):
+        load_card_rows(path)
@@ -0,0 +1,68 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+import catalog
+from catalog import CATALOG, CardCatalog
+from card import EvaluationCard
+from deck import EvaluationDeck, NobleDeck
+from tokens import Tokens
+
+
+def test_cards_are_interned(random_csv_noble, random_csv_evaluation):
+    """Test that decks loading the same file share cards with stable ids."""
+    first, second = EvaluationDeck(level=1), EvaluationDeck(level=1)
+    first.read_from_csv(random_csv_evaluation)
+    second.read_from_csv(random_csv_evaluation)
+    assert all(a is b for a, b in zip(first.cards, second.cards))
+
+    other_level = EvaluationDeck(level=2)
+    other_level.read_from_csv(random_csv_evaluation)
+    assert not set(map(id, other_level.cards)) & set(map(id, first.cards))
+
+    nobles = NobleDeck()
+    nobles.read_from_csv(random_csv_noble)
+    for card in first.cards + nobles.cards:
+        assert CATALOG[card.id] is card
+        assert tuple(CATALOG.cost[card.id]) == card.cost.as_tuple()
+        assert CATALOG.score[card.id] == card.score
+    for card in first.cards:
+        assert tuple(CATALOG.bonus[card.id]) == card.bonus.as_tuple()
+        assert CATALOG.level[card.id] == 1
+    assert not CATALOG.cost.flags.writeable
+
+
+def test_changed_file_is_reloaded(random_csv_evaluation):
+    """Test that editing a CSV gives its rows new cards."""
+    deck = EvaluationDeck(level=0)
+    deck.read_from_csv(random_csv_evaluation)
+    with open(random_csv_evaluation, "a") as file:
+        file.write("1,1,1,1,1,0,1,red\n")
+
+    reloaded = EvaluationDeck(level=0)
+    reloaded.read_from_csv(random_csv_evaluation)
+    assert len(reloaded.cards) == len(deck.cards) + 1
+    assert reloaded.cards[0] is not deck.cards[0]
+    assert np.array_equal(CATALOG.cost[reloaded.cards[-1].id], [1, 1, 1, 1, 1, 0])
+
+
+def test_full_catalog_raises(random_csv_evaluation, monkeypatch):
+    """Test that a file that would overflow the card ids is not loaded at all."""
+    monkeypatch.setattr(catalog, "MAX_CARDS", 20)
+    cards = CardCatalog()
+    read_card = EvaluationDeck(level=0)._read_card
+    assert len(cards.load(random_csv_evaluation, 0, read_card)) == 15
+    with pytest.raises(OverflowError):
+        cards.load(random_csv_evaluation, 1, read_card)
+    assert len(cards) == 15
+
+
+def test_cards_compare_by_identity():
+    """Test that equal-valued cards stay distinct and cards are read-only."""
+    card = EvaluationCard(cost=Tokens(red=1), score=1, bonus=Tokens(red=1))
+    twin = EvaluationCard(cost=Tokens(red=1), score=1, bonus=Tokens(red=1))
+    assert card != twin
+    assert [card, twin].index(twin) == 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        card.score = 2
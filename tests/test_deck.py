@@ -1,4 +1,7 @@
+import pytest
+
 from card import Noble, EvaluationCard
+from catalog import CATALOG
 from deck import NobleDeck, EvaluationDeck
 from tokens import Tokens
 
@@ -52,3 +55,74 @@ def test_evaluation_deck(random_csv_evaluation):
             bonus_dict[key] += value  # Sum values for duplicate keys
 
     assert evaluation_deck.bonus.__dict__ == bonus_dict
+
+
+def test_draws_move_a_pointer(random_csv_evaluation):
+    """Test that draws leave the order intact and totals follow the pointer."""
+    deck = EvaluationDeck(level=1)
+    deck.read_from_csv(random_csv_evaluation)
+    deck.shuffle()
+    order = deck.order.tolist()
+    full_score, full_bonus = deck.score, deck.bonus.copy()
+
+    drawn = [deck.get_card() for _ in range(5)]
+    assert deck.order.tolist() == order
+    assert len(deck) == 10
+    assert deck.score == full_score - sum(card.score for card in drawn)
+    state = deck.state()
+
+    deck.rewind(5)
+    assert [card.id for card in deck.cards] == order
+    assert deck.score == full_score
+    assert deck.bonus == full_bonus
+
+    deck.set_state(state)
+    assert [card.id for card in deck.cards] == order[:10]
+    deck.refill()
+    assert len(deck) == 15
+    assert deck.score == full_score
+
+
+def test_add_card_on_top():
+    """Test that added cards are drawn first and counted in the totals."""
+    deck = EvaluationDeck(level=0)
+    card = EvaluationCard(cost=Tokens(), score=2, bonus=Tokens(green=1))
+    catalog_size = len(CATALOG)
+    deck.add_card(card)
+    assert deck.cards == (card,)
+    # Cards from outside the catalog are not registered in it
+    assert card.id == -1 and len(CATALOG) == catalog_size
+    assert deck.score == 2
+    assert deck.bonus == Tokens(green=1)
+
+    assert deck.get_card() is card
+    assert deck.get_card() is None
+    assert deck.score == 0
+    assert deck.bonus == Tokens()
+
+    deck.add_card(card)
+    state = deck.state()
+    deck.add_card(EvaluationCard(cost=Tokens(), score=1, bonus=Tokens(red=1)))
+    deck.set_state(state)
+    assert deck.cards == (card,)
+    with pytest.raises(AttributeError):
+        deck.cards.append(card)
+
+
+def test_exchange_swaps_the_drawn_card(random_csv_evaluation):
+    """Test that exchanging draws another card and exchanging again undoes it."""
+    deck = EvaluationDeck(level=1)
+    deck.read_from_csv(random_csv_evaluation)
+    deck.shuffle()
+    full_score = deck.score
+    drawn = deck.get_card()
+    order, bonus = deck.order.tolist(), deck.bonus.copy()
+
+    other = deck.exchange(3)
+    assert other.id == order[3]
+    assert drawn.id in deck.order[: len(deck)].tolist()
+    assert deck.score == full_score - other.score
+
+    assert deck.exchange(3).id == drawn.id
+    assert deck.order.tolist() == order
+    assert deck.bonus == bonus
@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+
+from encoding import PLAYER_SIZE, ObservationEncoder
+from game import Game
+from vec_game import VecGame
+
+
+def test_encode_writes_into_buffer(make_game):
+    """Test that encode fills the supplied buffer and rotates players by perspective."""
+    game = make_game(num_of_players=3)
+    encoder = ObservationEncoder(num_of_players=3)
+    out = np.full(encoder.size, -1, dtype=np.float32)
+
+    assert encoder.encode(game, out) is out
+    assert (out >= 0).all()
+    assert out[encoder.current_player_offset] == 1
+
+    game.step(int(np.flatnonzero(game.legal_action_mask())[1]))
+    seen_by_0 = encoder.encode(game, perspective=0)
+    seen_by_1 = encoder.encode(game, perspective=1)
+    players = slice(encoder.players_offset, encoder.current_player_offset)
+    assert np.array_equal(
+        seen_by_0[players][PLAYER_SIZE:], seen_by_1[players][: 2 * PLAYER_SIZE]
+    )
+    assert seen_by_0[encoder.current_player_offset + 1] == 1
+    assert seen_by_1[encoder.current_player_offset] == 1
+
+
+def test_batch_encodings_match_game_and_vec_game(
+    random_csv_noble, random_csv_evaluation
+):
+    """Test that Game batches and VecGame encode identically along a trajectory."""
+    evaluation_files = [random_csv_evaluation] * 3
+    seeds = [3, 4]
+    vec = VecGame(random_csv_noble, evaluation_files, len(seeds), 2, 15)
+    vec.reset(seeds)
+    games = []
+    for seed in seeds:
+        game = Game()
+        game.setup_game(random_csv_noble, evaluation_files, 2, 15)
+        random.seed(seed)
+        game.start_new_game()
+        games.append(game)
+
+    encoder = ObservationEncoder(num_of_players=2)
+    batch = np.empty((len(seeds), encoder.size), dtype=np.float32)
+    from_vec = np.empty_like(batch)
+    rng = np.random.default_rng(1)
+    while not vec.done.all():
+        encoder.encode_batch(games, batch)
+        encoder.encode_vec_game(vec, from_vec)
+        live = ~vec.done
+        assert np.array_equal(batch[live], from_vec[live])
+
+        mask = vec.legal_action_mask()
+        actions = np.array(
+            [rng.choice(np.flatnonzero(row)) if row.any() else 0 for row in mask]
+        )
+        for env, game in enumerate(games):
+            if live[env]:
+                assert game.step(int(actions[env]))
+        vec.step(actions)
@@ -0,0 +1,88 @@
+import random
+
+import numpy as np
+
+from agents import GreedyAgent
+from endgame import EndgameAgent, EndgameEvaluator, EndgameSolver, is_endgame
+from mcts import outcome
+
+
+def expectimax(game, root, depth=-1):
+    """
+    Plain expectimax over every move and every card a refill could draw, scoring
+    the states ``depth`` plies ahead with ``outcome`` (unlimited by default).
+    """
+    if game.end or not depth:
+        return outcome(game)[root]
+    values = []
+    for action in np.flatnonzero(game.legal_action_mask()).tolist():
+        record = game.apply(action)
+        board = game.board
+        total = expectimax(game, root, depth - 1)
+        remaining = len(board.evaluation_decks[record.deck_index]) if record.drew else 0
+        for position in range(remaining):
+            board.exchange_drawn_card(record.deck_index, record.card_index, position)
+            assert game.hash == game.zobrist.compute(game)
+            total += expectimax(game, root, depth - 1)
+            board.exchange_drawn_card(record.deck_index, record.card_index, position)
+        values.append(total / (remaining + 1))
+        game.undo(record)
+    return max(values) if game.current_player_id == root else min(values)
+
+
+def test_solver_matches_expectimax(make_game):
+    """Test exact values against plain expectimax in the last round of a game."""
+    for seed in range(2):
+        game = make_game(seed=seed, max_rounds=1)
+        rng = random.Random(seed)
+        while game.rounds < game.max_rounds:
+            game.step(rng.choice(np.flatnonzero(game.legal_action_mask()).tolist()))
+        assert is_endgame(game)
+        before = game.snapshot()
+        solver = EndgameSolver(time_limit=None)
+        result = solver.solve(game)
+        assert game.snapshot() == before
+        assert result.exact and result.depth <= 2
+        assert result.low == result.value == result.high
+        assert abs(result.value - expectimax(game, game.current_player_id)) < 1e-9
+        assert result.values[game.current_player_id] == result.value
+        assert game.legal_action_mask()[result.action]
+
+        # The evaluator returns every player's own solved outcome
+        assert EndgameEvaluator(solver)(game) == (
+            None,
+            list(result.values),
+        )
+
+
+def test_depth_limited_leaves_use_outcome(make_game):
+    """Test that leaves cut off by depth are scored like finished games."""
+    game = make_game(seed=2)
+    root = game.current_player_id
+    for depth in (1, 2):
+        solver = EndgameSolver(time_limit=None, max_depth=depth, bounds=False)
+        result = solver.solve(game)
+        assert not result.exact and result.depth == depth
+        assert abs(result.value - expectimax(game, root, depth)) < 1e-9
+
+
+def test_bounds_under_time_budget(make_game):
+    """Test that an unfinished search returns a legal move within its bounds."""
+    game = make_game(seed=3)
+    before = game.snapshot()
+    result = EndgameSolver(time_limit=0.2, max_depth=3).solve(game)
+    assert game.snapshot() == before
+    assert not result.exact and result.depth >= 1
+    assert game.legal_action_mask()[result.action]
+    assert 0.0 <= result.low <= result.value <= result.high <= 1.0
+
+
+def test_endgame_agent_plays_legal_moves(make_game):
+    """Test that the endgame agent finishes games with legal moves."""
+    game = make_game(seed=4, max_rounds=4)
+    agent = EndgameAgent(GreedyAgent(), EndgameSolver(time_limit=0.05))
+    while not game.end:
+        hash_before = game.hash
+        action = agent.select_action(game)
+        assert game.hash == hash_before
+        assert game.step(action)
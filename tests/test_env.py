@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+from config import SCORE_TO_WIN
+from env import SplendorEnv, SplendorVecEnv
+
+
+def _files(random_csv_noble, random_csv_evaluation):
+    return random_csv_noble, [random_csv_evaluation] * 3
+
+
+def test_env_plays_a_full_game(random_csv_noble, random_csv_evaluation):
+    """Test rewards, flags and buffer reuse over a seeded game."""
+    env = SplendorEnv(*_files(random_csv_noble, random_csv_evaluation), 3, 30)
+    observation, info = env.reset(seed=5)
+    assert np.shares_memory(observation, env.observations)
+    rng = random.Random(0)
+    returns = np.zeros(3)
+    terminated = truncated = False
+    while not (terminated or truncated):
+        player = env.agent_selection
+        assert info["player"] == player
+        np.testing.assert_array_equal(
+            observation, env.encoder.encode(env.game, perspective=player)
+        )
+        action = rng.choice(np.flatnonzero(info["action_mask"]).tolist())
+        observation, rewards, terminated, truncated, info = env.step(action)
+        assert rewards is env.rewards
+        returns += rewards
+
+    scores = [player.score for player in env.game.players]
+    np.testing.assert_allclose(returns, np.array(scores) / SCORE_TO_WIN, rtol=1e-6)
+    assert terminated == (max(scores) >= SCORE_TO_WIN)
+    assert not info["action_mask"].any()
+    with pytest.raises(ValueError):
+        env.step(0)
+
+    first = env.reset(seed=5)[0].copy()
+    np.testing.assert_array_equal(env.reset(seed=5)[0], first)
+
+
+def test_vec_env_matches_env_and_auto_resets(random_csv_noble, random_csv_evaluation):
+    """Test that environment 0 follows the single environment and then resets."""
+    files = _files(random_csv_noble, random_csv_evaluation)
+    env = SplendorEnv(*files, 2, 20)
+    vec_env = SplendorVecEnv(*files, 3, 2, 20)
+    observation, info = env.reset(seed=9)
+    observations, vec_info = vec_env.reset(seed=9)
+    rng = random.Random(1)
+
+    done = False
+    while not done:
+        np.testing.assert_array_equal(observations[0], observation)
+        np.testing.assert_array_equal(vec_info["action_mask"][0], info["action_mask"])
+        actions = [
+            rng.choice(np.flatnonzero(mask).tolist())
+            for mask in vec_info["action_mask"]
+        ]
+        observation, rewards, terminated, truncated, info = env.step(actions[0])
+        observations, vec_rewards, vec_terminated, vec_truncated, vec_info = (
+            vec_env.step(actions)
+        )
+        np.testing.assert_array_equal(vec_rewards[0], rewards)
+        assert (vec_terminated[0], vec_truncated[0]) == (terminated, truncated)
+        done = terminated or truncated
+
+    np.testing.assert_array_equal(vec_info["final_observation"][0], observation)
+    assert vec_env.vec.rounds[0] == 0
+    assert vec_env.vec.current_player[0] == 0
+    assert vec_info["action_mask"][0].any()
@@ -0,0 +1,96 @@
+import random
+
+import numpy as np
+
+from actions import (
+    BUY_RESERVED_OFFSET,
+    RESERVE_WITHOUT_GOLD_OFFSET,
+    SLOTS_PER_LEVEL,
+    WITHDRAWAL_OFFSET,
+)
+from agents import GreedyAgent, LookaheadAgent, RandomAgent
+from features import PurchaseFeatures
+
+
+def test_features_match_player_rules(make_game):
+    """Test that cached features agree with the player's buying rules every turn."""
+    game = make_game(num_of_players=3, seed=2)
+    features = PurchaseFeatures()
+    rng = random.Random(0)
+    while not game.end:
+        for player_id, player in enumerate(game.players):
+            player_features = features.get(game, player_id)
+            assert len(player_features.cards) == sum(
+                card is not None
+                for card_list in game.board.exposed_evaluation_cards
+                for card in card_list
+            ) + len(player.reserved_cards)
+            for feature in player_features.cards:
+                affordable = player.can_buy_evaluation_card(feature.card)
+                assert (feature.gold_short == 0) == affordable
+                assert (feature.turns == 0) == affordable
+                assert sum(feature.missing) == player._gold_needed(feature.card)
+            earned = sum(
+                noble is not None and player.can_buy_noble_card(noble)
+                for noble in game.board.exposed_noble_cards
+            )
+            assert player_features.nobles_within(0) == earned
+        game.step(rng.choice(np.flatnonzero(game.legal_action_mask()).tolist()))
+    assert features.get(game, 0) is features.get(game, 0)
+
+
+def test_heuristic_agents_beat_random(make_game):
+    """Test that the heuristic agents play legal moves and beat a random agent."""
+    for agent in (GreedyAgent(), LookaheadAgent(depth=2, width=4)):
+        wins = 0
+        for seed in range(4):
+            game = make_game(seed=seed)
+            agents = [agent, RandomAgent(random.Random(seed))]
+            if seed % 2:
+                agents.reverse()
+            while not game.end:
+                before = game.snapshot()
+                action = agents[game.current_player_id].select_action(game)
+                assert game.snapshot() == before
+                assert game.step(action)
+            seat = agents.index(agent)
+            scores = [player.score for player in game.players]
+            wins += scores[seat] > scores[1 - seat]
+        assert wins >= 3
+
+
+def test_shared_features_follow_each_game(make_game):
+    """Test that one instance shared by games of different deals keeps them apart."""
+    features = PurchaseFeatures()
+    first, second = make_game(seed=1), make_game(seed=2)
+    for game in (first, second, first):
+        exposed = [
+            card
+            for card_list in game.board.exposed_evaluation_cards
+            for card in card_list
+        ]
+        assert [f.card for f in features.get(game, 0).cards] == exposed
+    assert features.get(first, 0) is not features.get(second, 0)
+
+    second.restore(first.snapshot())
+    assert features.get(second, 0) is features.get(first, 0)
+
+
+def test_reserved_order_is_part_of_the_cache_key(make_game):
+    """Test that the same reserved cards in another order get their own features."""
+    features = PurchaseFeatures()
+    games = [make_game(seed=3), make_game(seed=3)]
+    for game, slots in zip(games, ([0, SLOTS_PER_LEVEL], [SLOTS_PER_LEVEL, 0])):
+        for slot in slots:
+            assert game.step(RESERVE_WITHOUT_GOLD_OFFSET + slot)
+            assert game.step(WITHDRAWAL_OFFSET)
+    for game in games:
+        reserved = game.players[0].reserved_cards
+        actions = {
+            feature.card: feature.buy_action
+            for feature in features.get(game, 0).cards
+            if feature.reserve_slot < 0
+        }
+        assert actions == {
+            card: BUY_RESERVED_OFFSET + index for index, card in enumerate(reserved)
+        }
@@ -0,0 +1,239 @@
+import random
+
+import numpy as np
+
+from actions import (
+    BUY_RESERVED_OFFSET,
+    NUM_ACTIONS,
+    RESERVE_WITHOUT_GOLD_OFFSET,
+    SLOTS_PER_LEVEL,
+    WITHDRAWAL_OFFSET,
+    action_to_option,
+    option_to_action,
+)
+from tokens import Tokens
+
+
+def _options_mask(game):
+    mask = np.zeros(NUM_ACTIONS, dtype=bool)
+    for operation, options in game.get_options_for_current_player_id().items():
+        for data in options:
+            mask[option_to_action(game, operation, data)] = True
+    return mask
+
+
+def test_legal_action_mask_matches_options(make_game):
+    """Test that the action mask and step agree with the option dict path."""
+    stepped = make_game(num_of_players=3, seed=5)
+    reference = make_game(num_of_players=3, seed=5)
+    rng = random.Random(0)
+
+    while not stepped.end:
+        mask = stepped.legal_action_mask()
+        assert np.array_equal(mask, _options_mask(reference))
+
+        action = rng.choice(np.flatnonzero(mask).tolist())
+        options = reference.get_options_for_current_player_id()
+        assert reference.apply_option(action_to_option(reference, action), options)
+        reference.finalize_turn()
+        assert stepped.step(action)
+
+        assert stepped.board.tokens == reference.board.tokens
+        assert [p.tokens for p in stepped.players] == [
+            p.tokens for p in reference.players
+        ]
+        assert [p.score for p in stepped.players] == [
+            p.score for p in reference.players
+        ]
+        assert stepped.player_id == reference.player_id
+
+
+def test_illegal_step_leaves_game_untouched(make_game):
+    """Test that an illegal action id is rejected without side effects."""
+    game = make_game()
+    mask = game.legal_action_mask()
+    tokens_before = game.board.tokens.copy()
+
+    assert not game.step(int(np.flatnonzero(~mask)[0]))
+    assert not game.step(NUM_ACTIONS)
+    assert game.board.tokens == tokens_before
+    assert game.player_id == 0
+
+    out = np.ones(NUM_ACTIONS, dtype=bool)
+    assert game.legal_action_mask(out) is out
+    assert np.array_equal(out, mask)
+
+
+def test_apply_and_undo_round_trip(make_game):
+    """Test that undoing every applied move restores each earlier state exactly."""
+    game = make_game(num_of_players=3, seed=2)
+    rng = random.Random(1)
+    history = []
+
+    while not game.end:
+        before = game.snapshot()
+        action = rng.choice(np.flatnonzero(game.legal_action_mask()).tolist())
+        record = game.apply(action)
+        assert record is not None
+        history.append((before, record))
+
+    assert game.apply(NUM_ACTIONS) is None
+    for before, record in reversed(history):
+        game.undo(record)
+        assert game.snapshot() == before
+
+
+def test_snapshot_restore_replays_identically(make_game):
+    """Test that restoring a snapshot lets the game continue exactly as before."""
+    game = make_game(seed=4)
+    for action in np.flatnonzero(game.legal_action_mask())[:3]:
+        game.step(int(action))
+    saved = game.snapshot()
+
+    def play_out():
+        rng = random.Random(7)
+        while not game.end:
+            game.step(rng.choice(np.flatnonzero(game.legal_action_mask()).tolist()))
+        return game.snapshot()
+
+    first = play_out()
+    game.restore(saved)
+    assert game.snapshot() == saved
+    assert play_out() == first
+
+
+def test_zobrist_hash_tracks_state(make_game):
+    """Test that the incremental hash always equals a from-scratch recomputation."""
+    game = make_game(num_of_players=3, seed=8)
+    rng = random.Random(3)
+    # The round counter is not part of the hash
+    seen = {game.hash: game.snapshot()._replace(rounds=0)}
+    records = []
+
+    while not game.end:
+        action = rng.choice(np.flatnonzero(game.legal_action_mask()).tolist())
+        records.append(game.apply(action))
+        assert game.hash == game.zobrist.compute(game)
+        state = game.snapshot()._replace(rounds=0)
+        assert seen.setdefault(game.hash, state) == state
+
+    for record in reversed(records):
+        game.undo(record)
+        assert game.hash == game.zobrist.compute(game)
+        assert seen[game.hash] == game.snapshot()._replace(rounds=0)
+
+
+def test_zobrist_hash_is_shared_across_games(make_game):
+    """Test that different deals hash differently and equal states equally."""
+    first, second = make_game(seed=1), make_game(seed=2)
+    assert first.board.exposed_evaluation_cards != second.board.exposed_evaluation_cards
+    assert first.hash != second.hash
+
+    second.restore(first.snapshot())
+    assert second.zobrist.compute(second) == first.hash
+    rng = random.Random(4)
+    while not first.end:
+        action = rng.choice(np.flatnonzero(first.legal_action_mask()).tolist())
+        first.step(action)
+        second.step(action)
+        assert second.hash == first.hash
+        assert second.zobrist.compute(second) == first.hash
+
+
+def _reserve_in_order(game, slots):
+    """Player 0 reserves the given board slots while player 1 withdraws nothing."""
+    for slot in slots:
+        assert game.step(RESERVE_WITHOUT_GOLD_OFFSET + slot)
+        assert game.step(WITHDRAWAL_OFFSET)
+
+
+def test_zobrist_hash_orders_reserved_cards(make_game):
+    """Test that the same reserved cards in another order hash differently."""
+    first, second = make_game(seed=3), make_game(seed=3)
+    _reserve_in_order(first, [0, SLOTS_PER_LEVEL])
+    _reserve_in_order(second, [SLOTS_PER_LEVEL, 0])
+    assert first.board.exposed_evaluation_cards == second.board.exposed_evaluation_cards
+    assert first.players[0].reserved_cards == second.players[0].reserved_cards[::-1]
+    assert first.hash != second.hash
+
+    # Buying the first reserved card moves the second one down
+    first.players[0].tokens += Tokens(10, 10, 10, 10, 10, 0)
+    first.zobrist.attach(first)
+    assert first.step(BUY_RESERVED_OFFSET)
+    assert first.hash == first.zobrist.compute(first)
+
+
+def test_reset_reuses_game_in_place(make_game):
+    """Test that reset after a played game deals what a fresh game deals."""
+    game = make_game(num_of_players=3, seed=4)
+    board_tokens, players = game.board.tokens, list(game.players)
+    rng = random.Random(1)
+    while not game.end:
+        game.step(rng.choice(np.flatnonzero(game.legal_action_mask()).tolist()))
+
+    random.seed(9)
+    game.reset()
+    fresh = make_game(num_of_players=3, seed=9)
+
+    assert game.snapshot() == fresh.snapshot()
+    assert game.board.tokens is board_tokens
+    assert all(a is b for a, b in zip(game.players, players))
+
+    game.reset(random.Random(5))
+    first = game.snapshot()
+    game.reset(random.Random(5))
+    assert game.snapshot() == first
+
+
+def test_lazy_options_match_option_dict(make_game):
+    """Test the lazy option API against get_options_for_current_player_id."""
+    game = make_game(num_of_players=2, seed=6)
+    rng = random.Random(2)
+    while not game.end:
+        options = game.get_options_for_current_player_id()
+        lazy = {operation: [] for operation in options}
+        for operation, data in game.iter_options():
+            lazy[operation].append(data)
+        assert lazy == options
+        assert list(game.iter_options(["buy_reserved"])) == [
+            ("buy_reserved", card) for card in options["buy_reserved"]
+        ]
+        assert game.has_any_legal_move()
+
+        for operation, data in game.iter_options():
+            assert game.is_legal_option({operation: data})
+        for card in options["reserved_without_gold"]:
+            expected = card in options["buy_evaluation"]
+            assert game.is_legal_option({"buy_evaluation": card}) == expected
+        assert not game.is_legal_option({"buy_reserved": None})
+
+        seen = set()
+        for _ in range(1000):
+            option = game.sample_legal_option(rng)
+            assert game.is_legal_option(option)
+            seen.update((op, id(data)) for op, data in option.items())
+        assert len(seen) == sum(len(data) for data in options.values())
+
+        assert game.apply_option(game.sample_legal_option(rng))
+        game.finalize_turn()
+
+
+def test_seeded_games_are_independent_of_the_module_rng(make_game):
+    """Test that a seeded game deals from its own stream only."""
+    game = make_game(seed=0)
+    other = make_game(seed=1)
+    game.seed(1234)
+    other.seed(1234)
+
+    random.seed(1)
+    game.reset()
+    state = random.getstate()
+    random.seed(2)
+    other.reset()
+    assert game.snapshot() == other.snapshot()
+
+    game.seed(1234)
+    random.setstate(state)
+    game.reset()
+    assert random.getstate() == state
+    assert game.rng_seed == 1234
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from encoding import ObservationEncoder
+from inference import BrokerAgent, InferenceBroker
+
+
+def _first_legal(observations, legal_masks, player_ids):
+    return legal_masks.argmax(axis=1)
+
+
+def _play(game, agent):
+    while not game.end:
+        assert game.step(agent.select_action(game))
+
+
+def test_threads_share_batches(make_game):
+    """Test that games played from threads get legal actions in shared batches."""
+    games = [make_game(seed=seed) for seed in range(8)]
+    encoder = ObservationEncoder(2)
+    with InferenceBroker(_first_legal, encoder.size, max_batch_size=8) as broker:
+        threads = [
+            threading.Thread(target=_play, args=(game, BrokerAgent(broker, encoder)))
+            for game in games
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert all(game.end for game in games)
+    stats = broker.stats()
+    assert stats["requests"] == sum(
+        game.rounds * 2 + game.current_player_id for game in games
+    )
+    assert stats["mean_batch_size"] > 1
+
+
+def test_asyncio_tasks_and_policy_errors(make_game):
+    """Test the asyncio path and that a failing policy reaches its callers."""
+    games = [make_game(seed=seed) for seed in range(4)]
+    encoder = ObservationEncoder(2)
+
+    async def play(game, agent):
+        while not game.end:
+            assert game.step(await agent.select_action_async(game))
+
+    async def main(broker):
+        await asyncio.gather(
+            *(play(game, BrokerAgent(broker, encoder)) for game in games)
+        )
+
+    with InferenceBroker(_first_legal, encoder.size, max_batch_size=4) as broker:
+        asyncio.run(main(broker))
+    assert all(game.end for game in games)
+    assert broker.stats()["mean_batch_size"] > 1
+
+    def failing(observations, legal_masks, player_ids):
+        raise RuntimeError("model failed")
+
+    game = make_game(seed=1)
+    with InferenceBroker(failing, encoder.size, max_latency=0.0) as broker:
+        with pytest.raises(RuntimeError, match="model failed"):
+            BrokerAgent(broker, encoder).select_action(game)
+
+    illegal = InferenceBroker(
+        lambda o, m, p: np.full(len(m), -1), encoder.size, max_latency=0.0
+    )
+    with illegal, pytest.raises(ValueError):
+        BrokerAgent(illegal, encoder).select_action(game)
+
+
+def test_abandoned_async_request_keeps_broker_serving(make_game):
+    """Test that a request whose event loop closed does not stop the broker."""
+    game = make_game(seed=2)
+    encoder = ObservationEncoder(2)
+
+    async def impatient(agent):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(agent.select_action_async(game), 0.01)
+
+    with InferenceBroker(_first_legal, encoder.size, max_latency=0.2) as broker:
+        # The loop is closed by the time the broker serves the request
+        asyncio.run(impatient(BrokerAgent(broker, encoder)))
+        actions = []
+        thread = threading.Thread(
+            target=lambda: actions.append(
+                BrokerAgent(broker, encoder).select_action(game)
+            )
+        )
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert game.legal_action_mask()[actions[0]]
+    assert broker.stats()["requests"] == 2
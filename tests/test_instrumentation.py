@@ -0,0 +1,95 @@
+import json
+import random
+
+import numpy as np
+
+from actions import NUM_ACTIONS
+from instrumentation import GameProfiler, merge_snapshots
+
+
+def _play(game, rng):
+    while not game.end:
+        options = game.get_options_for_current_player_id()
+        operation = rng.choice([op for op, data in options.items() if data])
+        assert game.apply_option({operation: rng.choice(options[operation])}, options)
+        game.finalize_turn()
+
+
+def test_profiling_records_hot_paths(make_game):
+    """Test that an enabled profiler counts every hot path of a full game."""
+    game = make_game(seed=2)
+    profiler = game.enable_profiling()
+    _play(game, random.Random(0))
+
+    snapshot = profiler.snapshot()
+    timings = snapshot["timings"]
+    turns = timings["finalize_turn"]["calls"]
+    assert turns > 0
+    assert timings["apply_option"]["calls"] == turns
+    assert timings["buying_noble"]["calls"] == turns
+    assert timings["options.withdrawal"]["calls"] == turns
+    assert timings["options.reserved_with_gold"]["calls"] == turns
+    assert sum(snapshot["option_counts"].values()) == turns
+    assert snapshot["game_lengths"] == {str(game.rounds): 1}
+    assert json.loads(json.dumps(snapshot)) == snapshot
+
+
+def test_profiling_does_not_change_play(make_game):
+    """Test that the same seeded game is played with and without a profiler."""
+    snapshots = []
+    for profile in (False, True):
+        game = make_game(seed=4)
+        if profile:
+            game.enable_profiling()
+        rng = random.Random(1)
+        mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        while not game.end:
+            legal = np.flatnonzero(game.legal_action_mask(mask))
+            assert game.step(int(legal[rng.randrange(len(legal))]))
+        snapshots.append(game.snapshot())
+    assert snapshots[0] == snapshots[1]
+    assert game.profiler.snapshot()["timings"]["apply_action"]["calls"] > 0
+
+    game.disable_profiling()
+    assert game.profiler is None
+
+
+def test_apply_path_is_profiled_once_per_turn(make_game):
+    """Test that apply times both phases and options are counted once per turn."""
+    game = make_game(seed=3)
+    profiler = game.enable_profiling()
+    rng = random.Random(5)
+    records = []
+    while not game.end:
+        game.legal_action_mask()
+        legal = np.flatnonzero(game.legal_action_mask())
+        records.append(game.apply(int(legal[rng.randrange(len(legal))])))
+
+    timings = profiler.snapshot()["timings"]
+    turns = len(records)
+    assert timings["apply_action"]["calls"] == turns
+    assert timings["finalize_turn"]["calls"] == turns
+    assert timings["buying_noble"]["calls"] == turns
+    assert sum(profiler.option_counts.values()) == turns
+    assert not profiler.game_lengths
+
+
+def test_periodic_dump_and_merge(make_game, tmp_path):
+    """Test that the profiler dumps to its path and that snapshots add up."""
+    path = tmp_path / "profile.json"
+    profiler = GameProfiler(dump_path=str(path), dump_interval=0.0)
+    games = [make_game(seed=seed) for seed in (5, 6)]
+    for game in games:
+        game.enable_profiling(profiler)
+        _play(game, random.Random(2))
+
+    dumped = json.loads(path.read_text())
+    assert sum(dumped["game_lengths"].values()) == 2
+
+    merged = merge_snapshots([dumped, dumped])
+    assert sum(merged["game_lengths"].values()) == 4
+    name = "finalize_turn"
+    assert merged["timings"][name]["calls"] == 2 * dumped["timings"][name]["calls"]
+
+    profiler.reset()
+    assert profiler.snapshot()["timings"] == {}
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from agents import RandomAgent
+from actions import BUY_RESERVED_OFFSET
+from mcts import MCTS, MCTSAgent, Node, RolloutEvaluator, outcome
+
+
+def _mcts(**kwargs):
+    return MCTS(
+        RolloutEvaluator(max_steps=5, rng=random.Random(0)),
+        rng=random.Random(1),
+        **kwargs,
+    )
+
+
+def _most_visited_move(mcts, game) -> int:
+    """The action leading to the searched state with the most visits."""
+
+    def reached_visits(action):
+        record = game.apply(action)
+        node = mcts.table.get(game.hash)
+        game.undo(record)
+        return node.total_visits if node is not None else 0
+
+    return max(mcts.table[game.hash].actions, key=reached_visits)
+
+
+@pytest.mark.parametrize("selection", ["puct", "uct"])
+def test_search_leaves_game_unchanged(make_game, selection):
+    """Test that a search returns a legal action and restores the game."""
+    game = make_game(seed=3)
+    before = game.snapshot()
+
+    mcts = _mcts(selection=selection, simulations=50)
+    action = mcts.best_action(game)
+
+    assert game.legal_action_mask()[action]
+    assert game.snapshot() == before
+    assert mcts.visit_counts(game).sum() == 50
+
+
+def test_subtree_is_reused(make_game):
+    """Test that the node of the next state keeps its statistics across moves."""
+    game = make_game(seed=1)
+    # Little exploration, so the search goes deep enough to visit the state reached
+    mcts = _mcts(simulations=200, exploration=0.3)
+    mcts.search(game)
+    assert game.step(_most_visited_move(mcts, game))
+    assert game.step(_most_visited_move(mcts, game))
+
+    visits = mcts.table[game.hash].total_visits
+    assert visits > 0
+    mcts.retain_subtree(game.hash)
+    mcts.search(game)
+
+    assert mcts.table[game.hash].total_visits == visits + 200
+
+
+def test_search_ignores_hidden_deck_order(make_game):
+    """Test that games differing only in undrawn cards' order search the same."""
+    game = make_game(seed=5)
+    other = make_game(seed=6)
+    other.restore(game.snapshot())
+    for deck in other.board.evaluation_decks:
+        deck.shuffle(random.Random(7))
+    assert other.hash == game.hash
+    assert any(
+        deck.order[: deck.size] != other_deck.order[: other_deck.size]
+        for deck, other_deck in zip(
+            game.board.evaluation_decks, other.board.evaluation_decks
+        )
+    )
+
+    before = game.snapshot()
+    counts = []
+    for state in (game, other):
+        mcts = _mcts(simulations=100)
+        mcts.search(state)
+        counts.append(mcts.visit_counts(state).tolist())
+    assert counts[0] == counts[1]
+    assert game.snapshot() == before
+
+
+def test_illegal_stored_action_stops_descent(make_game):
+    """Test that a node whose action is illegal in this state is not descended."""
+    game = make_game(seed=2)
+    before = game.snapshot()
+    mcts = _mcts(simulations=5)
+    # No card is reserved yet, so buying reserved card 0 is illegal
+    node = mcts.table[game.hash] = Node(
+        game.current_player_id, [BUY_RESERVED_OFFSET], [1.0]
+    )
+    mcts.search(game)
+    assert game.snapshot() == before
+    assert node.total_visits == 0 and not node.children
+
+
+def test_time_budget(make_game):
+    """Test that a wall-clock budget alone bounds the search."""
+    game = make_game(seed=2)
+    mcts = _mcts(simulations=None, time_limit=0.05)
+    node = mcts.search(game)
+    assert node.total_visits > 0
+
+    with pytest.raises(ValueError):
+        MCTS(simulations=None, time_limit=None)
+
+
+def test_agent_plays_full_game(make_game):
+    """Test that an MCTS agent plays legal moves until the game ends."""
+    game = make_game(seed=4, max_rounds=10)
+    agents = [MCTSAgent(_mcts(simulations=20)), RandomAgent(random.Random(0))]
+    while not game.end:
+        assert game.step(agents[game.current_player_id].select_action(game))
+
+    values = outcome(game)
+    assert len(values) == 2
+    assert all(0 <= value <= 1 for value in values)
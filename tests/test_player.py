@@ -1,7 +1,7 @@
 import pytest
 from board import Board
 from card import Noble
-from tokens import Tokens
+from tokens import FrozenTokens, Tokens
 from player import Player
 
 
@@ -244,3 +244,42 @@ def test_buy_reserved_card_success(mock_board, player_with_tokens):
 
     # Assert the card is added to the player's evaluation deck
     assert len(player.evaluation_decks[0].cards) == 1
+
+
+def test_buy_updates_running_bonus_and_score(mock_board, player_with_tokens):
+    """Test that buying cards and nobles keeps bonus and score totals current."""
+    board = mock_board
+    player = player_with_tokens
+
+    board.start_new_board(4)
+
+    card = board.exposed_evaluation_cards[1][2]
+    player.tokens = card.cost
+    bonuses_before = player._bonuses().copy()
+    player.buy_evaluation_card(board, deck_index=1, card_index=2)
+
+    assert player._bonuses() == bonuses_before + card.bonus
+    assert player.score == card.score
+
+    noble = Noble(cost=Tokens(red=1))
+    board.exposed_noble_cards[0] = noble
+    player.buy_noble_card(board, card_index=0)
+
+    assert player.score == card.score + noble.score
+    assert player.score == player.noble_deck.score + sum(
+        deck.score for deck in player.evaluation_decks
+    )
+
+
+def test_withdrawal_options_are_shared_and_read_only(setup_board):
+    """Test that withdrawal options come from the shared precomputed table."""
+    board = setup_board
+    player = Player()
+
+    first = player.get_withdrawal_options(board)
+    second = Player().get_withdrawal_options(board)
+
+    assert all(a is b for a, b in zip(first, second))
+    assert isinstance(first[0], FrozenTokens)
+    # 1 empty + 5 singles + 10 pairs + 10 triples + doubles of red and green
+    assert len(first) == 28
@@ -0,0 +1,12 @@
+from seeding import AGENT_STREAM, game_rng, game_seed, stream_seed
+
+
+def test_streams_are_deterministic_and_distinct():
+    """Test that seeds depend only on the run seed and the stream key."""
+    assert game_seed(7, 3) == game_seed(7, 3)
+    seeds = {game_seed(run, index) for run in range(3) for index in range(100)}
+    assert len(seeds) == 300
+    assert all(0 <= seed < 2**64 for seed in seeds)
+    assert stream_seed(7, 3) != game_seed(7, 3)
+    assert game_rng(7, 3).random() == game_rng(7, 3).random()
+    assert game_rng(7, 3).random() != game_rng(7, 3, AGENT_STREAM).random()
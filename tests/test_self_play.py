@@ -0,0 +1,105 @@
+import random
+import threading
+
+import numpy as np
+
+from agents import RandomAgent
+from encoding import ObservationEncoder
+from seeding import AGENT_STREAM, game_rng
+from self_play import SelfPlayRunner, TransitionBuffer, _play
+
+
+class _RecordingAgent(RandomAgent):
+    built = []
+    resets = []
+    stop = None
+
+    def reset(self, rng=None):
+        super().reset(rng)
+        self.resets.append(rng.getstate())
+        if len(self.resets) > 6:  # stop before the fourth game is played
+            self.stop.set()
+
+
+def _recording_factory(rng, seat):
+    agent = _RecordingAgent(random.Random(rng.getrandbits(64)))
+    agent.built.append(seat)
+    return agent
+
+
+def test_self_play_fills_shared_buffer(random_csv_noble, random_csv_evaluation):
+    """Test that workers write consistent transitions and count finished games."""
+    with SelfPlayRunner(
+        random_csv_noble,
+        [random_csv_evaluation] * 3,
+        num_of_players=2,
+        max_rounds=10,
+        num_workers=2,
+        capacity=1000,
+        seed=7,
+    ) as runner:
+        stats = runner.run(games=4, duration=30)
+        buffer = runner.buffer
+
+        assert stats["games"] >= 4
+        assert stats["steps"] == buffer.transitions_written() > 0
+        assert stats["steps_per_sec"] > 0
+
+        for worker in range(buffer.num_workers):
+            rows = buffer.valid_rows(worker)
+            masks = buffer.legal_masks[worker, rows]
+            actions = buffer.actions[worker, rows]
+            assert masks[np.arange(len(rows)), actions].all()
+            assert (buffer.rewards[worker, rows] >= 0).all()
+
+        batch = buffer.sample(16, np.random.default_rng(0))
+        assert batch["observations"].shape == (16, buffer.observation_size)
+
+
+def test_transition_buffer_ring_wraps():
+    """Test that a wrapped ring leaves out the row being overwritten next."""
+    buffer = TransitionBuffer(num_workers=1, capacity=4, observation_size=3)
+    try:
+        for action in range(6):
+            buffer.observations[0, buffer.slot(0)] = action
+            buffer.publish(0, action, 0.0, False, 0)
+
+        rows = buffer.valid_rows(0)
+        assert buffer.actions[0, rows].tolist() == [3, 4, 5]
+        assert buffer.observations[0, rows, 0].tolist() == [3, 4, 5]
+    finally:
+        buffer.close()
+
+
+def test_agents_are_built_per_worker_and_reset_per_game(
+    random_csv_noble, random_csv_evaluation
+):
+    """Test that a worker keeps its agents and reseeds them from each game's stream."""
+    _RecordingAgent.built, _RecordingAgent.resets = [], []
+    _RecordingAgent.stop = stop = threading.Event()
+    size = ObservationEncoder(2).size
+    buffer = TransitionBuffer(num_workers=1, capacity=1000, observation_size=size)
+    try:
+        _play(
+            0,
+            1,
+            buffer.spec(),
+            stop,
+            7,
+            random_csv_noble,
+            [random_csv_evaluation] * 3,
+            2,
+            10,
+            _recording_factory,
+        )
+        assert buffer.counters[0, 1] == 3
+    finally:
+        buffer.close()
+
+    assert _RecordingAgent.built == [0, 1]
+    expected = []
+    for game_index in range(4):
+        agent_rng = game_rng(7, game_index, AGENT_STREAM)
+        for _ in range(2):
+            expected.append(random.Random(agent_rng.getrandbits(64)).getstate())
+    assert _RecordingAgent.resets == expected
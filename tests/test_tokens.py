@@ -0,0 +1,62 @@
+import copy
+import pickle
+
+import pytest
+
+from tokens import FrozenTokens, Tokens
+
+
+def test_in_place_add_and_sub_keep_identity():
+    """Test that += and -= update the left-hand Tokens in place."""
+    tokens = Tokens(red=1, gold=2)
+    same = tokens
+
+    tokens += Tokens(red=2, blue=1)
+    tokens -= Tokens(gold=1)
+
+    assert tokens is same
+    assert tokens == Tokens(red=3, blue=1, gold=1)
+
+
+def test_frozen_tokens_rebind_on_in_place_ops():
+    """Test that in-place ops on FrozenTokens never modify the shared value."""
+    shared = FrozenTokens(red=2)
+    tokens = shared
+
+    tokens -= Tokens(red=1)
+
+    assert shared == Tokens(red=2)
+    assert tokens == Tokens(red=1)
+    assert type(tokens) is Tokens
+    with pytest.raises(AttributeError):
+        shared.red = 5
+
+
+def test_hash_matches_equality():
+    """Test that equal Tokens hash equally, including frozen ones."""
+    assert hash(Tokens(red=1, gold=1)) == hash(FrozenTokens(red=1, gold=1))
+    assert len({Tokens(blue=2), FrozenTokens(blue=2), Tokens(blue=1)}) == 2
+
+
+def test_clamp_and_covers():
+    """Test clamp-at-zero and covers comparisons."""
+    assert Tokens(red=2, green=-1).clamp_at_zero() == Tokens(red=2)
+    assert Tokens(red=3, green=1).clamped_sub(Tokens(red=1, green=2)) == Tokens(red=2)
+    assert Tokens(red=2, gold=1).covers(Tokens(red=2))
+    assert not Tokens(red=2).covers(Tokens(red=2, gold=1))
+
+
+def test_copy_and_pickle_round_trip():
+    """Test that copies and pickles preserve type and counts."""
+    frozen = FrozenTokens(white=3)
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+    assert type(copy.deepcopy(frozen)) is FrozenTokens
+    assert type(frozen.copy()) is Tokens
+    assert Tokens(black=1).__dict__ == {
+        "red": 0,
+        "green": 0,
+        "blue": 0,
+        "white": 0,
+        "black": 1,
+        "gold": 0,
+    }
@@ -0,0 +1,96 @@
+import json
+import random
+
+import numpy as np
+
+from agents import Agent, RandomAgent
+from ratings import RatingTable
+from tournament import Tournament
+
+
+class PassingAgent(Agent):
+    """Always withdraws nothing, so never scores."""
+
+    def select_action(self, game) -> int:
+        return 0
+
+
+def passing_factory(rng, seat):
+    return PassingAgent()
+
+
+def random_factory(rng, seat):
+    return RandomAgent(rng)
+
+
+def test_rating_table_orders_and_bounds():
+    """Test that ratings follow head-to-head results and intervals shrink."""
+    table = RatingTable(["a", "b", "c"])
+    for _ in range(10):
+        table.add_game(["a", "b"], [15, 3])
+        table.add_game(["b", "c"], [8, 2])
+        table.add_game(["a", "c"], [9, 9])
+    first = table.fit()
+    assert first["a"].elo > first["b"].elo > first["c"].elo
+    assert abs(sum(rating.elo for rating in first.values())) < 1e-6
+    assert all(r.low < r.elo < r.high and r.games == 20 for r in first.values())
+    for _ in range(30):
+        table.add_game(["a", "b", "c"], [15, 10, 5])
+    second = table.fit()
+    assert second["b"].high - second["b"].low < first["b"].high - first["b"].low
+
+
+def test_round_robin_stops_decided_pairings(
+    random_csv_noble, random_csv_evaluation, tmp_path
+):
+    """Test that a lopsided pairing stops early and results are streamed."""
+    path = tmp_path / "results.jsonl"
+    tournament = Tournament(
+        random_csv_noble,
+        [random_csv_evaluation] * 3,
+        {"random": random_factory, "random_2": random_factory, "pass": passing_factory},
+        max_rounds=15,
+        max_blocks=6,
+        min_blocks=3,
+        num_workers=0,
+        seed=3,
+        results_path=str(path),
+    )
+    results = list(tournament.run())
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == len(results)
+
+    states = tournament.pairings
+    assert states[("pass", "random")].decided
+    assert states[("pass", "random")].blocks_started < 6
+    assert states[("random", "random_2")].blocks_started <= 6
+    ratings = tournament.ratings()
+    assert ratings["pass"].high < ratings["random"].elo
+
+    # Both seat rotations of a block share the deal
+    block = [r for r in results if r.pairing == ("pass", "random") and r.block == 0]
+    assert sorted(r.rotation for r in block) == [0, 1]
+    assert {r.seats for r in block} == {("pass", "random"), ("random", "pass")}
+
+
+def test_swiss_in_worker_processes(random_csv_noble, random_csv_evaluation):
+    """Test Swiss rounds of 3-player games played by a process pool."""
+    entrants = {f"random_{index}": random_factory for index in range(3)}
+    entrants["pass"] = passing_factory
+    tournament = Tournament(
+        random_csv_noble,
+        [random_csv_evaluation] * 3,
+        entrants,
+        num_of_players=3,
+        max_rounds=8,
+        pairing="swiss",
+        swiss_rounds=2,
+        max_blocks=2,
+        num_workers=2,
+        seed=random.Random(0).getrandbits(32),
+    )
+    results = list(tournament.run())
+    assert len(results) == 2 * 2 * 3  # rounds x blocks x rotations
+    assert len(tournament.pairings) == 2
+    assert all(len(result.scores) == 3 for result in results)
+    assert np.isfinite([r.elo for r in tournament.ratings().values()]).all()
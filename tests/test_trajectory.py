@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+
+from trajectory import TrajectoryReader, TrajectoryWriter
+
+
+def _play_recorded(game, writer, rng, seed):
+    """Plays a random game through ``writer``; returns the snapshot of every turn."""
+    writer.begin_game(game, seed)
+    snapshots = [game.snapshot()]
+    while not game.end:
+        legal = np.flatnonzero(game.legal_action_mask())
+        assert writer.step(game, int(legal[rng.randrange(len(legal))]))
+        snapshots.append(game.snapshot())
+    writer.end_game()
+    return snapshots
+
+
+def test_replay_regenerates_every_state(make_game, tmp_path):
+    """Test that replayed games go through the recorded states, in any order."""
+    path = str(tmp_path / "games.traj")
+    game = make_game(seed=0)
+    rng = random.Random(0)
+    played = []
+    with TrajectoryWriter(path, games_per_chunk=2) as writer:
+        for seed in range(5):
+            game.reset(random.Random(seed))
+            played.append(_play_recorded(game, writer, rng, seed))
+
+    replay_game = make_game(seed=1)
+    with TrajectoryReader(path) as reader:
+        assert len(reader) == 5
+        assert [record.seed for record in reader] == list(range(5))
+        for index in (3, 0, 4):
+            states = [state.snapshot() for state in reader.replay(index, replay_game)]
+            assert states == played[index]
+            assert reader[index].num_turns == len(played[index]) - 1
+
+        turn = len(played[2]) // 2
+        state = reader.state_at(2, turn, replay_game)
+        assert state.snapshot() == played[2][turn]
+
+
+def test_reader_sees_only_complete_chunks(make_game, tmp_path):
+    """Test that a reader ignores a partly written chunk and refreshes later."""
+    path = str(tmp_path / "games.traj")
+    game = make_game(seed=0)
+    rng = random.Random(1)
+    writer = TrajectoryWriter(path, games_per_chunk=1)
+    game.reset(random.Random(0))
+    _play_recorded(game, writer, rng, 0)
+
+    reader = TrajectoryReader(path)
+    assert len(reader) == 1
+
+    game.reset(random.Random(1))
+    _play_recorded(game, writer, rng, 1)
+    complete = open(path, "rb").read()
+    writer.close()
+    with open(path, "wb") as file:
+        file.write(complete[:-10])  # the second chunk is still being written
+    assert reader.refresh() == 0
+    assert len(reader) == 1
+
+    with open(path, "wb") as file:
+        file.write(complete)
+    assert reader.refresh() == 1
+    assert reader[-1].seed == 1
+    reader.close()
@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+
+from actions import NUM_ACTIONS, action_to_option, option_to_action
+from game import Game
+from vec_game import EMPTY, VecGame
+
+
+def _game_mask(game):
+    mask = np.zeros(NUM_ACTIONS, dtype=bool)
+    for operation, options in game.get_options_for_current_player_id().items():
+        for data in options:
+            mask[option_to_action(game, operation, data)] = True
+    return mask
+
+
+def _assert_same_state(game, vec, env):
+    assert game.board.tokens.as_tuple() == tuple(vec.board_tokens[env])
+    assert game.current_player_id == vec.current_player[env]
+    assert game.rounds == vec.rounds[env]
+    assert game.end == vec.done[env]
+    for deck_index, card_list in enumerate(game.board.exposed_evaluation_cards):
+        for card_index, card in enumerate(card_list):
+            card_id = vec.exposed[env, deck_index, card_index]
+            if card is None:
+                assert card_id == EMPTY
+            else:
+                assert card.cost.as_tuple() == tuple(vec.card_cost[card_id])
+                assert card.score == vec.card_score[card_id]
+    for player_id, player in enumerate(game.players):
+        assert player.tokens.as_tuple() == tuple(vec.player_tokens[env, player_id])
+        assert player.score == vec.scores[env, player_id]
+        assert len(player.reserved_cards) == np.sum(
+            vec.reserved[env, player_id] != EMPTY
+        )
+
+
+@pytest.mark.parametrize("num_of_players", [2, 3, 4])
+def test_vec_game_matches_game_trajectories(
+    random_csv_noble, random_csv_evaluation, num_of_players
+):
+    """Test that VecGame follows the same trajectories as Game under the same seeds."""
+    evaluation_files = [random_csv_evaluation] * 3
+    seeds = [11, 12, 13]
+    vec = VecGame(random_csv_noble, evaluation_files, len(seeds), num_of_players, 20)
+    vec.reset(seeds)
+
+    games = []
+    for seed in seeds:
+        game = Game()
+        game.setup_game(random_csv_noble, evaluation_files, num_of_players, 20)
+        random.seed(seed)
+        game.start_new_game()
+        games.append(game)
+
+    rng = np.random.default_rng(0)
+    while not vec.done.all():
+        mask = vec.legal_action_mask()
+        actions = np.zeros(len(seeds), dtype=np.int64)
+        for env, game in enumerate(games):
+            if vec.done[env]:
+                continue
+            assert np.array_equal(mask[env], _game_mask(game))
+            actions[env] = rng.choice(np.flatnonzero(mask[env]))
+            options = game.get_options_for_current_player_id()
+            assert game.apply_option(action_to_option(game, actions[env]), options)
+            game.finalize_turn()
+        vec.step(actions)
+        for env, game in enumerate(games):
+            _assert_same_state(game, vec, env)
+
+
+def test_vec_game_rejects_illegal_actions(random_csv_noble, random_csv_evaluation):
+    """Test that stepping with an illegal action raises."""
+    vec = VecGame(random_csv_noble, [random_csv_evaluation] * 3, 2, 2, 20)
+    vec.reset([1, 2])
+    mask = vec.legal_action_mask()
+    actions = mask.argmax(axis=1)
+    actions[1] = np.flatnonzero(~mask[1])[0]
+
+    with pytest.raises(ValueError):
+        vec.step(actions)